@@ -0,0 +1,17 @@
+# -*- coding: utf-8 -*-
+"""
+Texas Hold'em engine, with Omaha and 6+ short-deck tables (see variants.py).
+
+Importing the package runs no game logic; the evaluator tables are built on the first evaluation and
+the preflop equity table is memory-mapped on the first lookup. The demo game, the hand census and
+the benchmarks are run from the command line:
+
+    python -m holdem demo
+    python -m holdem census 5 7
+    python -m holdem bench --players 2 6 10
+    python -m holdem host --port 9000
+    python -m holdem icm 5000 3000 2000 --payouts 50 30 20
+"""
+
+from .game import (TexasHoldem, Player, SimulatedTexasHoldem, Omaha, ShortDeckHoldem, SimulatedOmaha,
+                   SimulatedShortDeckHoldem)
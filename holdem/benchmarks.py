@@ -0,0 +1,197 @@
+# -*- coding: utf-8 -*-
+"""
+Microbenchmarks for the hot paths of the TexasHoldem engine.
+
+Every benchmark runs on tables of 2 to 10 players dealt from a fixed seed and reports the per-call
+latency (best of several repeats) and calls per second. Results can be written to a JSON file and
+later compared against it; benchmarks that got slower than the threshold are flagged.
+
+Example:
+    python -m holdem bench --output baseline.json
+    python -m holdem bench --compare baseline.json --threshold 0.10
+"""
+
+import argparse
+import json
+import platform
+import random
+import time
+import timeit
+import numpy as np
+
+from .game import TexasHoldem, SimulatedTexasHoldem, Omaha, ShortDeckHoldem, SimulatedOmaha
+from .instrument import Instrumentation
+
+PLAYER_NAMES = ['TUDOR', 'ANDREW', 'JOHN', 'MARIA', 'ELENA', 'DAN', 'ANA', 'MIHAI', 'IOANA', 'RADU']
+BUY_IN = 10 ** 9
+BIG_BLIND = 2
+REPEAT = 5
+
+
+def _dealt_game(players, seed, table=TexasHoldem):
+    random.seed(seed)
+    game = table(PLAYER_NAMES[:players], BUY_IN, BIG_BLIND)
+    game.shuffle_cards()
+    game.deal_players()
+    game.deal_board(flop=True)
+    game.deal_board(flop=False)
+    game.deal_board(flop=False)
+    return game
+
+
+def _deal(game):
+    game.reset_deck()
+    game.shuffle_cards()
+    game.community_cards = []
+    game.deal_players()
+    game.deal_board(flop=True)
+    game.deal_board(flop=False)
+    game.deal_board(flop=False)
+
+
+def _hand_cycle(game):
+    for player in game.players:
+        game.table[player].folded = False
+    game.set_blind_buttons()
+    _deal(game)
+    game.blinds()
+    for player in game.players:
+        game.place_bet(player, game.big_blind)
+    game.settle_pot()
+    game.hands_played += 1
+
+
+def _simulated_hand_cycle(game):
+    game.new_hand()
+    game.deal_players()
+    game.blinds()
+    for player in game.players:
+        game.place_bet(player, game.big_blind)
+    game.deal_board(flop=True)
+    game.deal_board(flop=False)
+    game.deal_board(flop=False)
+    game.settle_pot()
+
+
+def benchmark_calls(players, seed):
+    """
+    Returns {'benchmark name': function} for a table of players seats. Every function takes no
+    arguments and can be called repeatedly.
+    """
+    game = _dealt_game(players, seed)
+    name = game.players[0]
+    seven_cards = game.table[name].cards + game.community_cards
+    showdown_cards = game.showdown_cards()
+    deal_game = _dealt_game(players, seed)
+    cycle_game = _dealt_game(players, seed)
+    simulated_game = SimulatedTexasHoldem(PLAYER_NAMES[:players], BUY_IN, BIG_BLIND, seed=seed)
+    instrumented_game = SimulatedTexasHoldem(PLAYER_NAMES[:players], BUY_IN, BIG_BLIND, seed=seed)
+    Instrumentation().attach(instrumented_game)
+    omaha_game = _dealt_game(players, seed, Omaha)
+    short_deck_game = _dealt_game(players, seed, ShortDeckHoldem)
+    simulated_omaha_game = SimulatedOmaha(PLAYER_NAMES[:players], BUY_IN, BIG_BLIND, seed=seed)
+    return {
+        'get_five_cards': lambda: game.get_five_cards(name),
+        'winner': game.winner,
+        'tiebreaker': lambda: game.tiebreaker(showdown_cards),
+        'sort_cards': lambda: game.sort_cards(seven_cards),
+        'get_matched_cards': lambda: game.get_matched_cards(seven_cards),
+        'deal_players_deal_board': lambda: _deal(deal_game),
+        'hand_cycle': lambda: _hand_cycle(cycle_game),
+        'simulated_hand_cycle': lambda: _simulated_hand_cycle(simulated_game),
+        'instrumented_hand_cycle': lambda: _simulated_hand_cycle(instrumented_game),
+        'omaha_showdown_ranking': omaha_game.showdown_ranking,
+        'short_deck_showdown_ranking': short_deck_game.showdown_ranking,
+        'simulated_omaha_hand_cycle': lambda: _simulated_hand_cycle(simulated_omaha_game),
+        }
+
+
+def run_benchmarks(player_counts=range(2, 11), seed=0, names=None):
+    """
+    Runs every benchmark for every table size.
+
+    Args:
+        player_counts (iterable): Table sizes to benchmark.
+        seed (int): Seed used to shuffle the benchmark tables.
+        names (list): Benchmarks to run; defaults to all of them.
+
+    Returns:
+        dict: {'meta': {...}, 'results': {'name/players': {'latency_us', 'calls_per_sec', 'calls'}}}.
+
+    """
+    results = {}
+    for players in player_counts:
+        for name, call in benchmark_calls(players, seed).items():
+            if names and name not in names:
+                continue
+            timer = timeit.Timer(call)
+            number, _ = timer.autorange()
+            latency = min(timer.repeat(REPEAT, number)) / number
+            results[f'{name}/{players}'] = {
+                'latency_us': latency * 1e6,
+                'calls_per_sec': 1 / latency,
+                'calls': number * REPEAT,
+                }
+    meta = {
+        'seed': seed,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+    return {'meta': meta, 'results': results}
+
+
+def compare(current, baseline, threshold=0.10):
+    """
+    Compares benchmark results against a baseline.
+
+    Args:
+        current (dict): Output of run_benchmarks.
+        baseline (dict): Output of run_benchmarks loaded from a saved file.
+        threshold (float): Relative slowdown above which a benchmark is flagged, e.g. 0.10 for 10%.
+
+    Returns:
+        list: Names of the benchmarks that regressed.
+
+    """
+    regressions = []
+    for key, result in current['results'].items():
+        if key not in baseline['results']:
+            continue
+        ratio = result['latency_us'] / baseline['results'][key]['latency_us']
+        regressed = ratio > 1 + threshold
+        if regressed:
+            regressions.append(key)
+        print(f"{key:<32} {baseline['results'][key]['latency_us']:>12.2f}us -> {result['latency_us']:>12.2f}us "
+              f"{ratio - 1:>+8.1%}{'  SLOWER' if regressed else ''}")
+    return regressions
+
+
+def print_results(results):
+    for key, result in results['results'].items():
+        print(f"{key:<32} {result['latency_us']:>12.2f}us {result['calls_per_sec']:>14,.0f} calls/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m holdem bench', description='Microbenchmarks for the TexasHoldem engine hot paths.')
+    parser.add_argument('--players', type=int, nargs='+', default=list(range(2, 11)), help='table sizes to run')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', help='benchmark names to run')
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--compare', help='baseline JSON file to compare against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='relative slowdown that counts as a regression')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.players, args.seed, args.only)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(results, file, indent=2)
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.threshold)
+        print(f'{len(regressions)} regression(s) above {args.threshold:.0%}')
+        return 1 if regressions else 0
+    print_results(results)
+    return 0
+
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""
+Memoization layer for hand evaluation and equity calls.
+
+Equity results are keyed on the canonical form of the hole cards and board: the smallest of the 24
+suit relabelings of the cards, with each hand sorted. Equity queries that only differ by a relabeling of
+suits share one entry, since equities do not depend on suit names. Showdown strengths are keyed on the
+sorted cards as dealt: canonicalizing a showdown costs more than evaluating it.
+
+Entries are evicted least recently used first once the entry cap or the (approximate) memory cap is
+exceeded.
+
+Example:
+    cache = EvaluationCache(max_entries=100000, max_bytes=64 << 20)
+    game = TexasHoldem(['TUDOR', 'ANDREW'], 100, 2, cache=cache)
+    ...
+    game.winner()
+    cache.stats()
+"""
+
+import sys
+from collections import OrderedDict
+
+from . import equity, evaluator
+
+
+def canonical_form(hands, board=(), dead_cards=()):
+    """
+    Returns the suit-normalized form of a set of integer hands, community cards and dead cards.
+    The order of hands is kept, the order of cards inside each hand, the board and the dead cards is not.
+    """
+    best = None
+    for perm in equity.SUIT_PERMUTATIONS:
+        relabeled = (
+            tuple(sorted((card & ~3 | perm[card & 3] for card in board), reverse=True)),
+            tuple(tuple(sorted((card & ~3 | perm[card & 3] for card in hand), reverse=True)) for hand in hands),
+            tuple(sorted((card & ~3 | perm[card & 3] for card in dead_cards), reverse=True))
+            )
+        if best is None or relabeled < best:
+            best = relabeled
+    return best
+
+
+def _sizeof(obj):
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (tuple, list)):
+        size += sum(_sizeof(item) for item in obj)
+    return size
+
+
+class EvaluationCache:
+    """
+        Bounded LRU cache in front of hand evaluation and equity calculations.
+
+        Args:
+            max_entries (int): Maximum number of cached results.
+            max_bytes (int): Maximum approximate memory used by keys and values.
+
+        Attributes:
+            hits (int): Lookups answered from the cache.
+            misses (int): Lookups that had to be computed.
+            evictions (int): Entries dropped to stay within max_entries and max_bytes.
+            size_bytes (int): Approximate memory used by keys and values.
+
+        """
+
+    def __init__(self, max_entries=100000, max_bytes=64 << 20):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size_bytes = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get_or_compute(self, key, compute):
+        """
+        Returns the cached value of key, or computes it with compute() and caches it.
+        """
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key][0]
+        self.misses += 1
+        value = compute()
+        size = _sizeof(key) + _sizeof(value)
+        self.entries[key] = (value, size)
+        self.size_bytes += size
+        while self.entries and (len(self.entries) > self.max_entries or self.size_bytes > self.max_bytes):
+            self.size_bytes -= self.entries.popitem(last=False)[1][1]
+            self.evictions += 1
+        return value
+
+    def strengths(self, hands, board=(), variant=None, computed=None):
+        """
+        Returns the evaluator strength of every integer hand combined with the community cards.
+
+        Args:
+            hands (list): One list of integer cards per player.
+            board (list): Integer community cards.
+            variant (Variant): Game variant whose evaluate is used (see variants.py); Hold'em if None.
+            computed (list): Strengths already evaluated elsewhere, stored instead of evaluating on a miss.
+
+        Returns:
+            tuple: Strength of each hand, in the order of hands.
+
+        """
+        board = tuple(sorted(board))
+        hands = tuple(tuple(sorted(hand)) for hand in hands)
+        if variant is None:
+            key = ('strengths', board, hands)
+            evaluate = evaluator.evaluate
+        else:
+            key = ('strengths', variant.name, board, hands)
+            evaluate = variant.evaluate
+        if computed is not None:
+            return self.get_or_compute(key, lambda: tuple(computed))
+        return self.get_or_compute(key, lambda: tuple(evaluate(list(hand) + list(board)) for hand in hands))
+
+    def equity(self, hole_cards, board=(), dead_cards=(), exact=False, **kwargs):
+        """
+        Cached equity.exact_equity (exact=True) or equity.simulate_equity call; kwargs are passed on
+        and are part of the key (a variant by its name). Returns the same (equities, runouts) tuple.
+        """
+        variant = kwargs.get('variant')
+        options = tuple(sorted((name, variant.name if name == 'variant' else value) for name, value in kwargs.items()))
+        key = ('exact' if exact else 'simulate', canonical_form(hole_cards, board, dead_cards), options)
+        if exact:
+            return self.get_or_compute(key, lambda: equity.exact_equity(hole_cards, board, dead_cards, **kwargs))
+        return self.get_or_compute(key, lambda: equity.simulate_equity(hole_cards, board, dead_cards, **kwargs))
+
+    def stats(self):
+        """
+        Returns hit/miss counters and current usage as a dict.
+        """
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self.entries),
+            'bytes': self.size_bytes,
+            }
+
+    def clear(self):
+        self.entries.clear()
+        self.size_bytes = 0
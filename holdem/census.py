@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+Streaming census of hand categories over every 5, 6 or 7 card hand of the deck.
+
+Hands are split into tasks by their lowest cards (the prefix). Each task enumerates the remaining
+cards from a table of combinations in colex order - the combinations of the first n cards are the
+first rows of that table - evaluates them in chunks and only returns category counts, so no task
+ever holds more than one chunk of hands in memory.
+
+The counts are checked against the reference frequencies from
+https://en.wikipedia.org/wiki/Poker_probability, which makes the census both a correctness gate and
+a throughput benchmark for a batch evaluator.
+
+Example:
+    python -m holdem census 5 7
+"""
+
+import os
+import time
+import numpy as np
+from math import comb
+from itertools import combinations
+from concurrent.futures import ProcessPoolExecutor
+
+from . import evaluator
+
+"Hand counts per category, from HIGH_CARD up to ROYAL_FLUSH. The 5 card counts are poker_and_combinations."
+REFERENCE_COUNTS = {
+    5: [1302540, 1098240, 123552, 54912, 10200, 5108, 3744, 624, 36, 4],
+    7: [23294460, 58627800, 31433400, 6461620, 6180020, 4047644, 3473184, 224848, 37260, 4324],
+    }
+PREFIX_SIZES = {5: 1, 6: 1, 7: 2}
+CHUNK_SIZE = 1 << 18
+_colex_tables = {}
+
+
+def colex_combinations(n, r):
+    """
+    Returns every r-combination of range(n) in colex order as an (comb(n, r), r) int8 array.
+    """
+    table = np.arange(n, dtype=np.int8)[:, None]
+    for size in range(2, r + 1):
+        table = np.vstack([np.hstack((table[:comb(top, size - 1)], np.full((comb(top, size - 1), 1), top, dtype=np.int8)))
+                           for top in range(size - 1, n)])
+    return table
+
+
+def _colex_table(rest):
+    if rest not in _colex_tables:
+        _colex_tables[rest] = colex_combinations(52, rest)
+    return _colex_tables[rest]
+
+
+def _census_task(prefix, size, evaluate_batch=evaluator.evaluate_batch):
+    rest = size - len(prefix)
+    start = prefix[-1] + 1 if prefix else 0
+    rows = _colex_table(rest)[:comb(52 - start, rest)]
+    counts = np.zeros(len(evaluator.CATEGORY_NAMES), dtype=np.int64)
+    for chunk_start in range(0, len(rows), CHUNK_SIZE):
+        chunk = rows[chunk_start:chunk_start + CHUNK_SIZE].astype(np.intp) + start
+        hands = np.hstack((np.broadcast_to(np.array(prefix, dtype=np.intp), (len(chunk), len(prefix))), chunk))
+        categories = evaluate_batch(hands)[0]
+        counts += np.bincount(categories, minlength=len(counts))
+    return counts
+
+
+def run_census(size=5, workers=None, evaluate_batch=evaluator.evaluate_batch):
+    """
+    Counts the hand categories of every hand of size cards.
+
+    Args:
+        size (int): Hand size - 5, 6 or 7.
+        workers (int): Number of worker processes; defaults to os.cpu_count(). 1 runs in-process.
+        evaluate_batch (function): Batch evaluator returning (categories, strengths) for an (N, size)
+        card array; must be a module-level function so it can be sent to the workers.
+
+    Returns:
+        counts (np.ndarray): Number of hands per category, indexed from HIGH_CARD to ROYAL_FLUSH.
+        elapsed (float): Wall time in seconds.
+
+    """
+    prefixes = list(combinations(range(52), PREFIX_SIZES[size]))
+    workers = workers or os.cpu_count() or 1
+    evaluator.load_tables()
+    started = time.perf_counter()
+    if workers == 1:
+        results = [_census_task(prefix, size, evaluate_batch) for prefix in prefixes]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_census_task, prefixes, [size] * len(prefixes),
+                                        [evaluate_batch] * len(prefixes), chunksize=4))
+    return np.sum(results, axis=0), time.perf_counter() - started
+
+
+def report(size, counts, elapsed):
+    """
+    Prints the census next to the reference counts.
+
+    Returns:
+        bool: True if every category matches its reference count (or no reference exists for size).
+
+    """
+    reference = REFERENCE_COUNTS.get(size)
+    passed = []
+    for category in range(len(counts) - 1, -1, -1):
+        if reference is None:
+            print(f'{evaluator.CATEGORY_NAMES[category]} - {counts[category]} result')
+        else:
+            passed.append(counts[category] == reference[category])
+            print(f'{evaluator.CATEGORY_NAMES[category]} PASSED {passed[-1]} - {reference[category]} combinations vs. {counts[category]} result')
+    total = int(np.sum(counts))
+    print(f'{total} {size}-card hands in {elapsed:.2f}s ({total / elapsed:,.0f} hands/s)')
+    print('ALL TESTS PASSED: ', False not in passed)
+    return False not in passed
+
@@ -0,0 +1,371 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo CFR trainer for heads-up limit Hold'em over a card and betting abstraction.
+
+Abstraction:
+    Betting - BettingTree builds the fixed-limit tree of TexasHoldem heads-up play: blinds of one and
+    two chips, bets of BETS[street] chips and at most MAX_BETS bets per street. Nodes are rows of
+    flat arrays (kind, acting player, street, children per action, chips put in by each player).
+    Cards - preflop hands are the 169 suit-isomorphic starting hands; on later streets hands are
+    bucketed by hand strength, the share of the opponent's possible hands they beat on the current
+    board, in `buckets` equal-width buckets. Strengths are computed for whole batches of deals with
+    evaluator.evaluate_batch.
+
+The regret and average-strategy tables are (info sets, 3) float64 arrays; the info-set id of a decision
+node is infoset_offsets[node] + bucket, so memory is fixed by the abstraction size. Training uses
+external-sampling MCCFR with regret matching+. With several workers each process runs a task of
+iterations on its own copy of the tables and the parent adds up the changes, round by round. Task
+seeds are spawned from one SeedSequence, so results only depend on the seed and the task layout.
+
+Example:
+    trainer = CFRTrainer(seed=1)
+    trainer.train(100000, workers=4, checkpoint='hulhe.npz', checkpoint_every=20000)
+    trainer.action_probabilities(node=0, hole_cards=[48, 49], board=[])
+"""
+
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from . import evaluator
+from .ranges import CARD_MASKS
+
+FOLD, CALL, RAISE = range(3)
+DECISION, FOLDED, SHOWDOWN = range(3)
+BLINDS = (1, 2)
+BETS = (2, 2, 4, 4)
+MAX_BETS = 4
+BUCKETS = 10
+TASK_ITERATIONS = 2000
+PREFLOP_HANDS = 169
+ALL_COMBOS = np.array([(first, second) for first in range(52) for second in range(first + 1, 52)], dtype=np.intp)
+COMBO_MASKS = CARD_MASKS[ALL_COMBOS[:, 0]] | CARD_MASKS[ALL_COMBOS[:, 1]]
+
+
+class BettingTree:
+    """
+        Heads-up fixed-limit betting tree. Player 0 is the small blind and acts first preflop; player 1
+        acts first on later streets.
+
+        Args:
+            blinds (tuple): Small and big blind in chips.
+            bets (tuple): Bet size of each street in chips.
+            max_bets (int): Bets per street including the big blind preflop.
+
+        Attributes:
+            kind (np.ndarray): DECISION, FOLDED or SHOWDOWN per node.
+            player (np.ndarray): Player to act at decision nodes, the folding player at FOLDED nodes.
+            street (np.ndarray): Street of every node, 0 preflop to 3 river.
+            children (np.ndarray): (nodes, 3) child per FOLD, CALL and RAISE action; -1 if illegal.
+            contributions (np.ndarray): (nodes, 2) chips put in by each player.
+
+        """
+
+    def __init__(self, blinds=BLINDS, bets=BETS, max_bets=MAX_BETS):
+        self.blinds, self.bets, self.max_bets = tuple(blinds), tuple(bets), max_bets
+        self.kind, self.player, self.street, self.children, self.contributions = [], [], [], [], []
+        self._build(0, 0, list(blinds), 1, 0)
+        self.kind = np.array(self.kind, dtype=np.int8)
+        self.player = np.array(self.player, dtype=np.int8)
+        self.street = np.array(self.street, dtype=np.int8)
+        self.children = np.array(self.children, dtype=np.int32)
+        self.contributions = np.array(self.contributions, dtype=np.int64)
+
+    def _node(self, kind, player, street, contributions):
+        self.kind.append(kind)
+        self.player.append(player)
+        self.street.append(street)
+        self.children.append([-1, -1, -1])
+        self.contributions.append(list(contributions))
+        return len(self.kind) - 1
+
+    def _build(self, player, street, contributions, bets, actions):
+        """
+        Adds the decision node of player and everything below it; bets counts the bets of the street and
+        actions the actions taken on it so far. A call closes the street, except the small blind
+        completing preflop; a check closes it once both players have acted.
+        """
+        node = self._node(DECISION, player, street, contributions)
+        other = 1 - player
+        owed = contributions[other] - contributions[player]
+        if owed:
+            self.children[node][FOLD] = self._node(FOLDED, player, street, contributions)
+        called = list(contributions)
+        called[player] = contributions[other]
+        if (owed and (street or actions)) or (not owed and actions):
+            self.children[node][CALL] = self._close(street, called)
+        else:
+            self.children[node][CALL] = self._build(other, street, called, bets, actions + 1)
+        if bets < self.max_bets:
+            raised = list(called)
+            raised[player] += self.bets[street]
+            self.children[node][RAISE] = self._build(other, street, raised, bets + 1, actions + 1)
+        return node
+
+    def _close(self, street, contributions):
+        if street == 3:
+            return self._node(SHOWDOWN, -1, street, contributions)
+        return self._build(1, street + 1, contributions, 0, 0)
+
+    def __len__(self):
+        return len(self.kind)
+
+
+def preflop_bucket(first, second):
+    """
+    Returns the index (0 to 168) of the starting hand: 13 pairs, then 78 suited and 78 offsuit hands.
+    """
+    high, low = max(first >> 2, second >> 2), min(first >> 2, second >> 2)
+    if high == low:
+        return high
+    pair_index = high * (high - 1) // 2 + low
+    return 13 + pair_index if first & 3 == second & 3 else 91 + pair_index
+
+
+def strength_buckets(hole_cards, boards, buckets=BUCKETS):
+    """
+    Buckets hands by hand strength: the share of the opponent hands that do not share a card with the
+    hand or the board which the hand beats, counting ties as half.
+
+    Args:
+        hole_cards (np.ndarray): (N, 2) int cards.
+        boards (np.ndarray): (N, 3), (N, 4) or (N, 5) int cards.
+        buckets (int): Number of equal-width strength buckets.
+
+    Returns:
+        np.ndarray: (N,) bucket of every hand.
+
+    """
+    size = boards.shape[1] + 2
+    hero = evaluator.evaluate_batch(np.hstack((hole_cards, boards)))[1].astype(np.int32)
+    used = np.bitwise_or.reduce(CARD_MASKS[np.hstack((hole_cards, boards))], axis=1)
+    valid = (COMBO_MASKS[None, :] & used[:, None]) == 0
+    hands = np.concatenate((np.broadcast_to(ALL_COMBOS, (boards.shape[0],) + ALL_COMBOS.shape),
+                            np.repeat(boards[:, None, :], ALL_COMBOS.shape[0], axis=1)), axis=2)
+    villain = np.zeros(valid.shape, dtype=np.int32)
+    villain[valid] = evaluator.evaluate_batch(hands[valid].reshape(-1, size))[1]
+    beaten = ((villain < hero[:, None]) & valid).sum(axis=1) + 0.5 * ((villain == hero[:, None]) & valid).sum(axis=1)
+    strength = beaten / valid.sum(axis=1)
+    return np.minimum((strength * buckets).astype(np.intp), buckets - 1)
+
+
+def _deal_buckets(deals, buckets):
+    """
+    Returns the (N, 2, 4) bucket of each player on each street and the (N,) showdown result from
+    player 0's side (1 win, 0 tie, -1 loss) for deals of shape (N, 9): two hole cards per player and
+    the board.
+    """
+    count = deals.shape[0]
+    result = np.empty((count, 2, 4), dtype=np.intp)
+    strengths = []
+    for player in range(2):
+        hole = deals[:, 2 * player:2 * player + 2]
+        result[:, player, 0] = [preflop_bucket(first, second) for first, second in hole.tolist()]
+        for street, size in ((1, 3), (2, 4), (3, 5)):
+            result[:, player, street] = strength_buckets(hole, deals[:, 4:4 + size], buckets)
+        strengths.append(evaluator.evaluate_batch(np.hstack((hole, deals[:, 4:9])))[1].astype(np.int32))
+    return result, np.sign(strengths[0] - strengths[1])
+
+
+class _Traversal:
+    """
+    External-sampling MCCFR over one tree, updating the tables in place.
+    """
+
+    def __init__(self, tree, offsets, regrets, strategy_sum, rng):
+        self.kind = tree.kind.tolist()
+        self.player = tree.player.tolist()
+        self.street = tree.street.tolist()
+        self.children = tree.children.tolist()
+        self.contributions = tree.contributions.tolist()
+        self.offsets = offsets.tolist()
+        self.regrets = regrets
+        self.strategy_sum = strategy_sum
+        self.rng = rng
+
+    def strategy(self, info, children):
+        positive = [max(regret, 0.0) if child >= 0 else 0.0
+                    for regret, child in zip(self.regrets[info].tolist(), children)]
+        total = sum(positive)
+        if total > 0:
+            return [value / total for value in positive]
+        legal = sum(1 for child in children if child >= 0)
+        return [1.0 / legal if child >= 0 else 0.0 for child in children]
+
+    def traverse(self, node, traverser, buckets, result):
+        kind = self.kind[node]
+        contributions = self.contributions[node]
+        if kind == FOLDED:
+            return -contributions[traverser] if self.player[node] == traverser else contributions[1 - traverser]
+        if kind == SHOWDOWN:
+            outcome = result if traverser == 0 else -result
+            return outcome * contributions[1 - traverser] if outcome > 0 else outcome * contributions[traverser]
+        player = self.player[node]
+        info = self.offsets[node] + buckets[player][self.street[node]]
+        children = self.children[node]
+        strategy = self.strategy(info, children)
+        if player != traverser:
+            self.strategy_sum[info] += strategy
+            draw = self.rng.random()
+            for action, probability in enumerate(strategy):
+                if children[action] >= 0:
+                    chosen = action
+                    draw -= probability
+                    if draw < 0:
+                        break
+            return self.traverse(children[chosen], traverser, buckets, result)
+        utilities = [self.traverse(child, traverser, buckets, result) if child >= 0 else 0.0 for child in children]
+        value = sum(probability * utility for probability, utility in zip(strategy, utilities))
+        regrets = self.regrets[info]
+        for action, child in enumerate(children):
+            if child >= 0:
+                regrets[action] = max(regrets[action] + utilities[action] - value, 0.0)
+        return value
+
+
+def _train_task(tree, offsets, regrets, strategy_sum, iterations, buckets, seed):
+    """
+    Runs iterations of MCCFR on copies of the tables and returns the changes to them.
+    """
+    rng = np.random.default_rng(seed)
+    new_regrets, new_strategy_sum = regrets.copy(), strategy_sum.copy()
+    traversal = _Traversal(tree, offsets, new_regrets, new_strategy_sum, rng)
+    deals = np.argpartition(rng.random((iterations, 52)), 8, axis=1)[:, :9]
+    deal_buckets, results = _deal_buckets(deals, buckets)
+    for deal, result in zip(deal_buckets.tolist(), results.tolist()):
+        for traverser in (0, 1):
+            traversal.traverse(0, traverser, deal, result)
+    return new_regrets - regrets, new_strategy_sum - strategy_sum
+
+
+class CFRTrainer:
+    """
+        Trains a heads-up limit strategy with external-sampling MCCFR.
+
+        Args:
+            tree (BettingTree): Betting abstraction; the default fixed-limit tree if None.
+            buckets (int): Hand-strength buckets per postflop street.
+            seed (int): Seed of the SeedSequence the task seeds are spawned from.
+
+        Attributes:
+            infoset_offsets (np.ndarray): Id of the first info set of every decision node, -1 elsewhere.
+            regrets (np.ndarray): (info sets, 3) cumulative regrets.
+            strategy_sum (np.ndarray): (info sets, 3) cumulative strategy weights.
+            iterations (int): Deals trained on so far.
+
+        """
+
+    def __init__(self, tree=None, buckets=BUCKETS, seed=None):
+        self.tree = BettingTree() if tree is None else tree
+        self.buckets = buckets
+        self.seeds = np.random.SeedSequence(seed)
+        sizes = np.where(self.tree.street == 0, PREFLOP_HANDS, buckets)
+        sizes = np.where(self.tree.kind == DECISION, sizes, 0)
+        self.infoset_offsets = np.where(self.tree.kind == DECISION, np.cumsum(sizes) - sizes, -1)
+        self.regrets = np.zeros((int(sizes.sum()), 3))
+        self.strategy_sum = np.zeros_like(self.regrets)
+        self.iterations = 0
+
+    def train(self, iterations, workers=1, checkpoint=None, checkpoint_every=None, task_iterations=TASK_ITERATIONS):
+        """
+        Trains on iterations more deals, each traversed once for both players.
+
+        Args:
+            iterations (int): Number of deals.
+            workers (int): Number of worker processes; 1 runs in-process.
+            checkpoint (str): File the tables are saved to with save().
+            checkpoint_every (int): Save after roughly this many deals; only at the end if None.
+            task_iterations (int): Deals per task.
+
+        Returns:
+            float: Deals per second.
+
+        """
+        workers = workers or os.cpu_count() or 1
+        start, target, saved = time.perf_counter(), self.iterations + iterations, self.iterations
+        executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+        try:
+            while self.iterations < target:
+                sizes = []
+                for _ in range(workers):
+                    size = min(task_iterations, target - self.iterations - sum(sizes))
+                    if size > 0:
+                        sizes.append(size)
+                args = [(self.tree, self.infoset_offsets, self.regrets, self.strategy_sum, size, self.buckets,
+                         seed) for size, seed in zip(sizes, self.seeds.spawn(len(sizes)))]
+                if executor is None:
+                    deltas = [_train_task(*task) for task in args]
+                else:
+                    deltas = list(executor.map(_train_task, *zip(*args)))
+                for regret_delta, strategy_delta in deltas:
+                    self.regrets += regret_delta
+                    self.strategy_sum += strategy_delta
+                np.maximum(self.regrets, 0.0, out=self.regrets)
+                self.iterations += sum(sizes)
+                if checkpoint and checkpoint_every and self.iterations - saved >= checkpoint_every:
+                    self.save(checkpoint)
+                    saved = self.iterations
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        if checkpoint:
+            self.save(checkpoint)
+        return iterations / (time.perf_counter() - start)
+
+    def average_strategy(self):
+        """
+        Returns the (info sets, 3) average strategy; info sets never reached play uniformly over legal actions.
+        """
+        decision = np.flatnonzero(self.tree.kind == DECISION)
+        legal = np.zeros_like(self.strategy_sum, dtype=bool)
+        for node in decision:
+            size = PREFLOP_HANDS if self.tree.street[node] == 0 else self.buckets
+            offset = self.infoset_offsets[node]
+            legal[offset:offset + size] = self.tree.children[node] >= 0
+        totals = self.strategy_sum.sum(axis=1, keepdims=True)
+        uniform = legal / legal.sum(axis=1, keepdims=True)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(totals > 0, self.strategy_sum / totals, uniform)
+
+    def action_probabilities(self, node, hole_cards, board=()):
+        """
+        Returns the FOLD, CALL and RAISE probabilities of the average strategy at a decision node for
+        the given int hole cards and board.
+        """
+        street = self.tree.street[node]
+        if street == 0:
+            bucket = preflop_bucket(*hole_cards)
+        else:
+            bucket = int(strength_buckets(np.array([hole_cards]), np.array([board[:street + 2]]), self.buckets)[0])
+        info = self.infoset_offsets[node] + bucket
+        totals = self.strategy_sum[info].sum()
+        if totals > 0:
+            return self.strategy_sum[info] / totals
+        legal = self.tree.children[node] >= 0
+        return legal / legal.sum()
+
+    def save(self, path):
+        """
+        Writes the tables and the abstraction to path (NumPy .npz), replacing the file atomically.
+        """
+        params = {'blinds': self.tree.blinds, 'bets': self.tree.bets, 'max_bets': self.tree.max_bets,
+                  'buckets': self.buckets, 'iterations': self.iterations}
+        temporary = path + '.tmp'
+        with open(temporary, 'wb') as file:
+            np.savez(file, regrets=self.regrets, strategy_sum=self.strategy_sum, params=json.dumps(params))
+        os.replace(temporary, path)
+
+    @classmethod
+    def load(cls, path, seed=None):
+        """
+        Restores a trainer saved with save(); training continues with task seeds spawned from seed.
+        """
+        with np.load(path) as data:
+            params = json.loads(str(data['params']))
+            trainer = cls(BettingTree(params['blinds'], params['bets'], params['max_bets']), params['buckets'], seed)
+            trainer.regrets = data['regrets']
+            trainer.strategy_sum = data['strategy_sum']
+        trainer.iterations = params['iterations']
+        return trainer
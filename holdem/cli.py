@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+Command-line entry point: python -m holdem {demo, census, bench, build-preflop, host, selfplay, cfr, icm}.
+"""
+
+import argparse
+
+
+def _one_of(choices, convert=str):
+    """
+    Argument type accepting one of choices. argparse rejects the default list of a nargs='*' positional
+    given choices=, so list-valued positionals check their values here instead.
+    """
+    def parse(text):
+        value = convert(text)
+        if value not in choices:
+            raise argparse.ArgumentTypeError(f"invalid choice: {text!r} (choose from {', '.join(map(str, choices))})")
+        return value
+    return parse
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m holdem', description="Texas Hold'em engine tools.")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    demo = commands.add_parser('demo', help='play a demo hand')
+    demo.add_argument('--test-showdown', action='store_true', help='also check all 5-card hand counts')
+
+    census = commands.add_parser('census', help='count hand categories over every hand of a size')
+    census.add_argument('sizes', type=_one_of([5, 6, 7], int), nargs='*', default=[5, 7], metavar='{5,6,7}')
+    census.add_argument('--workers', type=int)
+
+    commands.add_parser('bench', help='run the microbenchmarks; see python -m holdem bench --help', add_help=False)
+
+    preflop = commands.add_parser('build-preflop', help='build the heads-up preflop equity table')
+    preflop.add_argument('--path')
+    preflop.add_argument('--workers', type=int)
+
+    host = commands.add_parser('host', help='host tables for bots over a local socket (JSON lines)')
+    host.add_argument('--socket', help='Unix socket path; a local TCP port is used if omitted')
+    host.add_argument('--port', type=int, default=0)
+    host.add_argument('--queue-size', type=int, default=10000)
+    host.add_argument('--timeout', type=float, default=5.0, help='per-action timeout in seconds')
+
+    selfplay = commands.add_parser('selfplay', help='play built-in strategies against each other')
+    selfplay.add_argument('strategies', type=_one_of(['call', 'random', 'strength']), nargs='*', default=['strength', 'call'],
+                          metavar='{call,random,strength}')
+    selfplay.add_argument('--hands', type=int, default=100000)
+    selfplay.add_argument('--tables', type=int, default=512)
+    selfplay.add_argument('--seed', type=int)
+
+    cfr = commands.add_parser('cfr', help='train a heads-up limit strategy with MCCFR')
+    cfr.add_argument('--iterations', type=int, default=100000)
+    cfr.add_argument('--workers', type=int)
+    cfr.add_argument('--checkpoint', default='cfr.npz', help='resumed from if it exists')
+    cfr.add_argument('--checkpoint-every', type=int, default=20000)
+    cfr.add_argument('--seed', type=int)
+
+    icm = commands.add_parser('icm', help='ICM equity of tournament stacks')
+    icm.add_argument('stacks', type=float, nargs='+')
+    icm.add_argument('--payouts', type=float, nargs='+', required=True, help='prize of every paid place, first place first')
+    icm.add_argument('--trials', type=int, default=100000, help='finishing orders sampled for large fields')
+    icm.add_argument('--seed', type=int)
+    args, rest = parser.parse_known_args(argv)
+
+    if args.command == 'bench':
+        from . import benchmarks
+        return benchmarks.main(rest)
+    if rest:
+        parser.error(f"unrecognized arguments: {' '.join(rest)}")
+
+    if args.command == 'demo':
+        from . import demo
+        demo.play_game()
+        if args.test_showdown:
+            return 0 if demo.test_showdown() else 1
+        return 0
+
+    if args.command == 'census':
+        from . import census as census_module
+        passed = [census_module.report(size, *census_module.run_census(size, args.workers)) for size in args.sizes]
+        return 0 if all(passed) else 1
+
+    if args.command == 'build-preflop':
+        from . import equity
+        path = args.path or equity.PREFLOP_TABLE_PATH
+        count = equity.build_preflop_table(path, args.workers)
+        print(f'{count} matchups written to {path}')
+        return 0
+
+    if args.command == 'host':
+        from . import host as host_module
+        host_module.main(args.socket, args.port, args.queue_size, args.timeout)
+        return 0
+
+    if args.command == 'selfplay':
+        from . import selfplay as selfplay_module
+        selfplay_module.main(args.strategies, args.hands, args.tables, args.seed)
+        return 0
+
+    if args.command == 'cfr':
+        import os
+        from . import cfr as cfr_module
+        if os.path.exists(args.checkpoint):
+            trainer = cfr_module.CFRTrainer.load(args.checkpoint, args.seed)
+        else:
+            trainer = cfr_module.CFRTrainer(seed=args.seed)
+        rate = trainer.train(args.iterations, args.workers, args.checkpoint, args.checkpoint_every)
+        print(f'{trainer.iterations} deals trained ({rate:.0f} deals/s), saved to {args.checkpoint}')
+        return 0
+
+    if args.command == 'icm':
+        from . import icm as icm_module
+        equities = icm_module.icm_equity(args.stacks, args.payouts, args.trials, args.seed)
+        for seat, (stack, share) in enumerate(zip(args.stacks, equities)):
+            print(f'{seat:>4} {stack:>14,.0f} {share:>12.2f}')
+        return 0
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""
+Demo game and showdown checks that used to run when importing TexasHoldem.py.
+
+Test figures are from here -> https://en.wikipedia.org/wiki/Poker_probability
+Tiebreaker Rules are from https://www.adda52.com/poker/poker-rules/cash-game-rules/tie-breaker-rules
+Split Pot Logic from https://www.pokerlistings.com/rules-for-poker-all-in-situations-poker-side-pot-calculator
+"""
+
+from . import census, evaluator
+from .game import TexasHoldem
+
+poker_hand_names = [
+    'Royal Flush', 'Straight Flush', 'Four of a Kind', 'Full House',
+    'Flush', 'Straight', 'Three of a Kind', 'Two Pairs', 'One Pair'
+    ]
+
+poker_and_combinations = [4, 36, 624, 3744, 5108, 10200, 54912, 123552, 1098240]
+
+
+def test_showdown():
+    """
+    Streams all 5-card hands through the evaluator and checks the category counts against
+    poker_and_combinations; see census.py for 7-card hands.
+
+    Returns:
+        bool: True if all counts match.
+
+    """
+    counts, elapsed = census.run_census(5, workers=1)
+    results_count = [counts[category] for category in range(evaluator.ROYAL_FLUSH, evaluator.HIGH_CARD, -1)]
+    passed = [results_count[idx] == poker_and_combinations[idx] for idx in range(9)]
+
+    for idx in range(9):
+        print(f'{poker_hand_names[idx]} PASSED {passed[idx]} - {poker_and_combinations[idx]} combinations vs. {results_count[idx]} result')
+    print('ALL TESTS PASSED: ', False not in passed)
+    return False not in passed
+
+
+def play_game():
+    """
+    Plays one hand between three players and prints the table.
+
+    Returns:
+        TexasHoldem: The game after the river.
+
+    """
+    game = TexasHoldem(['TUDOR', 'ANDREW', 'JOHN'], 100, 2)
+    game.shuffle_cards()
+    game.deal_players()
+    game.blinds()
+    game.place_small_blind()
+    game.place_bet('TUDOR', 20)
+    game.place_bet('ANDREW', 20)
+    game.place_bet('JOHN', 22)
+    game.deal_board(flop=True)
+    game.place_bet('TUDOR', 30)
+    game.place_bet('ANDREW', 30)
+    game.place_bet('JOHN', 30)
+    game.deal_board(flop=False)
+    game.place_bet('TUDOR', 30)
+    game.place_bet('ANDREW', 30)
+    game.place_bet('JOHN', 30)
+    game.deal_board(flop = False)
+    game.print_status()
+    print(f"Winner: {game.winner()}")
+    return game
@@ -0,0 +1,353 @@
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo equity calculator running on the batched evaluator.
+
+Runouts of the missing community cards are drawn in tasks of a fixed size. Every task gets its own
+seed spawned from one SeedSequence, so the result for a given seed and sample count does not depend
+on the number of worker processes or on the order in which the tasks finish.
+
+exact_equity enumerates every runout instead. Heads-up preflop matchups (1,712,304 runouts each) are
+read from a precomputed table covering every suit-isomorphic matchup of the 169 starting hands.
+build_preflop_table writes it once to a compact binary file (12 bytes per matchup), which is then
+memory-mapped on first lookup.
+
+Worker processes are started with concurrent.futures. On platforms that spawn processes (Windows,
+macOS) the calling script must guard its entry point with if __name__ == '__main__'.
+"""
+
+import os
+import time
+import numpy as np
+from collections import namedtuple
+from itertools import chain, combinations, islice, permutations
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+from . import evaluator, variants
+
+Equity = namedtuple('Equity', 'win tie equity')
+
+"Least common multiple of 1..10; ties are split in whole units so results add up exactly."
+SHARE_UNITS = 2520
+TASK_SIZE = 20000
+ENUMERATION_CHUNK = 1 << 18
+
+PREFLOP_TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'preflop_table.bin')
+PREFLOP_MAGIC = b'THPF0001'
+PREFLOP_RUNOUTS = 1712304
+PREFLOP_RECORD = np.dtype([('key', '<u4'), ('win', '<u4'), ('tie', '<u4')])
+SUIT_PERMUTATIONS = list(permutations(range(4)))
+_preflop_table = None
+
+
+def remaining_deck(hole_cards, board, dead_cards=(), variant=variants.HOLDEM):
+    used = set(board) | set(dead_cards)
+    for cards in hole_cards:
+        used.update(cards)
+    if len(used) != len(board) + len(dead_cards) + sum(len(cards) for cards in hole_cards):
+        raise Exception("Action is not possible. The same card is dealt more than once.")
+    return np.array([card for card in variant.deck if card not in used], dtype=np.intp)
+
+
+def _showdown_counts(hole_cards, boards, variant=variants.HOLDEM):
+    """
+    Counts wins, ties and pot shares of each player over an (N, 5) array of complete boards.
+    """
+    samples = boards.shape[0]
+    strengths = np.empty((len(hole_cards), samples), dtype=np.uint16)
+    for idx, cards in enumerate(hole_cards):
+        hands = np.hstack((np.broadcast_to(np.asarray(cards, dtype=np.intp), (samples, len(cards))), boards))
+        strengths[idx] = variant.evaluate_batch(hands)[1]
+    best = strengths == strengths.max(axis=0)
+    winners = best.sum(axis=0)
+    wins = (best & (winners == 1)).sum(axis=1)
+    ties = (best & (winners > 1)).sum(axis=1)
+    shares = (best * (SHARE_UNITS // winners)).sum(axis=1)
+    return wins.astype(np.int64), ties.astype(np.int64), shares.astype(np.int64)
+
+
+def _simulate_task(hole_cards, board, deck, samples, seed, variant=variants.HOLDEM):
+    rng = np.random.default_rng(seed)
+    missing = 5 - len(board)
+    if missing:
+        draws = np.argpartition(rng.random((samples, deck.size)), missing - 1, axis=1)[:, :missing]
+        runouts = deck[draws]
+    else:
+        runouts = np.empty((samples, 0), dtype=np.intp)
+    boards = np.hstack((np.broadcast_to(np.asarray(board, dtype=np.intp), (samples, len(board))), runouts))
+    return samples, _showdown_counts(hole_cards, boards, variant)
+
+
+def _tasks(samples, seed):
+    seeds = np.random.SeedSequence(seed)
+    count = 0
+    while samples is None or count < samples:
+        size = TASK_SIZE if samples is None else min(TASK_SIZE, samples - count)
+        count += size
+        yield size, seeds.spawn(1)[0]
+
+
+def simulate_equity(hole_cards, board=(), dead_cards=(), samples=100000, time_budget=None, workers=None, seed=None,
+                    variant=variants.HOLDEM):
+    """
+    Estimates win and tie probabilities of every hand by sampling runouts of the community cards.
+
+    Args:
+        hole_cards (list): One list of integer cards per player in the hand.
+        board (list): Integer community cards dealt so far (0, 3, 4 or 5 cards).
+        dead_cards (list): Integer cards that can not come on the board, e.g. folded hands.
+        samples (int): Number of runouts to simulate. With a time_budget this is an upper bound and
+        may be None to simulate until the time is up.
+        time_budget (float): Seconds after which no new tasks are started.
+        workers (int): Number of worker processes; defaults to os.cpu_count(). 1 runs in-process.
+        seed (int): Seed of the SeedSequence the per-task generators are spawned from.
+        variant (Variant): Game variant whose deck and evaluate_batch are used (see variants.py).
+
+    Returns:
+        equities (list): Equity('win', 'tie', 'equity') per player, as probabilities. equity is the
+        expected share of the pot including split pots.
+        samples (int): Number of runouts simulated.
+
+    """
+    if samples is None and time_budget is None:
+        raise Exception("Action is not possible. Please set a sample count or a time budget.")
+    deck = remaining_deck(hole_cards, board, dead_cards, variant)
+    workers = workers or os.cpu_count() or 1
+    deadline = None if time_budget is None else time.perf_counter() + time_budget
+    results = []
+    tasks = _tasks(samples, seed)
+
+    if workers == 1:
+        for size, task_seed in tasks:
+            results.append(_simulate_task(hole_cards, board, deck, size, task_seed, variant))
+            if deadline is not None and time.perf_counter() > deadline:
+                break
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = set()
+            for size, task_seed in tasks:
+                pending.add(executor.submit(_simulate_task, hole_cards, board, deck, size, task_seed, variant))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    results.extend(future.result() for future in done)
+                if deadline is not None and time.perf_counter() > deadline:
+                    break
+            results.extend(future.result() for future in pending)
+
+    simulated = sum(size for size, counts in results)
+    totals = np.sum([counts for size, counts in results], axis=0)
+    wins, ties, shares = totals
+    equities = [Equity(float(wins[idx] / simulated), float(ties[idx] / simulated),
+                       float(shares[idx] / (SHARE_UNITS * simulated)))
+                for idx in range(len(hole_cards))]
+    return equities, simulated
+
+
+def _enumerate_runouts(deck, missing):
+    runouts = combinations(deck.tolist(), missing)
+    while True:
+        chunk = np.fromiter(chain.from_iterable(islice(runouts, ENUMERATION_CHUNK)), dtype=np.intp)
+        if not chunk.size:
+            return
+        yield chunk.reshape(-1, missing)
+
+
+def _matchup_key(hero, villain):
+    return hero[0] << 18 | hero[1] << 12 | villain[0] << 6 | villain[1]
+
+
+def canonical_matchup(hero, villain):
+    """
+    Maps a heads-up matchup of two integer hands to its suit-isomorphic canonical form.
+
+    Returns:
+        key (int): Smallest matchup key over all suit relabelings and both seat orders.
+        swapped (bool): True if the canonical form lists villain first.
+
+    """
+    best = None
+    for perm in SUIT_PERMUTATIONS:
+        cards = [card & ~3 | perm[card & 3] for card in (*hero, *villain)]
+        first = sorted(cards[:2], reverse=True)
+        second = sorted(cards[2:], reverse=True)
+        for key, swapped in ((_matchup_key(first, second), False), (_matchup_key(second, first), True)):
+            if best is None or key < best[0]:
+                best = (key, swapped)
+    return best
+
+
+def _canonical_matchups():
+    keys = set()
+    hands = list(combinations(range(52), 2))
+    for hero, villain in combinations(hands, 2):
+        if not set(hero) & set(villain):
+            keys.add(canonical_matchup(hero, villain)[0])
+    return sorted(keys)
+
+
+def _preflop_record(key):
+    hero = [key >> 18 & 63, key >> 12 & 63]
+    villain = [key >> 6 & 63, key & 63]
+    deck = remaining_deck([hero, villain], [])
+    wins = ties = 0
+    for runouts in _enumerate_runouts(deck, 5):
+        counts = _showdown_counts([hero, villain], runouts)
+        wins += int(counts[0][0])
+        ties += int(counts[1][0])
+    return key, wins, ties
+
+
+def build_preflop_table(path=PREFLOP_TABLE_PATH, workers=None, keys=None):
+    """
+    Enumerates every suit-isomorphic heads-up preflop matchup and writes the results to path.
+    The full table holds 47,008 matchups and takes a few hours of CPU time, spread over workers.
+
+    Args:
+        path (str): Output file.
+        workers (int): Number of worker processes; defaults to os.cpu_count().
+        keys (list): Canonical matchup keys to build; defaults to all of them.
+
+    Returns:
+        int: Number of matchups written.
+
+    """
+    keys = _canonical_matchups() if keys is None else sorted(keys)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        records = list(executor.map(_preflop_record, keys, chunksize=16))
+    table = np.array(records, dtype=PREFLOP_RECORD)
+    with open(path, 'wb') as file:
+        file.write(PREFLOP_MAGIC)
+        file.write(np.uint32(len(table)).tobytes())
+        file.write(table.tobytes())
+    return len(table)
+
+
+def load_preflop_table(path=PREFLOP_TABLE_PATH):
+    """
+    Memory-maps the preflop table written by build_preflop_table. Returns None if the file does not exist.
+    """
+    global _preflop_table
+    if _preflop_table is None or _preflop_table.filename != os.path.abspath(path):
+        if not os.path.exists(path):
+            return None
+        with open(path, 'rb') as file:
+            if file.read(len(PREFLOP_MAGIC)) != PREFLOP_MAGIC:
+                raise Exception("Action is not possible. File is not a preflop table.")
+        _preflop_table = np.memmap(path, dtype=PREFLOP_RECORD, mode='r', offset=len(PREFLOP_MAGIC) + 4)
+    return _preflop_table
+
+
+def preflop_lookup(hero, villain, path=PREFLOP_TABLE_PATH):
+    """
+    Looks up the exact heads-up preflop equity of two integer hands.
+
+    Returns:
+        list: Equity('win', 'tie', 'equity') for hero and villain, or None if the matchup is not in the table.
+
+    """
+    table = load_preflop_table(path)
+    if table is None:
+        return None
+    key, swapped = canonical_matchup(hero, villain)
+    idx = int(np.searchsorted(table['key'], key))
+    if idx == len(table) or table['key'][idx] != key:
+        return None
+    wins, ties = int(table['win'][idx]), int(table['tie'][idx])
+    losses = PREFLOP_RUNOUTS - wins - ties
+    equities = [Equity(wins / PREFLOP_RUNOUTS, ties / PREFLOP_RUNOUTS, (wins + ties / 2) / PREFLOP_RUNOUTS),
+                Equity(losses / PREFLOP_RUNOUTS, ties / PREFLOP_RUNOUTS, (losses + ties / 2) / PREFLOP_RUNOUTS)]
+    return equities[::-1] if swapped else equities
+
+
+def exact_equity(hole_cards, board=(), dead_cards=(), path=PREFLOP_TABLE_PATH, variant=variants.HOLDEM):
+    """
+    Computes exact win and tie probabilities of every hand by enumerating all runouts of the
+    community cards. Heads-up Hold'em preflop matchups without dead cards come from the preflop
+    table when it has been built.
+
+    Args:
+        hole_cards (list): One list of integer cards per player in the hand.
+        board (list): Integer community cards dealt so far (0, 3, 4 or 5 cards).
+        dead_cards (list): Integer cards that can not come on the board, e.g. folded hands.
+        path (str): Preflop table file.
+        variant (Variant): Game variant whose deck and evaluate_batch are used (see variants.py).
+
+    Returns:
+        equities (list): Equity('win', 'tie', 'equity') per player.
+        runouts (int): Number of runouts the equities are computed over.
+
+    """
+    deck = remaining_deck(hole_cards, board, dead_cards, variant)
+    if variant.name == variants.HOLDEM.name and not board and not dead_cards and len(hole_cards) == 2:
+        equities = preflop_lookup(hole_cards[0], hole_cards[1], path)
+        if equities is not None:
+            return equities, PREFLOP_RUNOUTS
+    missing = 5 - len(board)
+    board = np.asarray(board, dtype=np.intp)
+    totals = np.zeros((3, len(hole_cards)), dtype=np.int64)
+    runouts = 0
+    for chunk in _enumerate_runouts(deck, missing) if missing else [np.empty((1, 0), dtype=np.intp)]:
+        boards = np.hstack((np.broadcast_to(board, (chunk.shape[0], board.size)), chunk))
+        totals += _showdown_counts(hole_cards, boards, variant)
+        runouts += chunk.shape[0]
+    wins, ties, shares = totals
+    equities = [Equity(float(wins[idx] / runouts), float(ties[idx] / runouts),
+                       float(shares[idx] / (SHARE_UNITS * runouts)))
+                for idx in range(len(hole_cards))]
+    return equities, runouts
+
+
+def _game_hands(game, dead_cards):
+    active = [player for player in game.players if not game.table[player].folded]
+    folded_cards = [card for player in game.players
+                    if game.table[player].folded and game.table[player].cards is not None
+                    for card in game.table[player].cards]
+    return (active,
+            [game.encoded_cards(game.table[player].cards) for player in active],
+            game.encoded_cards(game.community_cards),
+            game.encoded_cards(list(dead_cards)) + game.encoded_cards(folded_cards))
+
+
+def game_equity(game, dead_cards=(), cache=None, **kwargs):
+    """
+    Estimates the equity of every player still in the hand of a TexasHoldem game (or any variant,
+    dealt from and ranked by game.VARIANT), given their Player.cards and the community_cards dealt so
+    far. Cards of folded players are treated as dead; folded players without cards are skipped.
+
+    Args:
+        game (TexasHoldem): Game after deal_players() and any number of deal_board() calls.
+        dead_cards (list): Additional cards that can not come on the board, in the card type of the game:
+        Card(rank, suit) namedtuples, or integer cards for SimulatedTexasHoldem.
+        cache (EvaluationCache): Optional cache the call goes through.
+        **kwargs: Passed to simulate_equity (samples, time_budget, workers, seed).
+
+    Returns:
+        dict: {'name': Equity} for every player that has not folded.
+
+    """
+    active, hole_cards, board, dead_cards = _game_hands(game, dead_cards)
+    if cache is not None:
+        equities, simulated = cache.equity(hole_cards, board, dead_cards, variant=game.VARIANT, **kwargs)
+    else:
+        equities, simulated = simulate_equity(hole_cards, board, dead_cards, variant=game.VARIANT, **kwargs)
+    return dict(zip(active, equities))
+
+
+def game_exact_equity(game, dead_cards=(), path=PREFLOP_TABLE_PATH, cache=None):
+    """
+    Exact counterpart of game_equity. See exact_equity.
+    """
+    active, hole_cards, board, dead_cards = _game_hands(game, dead_cards)
+    if cache is not None:
+        equities, runouts = cache.equity(hole_cards, board, dead_cards, exact=True, path=path, variant=game.VARIANT)
+    else:
+        equities, runouts = exact_equity(hole_cards, board, dead_cards, path, game.VARIANT)
+    return dict(zip(active, equities))
+
+
+def preflop_equity(hand, other_hand, path=PREFLOP_TABLE_PATH):
+    """
+    Returns the exact heads-up preflop equity of two hands given as Card(rank, suit) namedtuples,
+    e.g. preflop_equity(game.table['TUDOR'].cards, game.table['ANDREW'].cards).
+    """
+    equities, runouts = exact_equity([evaluator.encode_hand(hand), evaluator.encode_hand(other_hand)], path=path)
+    return equities
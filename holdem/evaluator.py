@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+Lookup-table hand evaluator used by the TexasHoldem class.
+
+Cards are encoded as integers 0-51 as rank_index * 4 + suit_index, where rank_index runs from
+0 ('2') to 12 ('A') and suit_index follows TexasHoldem.SUITS ('spades', 'clubs', 'diamonds', 'hearts').
+
+Every card carries a precomputed key made of a rank key and a suit key. Summing the keys of a hand
+gives a perfect hash of its rank multiset (used for every non-flush hand) and tells whether the hand
+holds five or more cards of one suit. Flushes are looked up by the bitmask of the ranks in that suit.
+Hands of 5, 6 and 7 cards are evaluated directly - the tables already hold the best five card hand
+of every rank multiset and flush bitmask, so the 21 five card combinations of a 7-card hand are
+never enumerated.
+
+The evaluator maps a hand to a strength between 1 and 7462 - one value per equivalence class of
+five card poker hands. A higher strength is a better hand, so comparing strengths settles both the
+hand category and the kickers in one comparison.
+
+evaluate_batch applies the same tables to whole NumPy arrays of hands at once.
+
+The tables are built on the first evaluation (or by calling load_tables), not at import.
+"""
+
+import numpy as np
+from collections import Counter
+from itertools import combinations
+
+RANKS = ['2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K', 'A']
+SUITS = ['spades', 'clubs', 'diamonds', 'hearts']
+
+HIGH_CARD, PAIR, TWO_PAIRS, THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE, \
+    FOUR_OF_A_KIND, STRAIGHT_FLUSH, ROYAL_FLUSH = range(10)
+
+CATEGORY_NAMES = [
+    'High Card', 'One Pair', 'Two Pairs', 'Three of a Kind', 'Straight',
+    'Flush', 'Full House', 'Four of a Kind', 'Straight Flush', 'Royal Flush'
+    ]
+
+"Rank keys whose sums are unique for every rank multiset of the same size (up to 7 cards)."
+RANK_KEYS = [0, 1, 5, 22, 98, 453, 2031, 8698, 22854, 83661, 262349, 636345, 1479181]
+"Suit keys whose sums identify the suit distribution of up to 7 cards."
+SUIT_KEYS = [0, 1, 8, 57]
+SUIT_SHIFT = 9
+SUIT_MASK = (1 << SUIT_SHIFT) - 1
+
+CARD_INDEX = {(rank, suit): rank_idx * 4 + suit_idx
+              for rank_idx, rank in enumerate(RANKS) for suit_idx, suit in enumerate(SUITS)}
+CARD_KEYS = [(RANK_KEYS[card >> 2] << SUIT_SHIFT) + SUIT_KEYS[card & 3] for card in range(52)]
+CARD_BITS = [1 << (card >> 2) for card in range(52)]
+HAND_SIZES = (5, 6, 7)
+
+"Rank masks of the ten straights, best first. The last one is the five-high wheel A-2-3-4-5."
+STRAIGHT_MASKS = [(high, 0b11111 << (high - 4)) for high in range(12, 3, -1)]
+STRAIGHT_MASKS.append((3, 0b1000000001111))
+
+
+def encode(card):
+    """
+    Converts a Card(rank, suit) namedtuple into its integer encoding.
+
+    Args:
+        card (Card): Card in the format card('rank', 'suit').
+
+    Returns:
+        int: Card index between 0 and 51.
+
+    """
+    return CARD_INDEX[card]
+
+
+def decode(card):
+    """
+    Converts an integer card back into a (rank, suit) tuple.
+
+    Args:
+        card (int): Card index between 0 and 51.
+
+    Returns:
+        tuple: (rank, suit) with the same str values used by TexasHoldem.
+
+    """
+    return RANKS[card >> 2], SUITS[card & 3]
+
+
+def encode_hand(hand):
+    return [CARD_INDEX[card] for card in hand]
+
+
+def _straight_high(rank_mask, straight_masks=STRAIGHT_MASKS):
+    for high, mask in straight_masks:
+        if rank_mask & mask == mask:
+            return high
+    return None
+
+
+def _flush_class(rank_mask, straight_masks=STRAIGHT_MASKS):
+    high = _straight_high(rank_mask, straight_masks)
+    if high == 12:
+        return (ROYAL_FLUSH, high)
+    if high is not None:
+        return (STRAIGHT_FLUSH, high)
+    ranks = [rank for rank in range(12, -1, -1) if rank_mask >> rank & 1]
+    return (FLUSH, *ranks[:5])
+
+
+def _rank_class(ranks, straight_masks=STRAIGHT_MASKS):
+    counts = Counter(ranks)
+    distinct = sorted(counts, reverse=True)
+    groups = sorted(((count, rank) for rank, count in counts.items()), reverse=True)
+    quads = [rank for count, rank in groups if count == 4]
+    trips = [rank for count, rank in groups if count == 3]
+    pairs = [rank for count, rank in groups if count == 2]
+    if quads:
+        return (FOUR_OF_A_KIND, quads[0], max(rank for rank in distinct if rank != quads[0]))
+    if trips and (len(trips) > 1 or pairs):
+        return (FULL_HOUSE, trips[0], max(trips[1:] + pairs))
+    high = _straight_high(sum(1 << rank for rank in distinct), straight_masks)
+    if high is not None:
+        return (STRAIGHT, high)
+    if trips:
+        return (THREE_OF_A_KIND, trips[0], *[rank for rank in distinct if rank != trips[0]][:2])
+    if len(pairs) > 1:
+        kicker = max(rank for rank in distinct if rank not in pairs[:2])
+        return (TWO_PAIRS, pairs[0], pairs[1], kicker)
+    if pairs:
+        return (PAIR, pairs[0], *[rank for rank in distinct if rank != pairs[0]][:3])
+    return (HIGH_CARD, *distinct[:5])
+
+
+def _rank_multisets(size):
+    for ranks in combinations(range(13 + size - 1), size):
+        ranks = [rank - idx for idx, rank in enumerate(ranks)]
+        if max(Counter(ranks).values()) <= 4:
+            yield ranks
+
+
+def _flush_suits(size, minimum=5):
+    flush_suits = [-1] * (SUIT_MASK + 1)
+    for clubs in range(size + 1):
+        for diamonds in range(size + 1 - clubs):
+            for hearts in range(size + 1 - clubs - diamonds):
+                counts = [size - clubs - diamonds - hearts, clubs, diamonds, hearts]
+                suit_key = clubs * SUIT_KEYS[1] + diamonds * SUIT_KEYS[2] + hearts * SUIT_KEYS[3]
+                if max(counts) >= minimum:
+                    flush_suits[suit_key] = counts.index(max(counts))
+    return flush_suits
+
+
+def _build_tables():
+    rank_classes = {size: {sum(RANK_KEYS[rank] for rank in ranks): _rank_class(ranks)
+                           for ranks in _rank_multisets(size)}
+                    for size in HAND_SIZES}
+    flush_classes = {mask: _flush_class(mask) for mask in range(1 << 13) if bin(mask).count('1') >= 5}
+    classes = sorted(set(rank_classes[5].values()) | set(flush_classes.values()))
+    strengths = {hand_class: idx + 1 for idx, hand_class in enumerate(classes)}
+    rank_tables = [None] * (max(HAND_SIZES) + 1)
+    for size in HAND_SIZES:
+        rank_tables[size] = {key: strengths[hand_class] for key, hand_class in rank_classes[size].items()}
+    flush_table = [0] * (1 << 13)
+    for mask, hand_class in flush_classes.items():
+        flush_table[mask] = strengths[hand_class]
+    flush_suits = [_flush_suits(size) if size in HAND_SIZES else None for size in range(max(HAND_SIZES) + 1)]
+    category_table = [None] + [hand_class[0] for hand_class in classes]
+    return rank_tables, flush_table, flush_suits, category_table
+
+
+"Lookup tables, built by load_tables() on first use so that importing the module stays cheap."
+RANK_TABLES = FLUSH_TABLE = FLUSH_SUITS = CATEGORY_TABLE = None
+CARD_KEYS_ARRAY = FLUSH_TABLE_ARRAY = CATEGORY_ARRAY = FLUSH_SUITS_ARRAY = None
+_DENSE_RANK_TABLES = {}
+
+
+def load_tables():
+    """
+    Builds the lookup tables (about a second of work). Called automatically by the first evaluation.
+    """
+    global RANK_TABLES, FLUSH_TABLE, FLUSH_SUITS, CATEGORY_TABLE
+    global CARD_KEYS_ARRAY, FLUSH_TABLE_ARRAY, CATEGORY_ARRAY, FLUSH_SUITS_ARRAY
+    if CATEGORY_TABLE is not None:
+        return
+    rank_tables, flush_table, flush_suits, category_table = _build_tables()
+    CARD_KEYS_ARRAY = np.array(CARD_KEYS, dtype=np.int64)
+    FLUSH_TABLE_ARRAY = np.array(flush_table, dtype=np.uint16)
+    CATEGORY_ARRAY = np.array([HIGH_CARD] + category_table[1:], dtype=np.uint8)
+    FLUSH_SUITS_ARRAY = {size: np.array(flush_suits[size], dtype=np.int8) for size in HAND_SIZES}
+    RANK_TABLES, FLUSH_TABLE, FLUSH_SUITS = rank_tables, flush_table, flush_suits
+    CATEGORY_TABLE = category_table
+
+
+def evaluate(cards):
+    """
+    Returns the strength of the best five card hand that can be made from 5, 6 or 7 integer cards.
+
+    Args:
+        cards (list): Five to seven integer cards.
+
+    Returns:
+        int: Hand strength between 1 (7-5-4-3-2 offsuit) and 7462 (royal flush).
+
+    """
+    if CATEGORY_TABLE is None:
+        load_tables()
+    key = 0
+    for card in cards:
+        key += CARD_KEYS[card]
+    suit = FLUSH_SUITS[len(cards)][key & SUIT_MASK]
+    if suit >= 0:
+        mask = 0
+        for card in cards:
+            if card & 3 == suit:
+                mask |= CARD_BITS[card]
+        return FLUSH_TABLE[mask]
+    return RANK_TABLES[len(cards)][key >> SUIT_SHIFT]
+
+
+def evaluate_hand(hand):
+    """
+    Returns the strength of a hand given as Card(rank, suit) namedtuples. See evaluate.
+    """
+    return evaluate([CARD_INDEX[card] for card in hand])
+
+
+def best_five(cards):
+    """
+    Finds the five cards that make up the best hand among 5, 6 or 7 cards.
+    The strength comes straight from evaluate; the combinations are only walked until one of them
+    matches it, so this is meant for displaying the winning hand rather than for comparing hands.
+
+    Args:
+        cards (list): Five to seven integer cards or Card(rank, suit) namedtuples.
+
+    Returns:
+        tuple: (strength, five_cards) where five_cards is a tuple of the same type as cards.
+
+    """
+    encoded = [card if isinstance(card, int) else CARD_INDEX[card] for card in cards]
+    strength = evaluate(encoded)
+    for idx in combinations(range(len(cards)), 5):
+        if evaluate([encoded[i] for i in idx]) == strength:
+            return strength, tuple(cards[i] for i in idx)
+
+
+def category(strength):
+    """
+    Returns the hand category (HIGH_CARD ... ROYAL_FLUSH) of a hand strength.
+    """
+    if CATEGORY_TABLE is None:
+        load_tables()
+    return CATEGORY_TABLE[strength]
+
+
+BATCH_CHUNK = 1 << 18
+
+
+def _dense_rank_table(size):
+    if size not in _DENSE_RANK_TABLES:
+        keys = np.fromiter(RANK_TABLES[size].keys(), dtype=np.int64)
+        table = np.zeros(keys.max() + 1, dtype=np.uint16)
+        table[keys] = np.fromiter(RANK_TABLES[size].values(), dtype=np.uint16)
+        _DENSE_RANK_TABLES[size] = table
+    return _DENSE_RANK_TABLES[size]
+
+
+def _evaluate_chunk(cards, rank_table, flush_suits, flush_table):
+    keys = CARD_KEYS_ARRAY[cards].sum(axis=1)
+    strengths = rank_table[keys >> SUIT_SHIFT]
+    suits = flush_suits[keys & SUIT_MASK]
+    flushes = np.flatnonzero(suits >= 0)
+    if flushes.size:
+        flush_cards = cards[flushes]
+        in_suit = (flush_cards & 3) == suits[flushes, None]
+        masks = np.where(in_suit, np.left_shift(1, flush_cards >> 2), 0).sum(axis=1)
+        strengths[flushes] = flush_table[masks]
+    return strengths
+
+
+def evaluate_batch(cards):
+    """
+    Evaluates many hands at once.
+
+    Example:
+        hands = np.array(list(combinations(range(52), 5)))
+        categories, strengths = evaluate_batch(hands)
+
+    Args:
+        cards (array_like): Integer card array of shape (N, 5), (N, 6) or (N, 7).
+
+    Returns:
+        categories (np.ndarray): uint8 array of shape (N,) with the hand category of each hand.
+        strengths (np.ndarray): uint16 array of shape (N,) with the strength of each hand.
+
+    """
+    load_tables()
+    cards = np.asarray(cards, dtype=np.intp)
+    if cards.ndim != 2 or cards.shape[1] not in HAND_SIZES:
+        raise Exception("Hands must be given as an array of shape (N, 5), (N, 6) or (N, 7).")
+    rank_table = _dense_rank_table(cards.shape[1])
+    flush_suits = FLUSH_SUITS_ARRAY[cards.shape[1]]
+    strengths = np.empty(cards.shape[0], dtype=np.uint16)
+    for start in range(0, cards.shape[0], BATCH_CHUNK):
+        stop = start + BATCH_CHUNK
+        strengths[start:stop] = _evaluate_chunk(cards[start:stop], rank_table, flush_suits, FLUSH_TABLE_ARRAY)
+    return CATEGORY_ARRAY[strengths], strengths
+
+
+def encode_hands(hands):
+    """
+    Converts an iterable of hands made of Card(rank, suit) namedtuples into an integer card array
+    that can be passed to evaluate_batch - e.g. encode_hands(combinations(game.deck, 5)).
+    """
+    return np.array([[CARD_INDEX[card] for card in hand] for hand in hands], dtype=np.intp)
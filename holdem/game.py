@@ -0,0 +1,941 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sat Mar  7 19:05:37 2020
+
+@author: Tudor Dorobantu
+"""
+
+import random
+from array import array
+import numpy as np
+from itertools import chain, combinations
+from collections import namedtuple
+from operator import attrgetter
+from functools import partial
+from . import evaluator, settlement, instrument, variants
+from .hand_state import HandState
+from .state import GameState, CardView, BOARD, POT, STACKS, CURSOR, BOARD_SIZE, SMALL_BLIND, BIG_BLIND, HANDS_PLAYED, FOLDED
+
+class TexasHoldem:
+    """
+        Initializes TexasHoldem Table. Works with Player class.
+        The rules to the game may be found here:
+            https://en.wikipedia.org/wiki/Texas_hold_em
+
+        Example:
+            game = TexasHoldem(['TUDOR', 'ANDREW'], 100, 2)
+            Initializes a TexasHoldem game with two players, 100 chip count for each player
+            and 2 chip big blind limit.
+
+        Constants:
+            RANKS(list): List containing card ranks of a typical standard 52-card deck of French playing cards.
+            Ranks are stored as str type. The rank values are as follows - 'A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K'
+            SUITS(list): List containing card suits of a typical standard 52-card deck of French playing cards.
+            Suits are stored as str type. The suit values are as follows - 'spades', 'clubs', 'diamonds', 'hearts'
+            RANK_NUM(dict): Dictionary containg the int value of each of the face cards - {'A' : 14, 'K': 13, 'Q': 12, 'J': 11}
+            Card(namedtuple): Namedtuple constructor that is used to represent a card in the came e.g. card(rank='8', suit='clubs')
+            represents one card of rank 8 and suit clubs.
+            TRACK_HANDS(bool): If True, every Player.hand keeps a HandState that is updated as cards are dealt,
+            so draw_status() is available after every street.
+            INT_CARDS(bool): If True, deck, community_cards and Player.cards are int cards as encoded by the
+            evaluator module instead of Card namedtuples.
+            VARIANT(Variant): Number of hole cards, deck and hand evaluation of the game; see variants.py.
+            Omaha and ShortDeckHoldem are the same table with another VARIANT.
+
+        Args:
+            players (list): List contatining player names as str type.
+            buy_in (int): Value represeting the chip count of each player at the start of the game.
+            big_blind (int): Big-blind limit.
+            cache (EvaluationCache): Optional cache of showdown strengths shared between tables; see cache.py.
+
+        Attributes:
+            players(list): List contatining player names as str type.
+            buy_in (int): Value represeting the fortune of each player at the start of the game.
+            deck (list): Playing card deck as a list of namedtuples in the format card('rank', 'suit')
+            table(dict): State of all players as dict with format {'name': Player} where Player is the
+            class created by the Player class
+            community_cards(list): List containing cards on Poker Table; initialized as empty list
+            big_blind(int): Big-blind limit.
+            small_blind(int): Small-blind limit; initialized as half the big-blind limit - e.g. if big-blind = 2
+            then small-blind will be initialized with a value of 1.
+            pot(int): Chip count of pot; initialized at 0
+            hands_played(int): Counter to keep track of hands played; initialized at 0.
+            small_blind_player(str): String containing the player name that is designated to place small-blind;
+            initialized as the first entry in the players list.
+            big_blind_player(str): String containing the player name that is designated to place big-blind;
+            initialized as the second entry in the players list.
+            cache (EvaluationCache): Cache used by winner() and the showdown helpers, or None.
+            history (HandHistoryWriter): Hand history the table records to, or None; see history.py.
+            state (GameState): Array-backed state the deck, board, pot, blind buttons and every Player
+            are views of; see state.py. clone(), checkpoint() and undo() copy it in microseconds.
+
+        Returns:
+            None.
+
+        """
+
+    RANKS = ['A', '2', '3', '4', '5', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+    SUITS = ['spades', 'clubs', 'diamonds', 'hearts']
+    RANK_NUM = {'A' : 14, 'K': 13, 'Q': 12, 'J': 11}
+    NUM_RANK = {14 : 'A', 13 : 'K', 12 : 'Q', 11 : 'J'}
+    Card = namedtuple('card', 'rank suit')
+    PlayerFiveCards = namedtuple('PlayerFiveCards', 'player five_cards')
+    ShowdownRank = namedtuple('ShowdownRank', 'strength players')
+    DrawStatus = namedtuple('DrawStatus', 'strength category flush_draw straight_draw outs')
+    TRACK_HANDS = True
+    INT_CARDS = False
+    VARIANT = variants.HOLDEM
+    CARDS = list(map(Card._make, map(evaluator.decode, range(52))))
+
+    def __init__ (self, players, buy_in, big_blind, cache=None):
+        self.players = players
+        self.buy_in = buy_in
+        self.state = GameState(len(players), buy_in, None if self.INT_CARDS else self.CARDS, self.VARIANT.hole_cards)
+        self.table = {name: Player(name, None, self.buy_in, self.state, seat) for seat, name in enumerate(players)}
+        self.seats = {name: seat for seat, name in enumerate(players)}
+        self.big_blind, self.small_blind = big_blind, big_blind/2
+        self.cache = cache
+        self.history = None
+        self.reset_deck()
+
+    @property
+    def deck(self):
+        """
+        Cards left in the deck; the last card is dealt next. Changes to the returned list, e.g. deck.pop(),
+        are written back to state.
+        """
+        return CardView(self.decoded_cards(self.state.remaining_deck()[::-1]), partial(setattr, self, 'deck'))
+
+    @deck.setter
+    def deck(self, cards):
+        self.state.set_deck(self.encoded_cards(cards)[::-1])
+
+    @property
+    def community_cards(self):
+        """
+        Cards on the board. Changes to the returned list, e.g. community_cards.extend(cards), are written back to state.
+        """
+        return CardView(self.decoded_cards(self.state.board()), partial(setattr, self, 'community_cards'))
+
+    @community_cards.setter
+    def community_cards(self, cards):
+        self.state.set_board(self.encoded_cards(cards))
+
+    @property
+    def pot(self):
+        return self.state.chips[POT]
+
+    @pot.setter
+    def pot(self, amount):
+        self.state.chips[POT] = amount
+
+    @property
+    def hands_played(self):
+        return self.state.counters[HANDS_PLAYED]
+
+    @hands_played.setter
+    def hands_played(self, count):
+        self.state.counters[HANDS_PLAYED] = count
+
+    @property
+    def small_blind_player(self):
+        return self.players[self.state.counters[SMALL_BLIND]]
+
+    @small_blind_player.setter
+    def small_blind_player(self, player):
+        self.state.counters[SMALL_BLIND] = self.seats[player]
+
+    @property
+    def big_blind_player(self):
+        return self.players[self.state.counters[BIG_BLIND]]
+
+    @big_blind_player.setter
+    def big_blind_player(self, player):
+        self.state.counters[BIG_BLIND] = self.seats[player]
+
+    def clone(self):
+        """
+        Returns an independent copy of the table, e.g. to search a game tree from the current position.
+        Only the GameState arrays and the HandStates are copied; players, blinds and the cache are shared.
+        The clone records no hand history and is not instrumented.
+
+        Returns:
+            TexasHoldem: Table of the same class in the same state.
+
+        """
+        game = self.__class__.__new__(self.__class__)
+        game.__dict__.update(self.__dict__)
+        instrument.strip(game)
+        game.history = None
+        game.state = self.state.clone()
+        game.table = {}
+        for name, player in self.table.items():
+            game.table[name] = Player(name, None, None, game.state, player.seat)
+            if player.hand is not None:
+                game.table[name].hand = player.hand.copy()
+        return game
+
+    def checkpoint(self):
+        """
+        Saves the state of the table so that undo() can return to it. Checkpoints nest.
+
+        Returns:
+            None.
+
+        """
+        self.state.checkpoint()
+
+    def undo(self):
+        """
+        Returns the table to the most recent checkpoint() and rebuilds the tracked hands.
+
+        Returns:
+            None.
+
+        """
+        self.state.undo()
+        for player in self.table.values():
+            if player.hand is not None:
+                cards = self.state.hole(player.seat)
+                if cards is None:
+                    player.hand = None
+                else:
+                    player.hand.reset(cards + self.state.board())
+
+    def reset_deck(self):
+        """
+        Resets playing card deck to its original format by modyfing deck attribute of the TexasHoldem class.
+        Reshuffle deck after reset!
+
+        Returns:
+            None.
+
+        """
+        self.deck = [self.Card(rank, suit) for rank in self.RANKS for suit in self.SUITS]
+
+    def shuffle_cards(self):
+        """
+        Shuffles deck by modyfing deck attribute of the TexasHoldem class.
+
+        Returns:
+            None.
+
+        """
+        deck = list(self.deck)
+        random.shuffle(deck)
+        self.deck = deck
+
+    def get_cards(self, count):
+        """
+        Returns n cards from the card deck using the pop method.
+        The returned value is a list of namedtumples of format Card('rank', 'suit').
+
+        Args:
+            count (int): Number of cards to be selected from deck.
+
+        Raises:
+            Exception: If count is negative or larger than the number of cards left in the deck.
+
+        Returns:
+            card_set (list): List containing n cards.
+
+        """
+        return self.decoded_cards(self.state.deal(count))
+
+    def deal_players(self):
+        """
+        Deals players VARIANT.hole_cards cards (two in Hold'em) from the deck by modyfing the cards attribute of the player class.
+        The int cards are written straight into the hole cards of each seat in state.
+
+        Returns:
+            None.
+
+        """
+        hole_cards = self.VARIANT.hole_cards
+        for seat, player in enumerate(self.players):
+            cards = self.state.deal(hole_cards)
+            self.state.set_hole(seat, cards)
+            if self.TRACK_HANDS:
+                self.table[player].track_hand(cards)
+        if self.history is not None:
+            self.history.deal(self)
+
+    def deal_board(self, flop):
+        """
+        Deals community cards from the deck by modyfing the community_cards attribute.
+
+        The flop boolean tells the function to deal either three cards (flop = True) or one (flop = False),
+        after burning one card.
+        Args:
+            flop (bool): Boolean used to specify if deal is going to be flop or not
+
+        Returns:
+            None.
+
+        """
+        cards = self.state.deal(4 if flop else 2)[1:]
+        self.state.add_board(cards)
+        self.update_hands(cards)
+        if self.history is not None:
+            self.history.board(self, cards)
+
+    def update_hands(self, cards):
+        """
+        Adds newly dealt community cards to the HandState of every player, in O(1) per card and player.
+
+        Args:
+            cards (list): Int cards of the community cards that were just dealt.
+
+        Returns:
+            None.
+
+        """
+        if not self.TRACK_HANDS:
+            return
+        hands = [self.table[player].hand for player in self.players if self.table[player].hand is not None]
+        for card in cards:
+            for hand in hands:
+                hand.add(card)
+
+    def draw_status(self, player):
+        """
+        Returns the current made hand and draws of a player from their HandState, without re-evaluating the hand.
+
+        Args:
+            player (str): Player name.
+
+        Returns:
+            DrawStatus: DrawStatus('strength', 'category', 'flush_draw', 'straight_draw', 'outs') where strength
+            and category are None before the flop, flush_draw is a suit from SUITS or None, straight_draw lists
+            the ranks that complete a straight and outs lists the unseen cards that improve the hand category.
+
+        """
+        hand = self.table[player].hand
+        flush_suit = hand.flush_draw()
+        return self.DrawStatus(
+            hand.strength(),
+            hand.category(),
+            None if flush_suit is None else evaluator.SUITS[flush_suit],
+            [evaluator.RANKS[rank] for rank in hand.straight_draw()],
+            self.decoded_cards(hand.outs())
+            )
+
+
+    def place_bet(self, player, amount):
+        """
+        Places bet given a player and a chip count. Function modifies the following attributes:
+            Increases Player.bet (int) attribute by amount (Args) value
+            Decreases Player.fortune (int) attribute by amount (Args) value
+            Increases pot (int) attribute by amount (Args) value
+
+        Args:
+            player (str): Player name.
+            amount (int): Chip amount to place as bet.
+
+        Raises:
+            Exception: If player places illegal bet.
+            A bet is considered illegal if it is smaller than the big-blind limit or larger than the
+            players current chip count (fortune).
+
+        Returns:
+            None.
+
+        """
+        if amount > self.table[player].fortune:
+            raise Exception("Action is not possible. Bet is larger than player's chip count.")
+        if amount < self.big_blind:
+            raise Exception("Action is not possible. Please make a bet larger than big blind.")
+        self.pot += amount
+        self.table[player].max_win = self.pot
+        self.table[player].bet += amount
+        self.table[player].fortune += -amount
+        if self.history is not None:
+            self.history.bet(self, player, amount)
+
+    def place_small_blind(self):
+        """
+        Place small-blind bet. Function modifies the following attributes:
+            Increases Player.bet (int) attribute by small_blind value
+            Decreases Player.fortune (int) attribute by small_blind value
+            Increases pot (int) attribute by small_blind value
+
+        Raises:
+            Exception: If player places illegal bet.
+            A bet is considered illegal if small blind player chip count is less than the small blind value.
+
+        Returns:
+            None.
+
+        """
+        if self.small_blind > self.table[self.small_blind_player].fortune:
+            raise Exception("Action is not possible. Bet is larger than player's chip count.")
+        self.table[self.small_blind_player].bet += self.small_blind
+        self.table[self.small_blind_player].fortune += -self.small_blind
+        self.pot += self.small_blind
+        self.table[self.small_blind_player].max_win = self.pot
+        if self.history is not None:
+            self.history.small_blind(self)
+
+    def place_big_blind(self):
+        """
+        Place big-blind bet. Function modifies the following attributes:
+            Increases Player.bet (int) attribute by big_blind value
+            Decreases Player.fortune (int) attribute by big_blind value
+            Increases pot (int) attribute by big_blind value
+
+        Raises:
+            Exception: If player places illegal bet.
+            A bet is considered illegal if big blind player chip count is less than the big blind value.
+
+        Returns:
+            None.
+
+        """
+        if self.big_blind > self.table[self.big_blind_player].fortune:
+            raise Exception("Action is not possible. Bet is larger than player's chip count.")
+        self.table[self.big_blind_player].bet += self.big_blind
+        self.table[self.big_blind_player].fortune += -self.big_blind
+        self.pot += self.big_blind
+        self.table[self.big_blind_player].max_win = self.pot
+        if self.history is not None:
+            self.history.big_blind(self)
+
+    def blinds(self):
+        """
+        Calls place_small_blind and place_big_blind functions.
+
+        Returns:
+            None.
+
+        """
+        self.place_small_blind()
+        self.place_big_blind()
+
+    def set_blind_buttons(self):
+        """
+        Designates small_blind_player and big_blind_player. Uses hands_played attribute to compute index
+        for small_blind_player and big_blind_player attributes.
+
+        Returns:
+            None.
+
+        """
+        small_idx = self.hands_played % len(self.players)
+        big_idx = (self.hands_played + 1) % len(self.players)
+        self.small_blind_player = self.players[small_idx]
+        self.big_blind_player = self.players[big_idx]
+
+    def reset(self):
+        self.__init__(self.players, self.buy_in, self.big_blind, self.cache)
+
+    def print_status(self):
+        print("£" *30, "\n")
+        print(f"TEXAS HOLD'EM with ${self.buy_in} buy-in and ${self.big_blind} big-blind.")
+        print(f"Playing: {self.players}\n")
+        print(f"GAME {self.hands_played}")
+        print("_" *30, "\n")
+        print(f"Cards on Table\n {self.community_cards}\nPot: {self.pot}")
+        print(f"Small Blind: {self.small_blind_player} / Big Blind: {self.big_blind_player}")
+        print("_" *30, "\n")
+        for player in self.players:
+            self.table[player].print_status()
+
+    def get_five_cards(self, player):
+        player_cards = self.table[player].cards
+        all_combs = combinations((player_cards + self.community_cards), r=5)
+        return [self.PlayerFiveCards(player, comb) for comb in all_combs]
+
+    def encoded_cards(self, cards):
+        """
+        Returns the integer encoding used by the evaluator for a list of Card('rank', 'suit') namedtuples.
+        """
+        return evaluator.encode_hand(cards)
+
+    def decoded_cards(self, cards):
+        """
+        Returns the Card('rank', 'suit') namedtuples of a list of integer cards; the inverse of encoded_cards.
+        """
+        return [self.CARDS[card] for card in cards]
+
+    def player_strength(self, player):
+        """
+        Returns the strength of the best hand a player can make from their cards and the community cards.
+        The available cards are evaluated directly by VARIANT.evaluate, without going through get_five_cards.
+
+        Args:
+            player (str): Player name.
+
+        Returns:
+            int: Hand strength, between 1 and 7462 in Hold'em and Omaha.
+
+        """
+        return self.VARIANT.evaluate(self.state.hand(self.seats[player]))
+
+    def best_five_cards(self, player):
+        """
+        Returns the five cards that make up the best hand of a player as PlayerFiveCards('player', 'five_cards').
+        """
+        strength, five_cards = self.VARIANT.best_five(self.state.hand(self.seats[player]))
+        return self.PlayerFiveCards(player, tuple(self.CARDS[card] for card in five_cards))
+
+    def rank_to_number(self, rank):
+        if rank in self.RANK_NUM:
+            return self.RANK_NUM[rank]
+        else:
+            return int(rank)
+
+    def number_to_rank(self, number):
+        if number in self.NUM_RANK:
+            return self.NUM_RANK[number]
+        else:
+            return int(number)
+
+    def one_suit(self, hand):
+        card_suits = [card.suit for card in hand]
+        return len(set(card_suits)) ==  1
+
+    def get_high_card(self, hand):
+        card_rank = [card.rank for card in hand]
+        return max([self.rank_to_number(rank) for rank in card_rank])
+
+    def get_matched_cards(self, hand):
+        RankCount = namedtuple('RankCount', 'count rank')
+        card_rank = [card.rank for card in hand]
+        card_num = [self.rank_to_number(rank) for rank in card_rank]
+        matched_cards = [RankCount(card_num.count(rank), rank) for rank in card_num if card_num.count(rank) > 1]
+        return list(set(matched_cards))
+
+    def get_matched_cards2(self, hand):
+        RankCount = namedtuple('RankCount', 'count rank')
+        card_rank = [card.rank for card in hand]
+        card_num = [self.rank_to_number(rank) for rank in card_rank]
+        matched_cards = [RankCount(card_num.count(rank), rank) for rank in card_num]
+        return list(set(matched_cards))
+
+    def hand_strength(self, hand):
+        """
+        Returns the strength of a five card hand as computed by the lookup-table evaluator of VARIANT.
+        A higher strength is a better hand; equal strengths are tied hands.
+
+        Args:
+            hand (list): Five cards as namedtuples of format Card('rank', 'suit').
+
+        Returns:
+            int: Hand strength, between 1 and 7462 in Hold'em and Omaha.
+
+        """
+        return self.VARIANT.evaluate_five(evaluator.encode_hand(hand))
+
+    def hand_category(self, hand):
+        return self.VARIANT.category(self.hand_strength(hand))
+
+    def pair(self, hand):
+        return self.hand_category(hand) == evaluator.PAIR
+
+    def two_pairs(self, hand):
+        return self.hand_category(hand) == evaluator.TWO_PAIRS
+
+    def three_of_a_kind(self, hand):
+        return self.hand_category(hand) == evaluator.THREE_OF_A_KIND
+
+    def four_of_a_kind(self, hand):
+        return self.hand_category(hand) == evaluator.FOUR_OF_A_KIND
+
+    def flush(self, hand):
+        return self.hand_category(hand) == evaluator.FLUSH
+
+    def is_low_ace_straight(self, hand):
+        card_rank = [card.rank for card in hand]
+        card_num_high_ace = [self.rank_to_number(rank) for rank in card_rank]
+        card_num_low_ace = [1 if card_num == 14 else card_num for card_num in card_num_high_ace]
+        card_num_low_ace.sort()
+        return (np.diff(card_num_low_ace) == 1).all()
+
+    def is_high_ace_straight(self, hand):
+        card_rank = [card.rank for card in hand]
+        card_num_high_ace = [self.rank_to_number(rank) for rank in card_rank]
+        card_num_high_ace.sort()
+        return (np.diff(card_num_high_ace) == 1).all()
+
+    def straight(self, hand):
+        return self.hand_category(hand) == evaluator.STRAIGHT
+
+    def straight_flush(self, hand):
+        return self.hand_category(hand) == evaluator.STRAIGHT_FLUSH
+
+    def full_house(self, hand):
+        return self.hand_category(hand) == evaluator.FULL_HOUSE
+
+    def royal_flush(self, hand):
+        return self.hand_category(hand) == evaluator.ROYAL_FLUSH
+
+    def sort_cards(self, cards):
+        numbered_cards = [self.Card(self.rank_to_number(card.rank), card.suit) for card in cards]
+        numbered_cards.sort(key = attrgetter('rank'), reverse = True)
+        return [self.Card(self.number_to_rank(card.rank), card.suit) for card in numbered_cards]
+
+    def sort_card_count(self, hands):
+        card_count = [self.get_matched_cards2(hand.five_cards) for hand in hands]
+        for card in card_count:
+            card.sort(key=attrgetter('count', 'rank'), reverse=True)
+        return card_count
+
+    def tiebreaker(self, hands):
+        strengths = [self.hand_strength(hand.five_cards) for hand in hands]
+        top_strength = max(strengths)
+        top_hands = [hand for hand, strength in zip(hands, strengths) if strength == top_strength]
+        if len(set(hand.player for hand in top_hands)) == 1:
+            return top_hands[0]
+        else:
+            return 'Tie'
+
+    def highcard_showdown(self):
+        top_rank = self.showdown_ranking()[0]
+        return top_rank.players[0] if len(top_rank.players) == 1 else 'Tie'
+
+    def hole_card_ranks(self, player):
+        """
+        Returns the rank indices ('2' = 0 to 'A' = 12) of a player's hole cards, highest first. Before the
+        flop there is no five card hand, so players are compared by their high card, then their kickers.
+        """
+        return tuple(sorted((card >> 2 for card in self.state.hole(self.seats[player])), reverse=True))
+
+    def showdown_cards (self):
+        available_combs = [self.get_five_cards(player) for player in self.players if not self.table[player].folded]
+        return list(chain.from_iterable(available_combs))
+
+    def showdown_strengths(self, strengths=None):
+        """
+        Returns {'name': strength} for every player that has not folded, through the cache if the table has one.
+        Before the flop the strength is the hole_card_ranks() tuple instead.
+
+        Args:
+            strengths (list): Strengths of those players in seating order when they were already evaluated,
+            e.g. in a batch by the table host; they are used instead of evaluating (and cached on a miss).
+
+        """
+        active = [player for player in self.players if not self.table[player].folded]
+        if self.state.counters[BOARD_SIZE] < 3:
+            return {player: self.hole_card_ranks(player) for player in active}
+        if self.cache is None:
+            if strengths is None:
+                return {player: self.player_strength(player) for player in active}
+            return dict(zip(active, strengths))
+        hands = [self.state.hole(self.seats[player]) for player in active]
+        return dict(zip(active, self.cache.strengths(hands, self.state.board(), self.VARIANT, strengths)))
+
+    def top_showdown_cards(self):
+        if self.state.counters[BOARD_SIZE] < 3:
+            return []
+        strengths = self.showdown_strengths()
+        categories = {player: self.VARIANT.category(strength) for player, strength in strengths.items()}
+        top_category = max(categories.values())
+        return [self.best_five_cards(player) for player, category in categories.items() if category == top_category]
+
+    def showdown_ranking(self, strengths=None):
+        """
+        Ranks every player that has not folded, evaluating each player's hand once.
+
+        Players with equal strength form one tie class. Side pots can be paid out by walking the
+        ranking from the first tie class down, without evaluating any hand again.
+
+        Args:
+            strengths (list): Strengths already evaluated, passed on to showdown_strengths().
+
+        Returns:
+            list: ShowdownRank('strength', 'players') tie classes ordered from best to worst hand,
+            where players is a list of player names in seating order.
+
+        """
+        tie_classes = {}
+        for player, strength in self.showdown_strengths(strengths).items():
+            tie_classes.setdefault(strength, []).append(player)
+        return [self.ShowdownRank(strength, tie_classes[strength]) for strength in sorted(tie_classes, reverse=True)]
+
+    def settle_pot(self, chip=None):
+        """
+        Pays out the pot, including side pots and split pots, from the Player.bet contributions of the hand.
+        Hands are evaluated once through showdown_ranking(); if only one player has not folded they
+        win the pot without a showdown. Odd chips go to the first winners starting from the small-blind seat.
+        Function modifies the following attributes:
+            Increases Player.fortune (int) attribute by the chips won
+            Resets Player.bet, Player.max_win and pot to 0
+
+        Args:
+            chip (float): Smallest chip denomination; 1, or the small blind when it is a fraction of a chip.
+
+        Returns:
+            dict: {'name': chips won} for every player.
+
+        """
+        if chip is None:
+            chip = 1 if self.small_blind == int(self.small_blind) else self.small_blind
+        contributions = {player: self.table[player].bet for player in self.players}
+        folded = [player for player in self.players if self.table[player].folded]
+        active = [player for player in self.players if not self.table[player].folded]
+        if len(active) == 1:
+            ranking = [active]
+        else:
+            ranking = [rank.players for rank in self.showdown_ranking()]
+        button = self.players.index(self.small_blind_player)
+        odd_chip_order = self.players[button:] + self.players[:button]
+        payouts = settlement.settle(contributions, ranking, folded, odd_chip_order, chip)
+        for player, chips in payouts.items():
+            self.table[player].fortune += chips
+            self.table[player].bet = 0
+            self.table[player].max_win = 0
+        self.pot = 0
+        if self.history is not None:
+            self.history.settle(self, payouts)
+        return payouts
+
+    def winner(self, strengths=None):
+        top_rank = self.showdown_ranking(strengths)[0]
+        if len(top_rank.players) > 1:
+            return 'Tie'
+        if self.state.counters[BOARD_SIZE] < 3:
+            return top_rank.players[0]
+        return self.best_five_cards(top_rank.players[0])
+
+class Player:
+    """
+        View of one seat of a table's GameState. Setting an attribute writes it into the state arrays, so
+        cloning or undoing the table also clones or undoes its players.
+
+        Args:
+            name (str): Player name.
+            cards (list): Hole cards, or None.
+            fortune (int): Chip count; ignored when the seat already exists in state.
+            state (GameState): State of the table; a one-seat state is created if None.
+            seat (int): Seat index of the player in state.
+
+        Attributes:
+            hand (HandState): Running evaluation state of the hand when TexasHoldem.TRACK_HANDS is set, or None.
+
+        """
+
+    __slots__ = ('name', 'state', 'seat', 'hand')
+
+    def __init__ (self, name, cards, fortune, state=None, seat=0):
+        self.name = name
+        if state is None:
+            state = GameState(1, fortune, TexasHoldem.CARDS, 2 if cards is None else len(cards))
+        self.state = state
+        self.seat = seat
+        self.hand = None
+        if cards is not None:
+            self.cards = cards
+
+    @property
+    def cards(self):
+        cards = self.state.hole(self.seat)
+        if cards is None or self.state.decode is None:
+            return cards
+        return [self.state.decode[card] for card in cards]
+
+    @cards.setter
+    def cards(self, cards):
+        if cards is not None and self.state.decode is not None:
+            cards = evaluator.encode_hand(cards)
+        self.state.set_hole(self.seat, cards)
+
+    @property
+    def fortune(self):
+        return self.state.chips[STACKS + self.seat]
+
+    @fortune.setter
+    def fortune(self, amount):
+        self.state.chips[STACKS + self.seat] = amount
+
+    @property
+    def bet(self):
+        return self.state.chips[self.state.bets_offset() + self.seat]
+
+    @bet.setter
+    def bet(self, amount):
+        self.state.chips[self.state.bets_offset() + self.seat] = amount
+
+    @property
+    def max_win(self):
+        return self.state.chips[self.state.max_win_offset() + self.seat]
+
+    @max_win.setter
+    def max_win(self, amount):
+        self.state.chips[self.state.max_win_offset() + self.seat] = amount
+
+    @property
+    def folded(self):
+        return bool(self.state.counters[FOLDED + self.seat])
+
+    @folded.setter
+    def folded(self, folded):
+        self.state.counters[FOLDED + self.seat] = folded
+
+    def fold(self):
+        self.folded = True
+
+    def track_hand(self, cards):
+        if self.hand is None:
+            self.hand = HandState(cards)
+        else:
+            self.hand.reset(cards)
+
+    def print_status(self):
+        print(f"{self.name}\nCards: {self.cards}\nFortune: {self.fortune}\nBet: {self.bet}\n")
+        print("-"*30)
+
+class SimulatedTexasHoldem(TexasHoldem):
+    """
+        Headless TexasHoldem table for playing many hands in a simulation loop.
+
+        Cards are ints as encoded by the evaluator module instead of Card namedtuples. Deck orders (of the
+        VARIANT.deck cards) are drawn in blocks of PERMUTATION_BLOCK permutations from a NumPy Generator; each hand reads its
+        permutation through a deal cursor, so reset_deck() only rewinds the cursor and shuffle_cards()
+        moves on to the next pre-generated permutation. Player objects are created once and cleared
+        in place by new_hand(). Clones share the Generator and the current block of permutations. Hand tracking (TRACK_HANDS) is off by default; set it on the instance
+        to use draw_status().
+
+        Example:
+            game = SimulatedTexasHoldem(['TUDOR', 'ANDREW', 'JOHN'], 100, 2, seed=1)
+            for hand in range(1000000):
+                game.new_hand()
+                game.deal_players()
+                game.blinds()
+                game.deal_board(flop=True)
+                game.deal_board(flop=False)
+                game.deal_board(flop=False)
+                game.winner()
+
+        Args:
+            players (list): List contatining player names as str type.
+            buy_in (int): Value represeting the chip count of each player at the start of the game.
+            big_blind (int): Big-blind limit.
+            seed (int): Seed of the NumPy Generator used for shuffling.
+            cache (EvaluationCache): Optional cache of showdown strengths.
+
+        Attributes:
+            deck (list): Current deck order as a list of int cards.
+            cursor (int): Index of the next card to deal from deck.
+            rng (np.random.Generator): Generator the permutations are drawn from.
+
+        """
+
+    PERMUTATION_BLOCK = 4096
+    TRACK_HANDS = False
+    INT_CARDS = True
+
+    def __init__ (self, players, buy_in, big_blind, seed=None, cache=None):
+        super().__init__(players, buy_in, big_blind, cache)
+        self.rng = np.random.default_rng(seed)
+        self.permutations = np.empty((0, 52), dtype=np.int8)
+        self.permutation_idx = 0
+        self.shuffle_cards()
+
+    @property
+    def deck(self):
+        return self.state.cards[BOARD - len(self.VARIANT.deck):BOARD].tolist()
+
+    @deck.setter
+    def deck(self, cards):
+        self.state.set_deck(cards)
+
+    @property
+    def cursor(self):
+        return self.state.counters[CURSOR]
+
+    @cursor.setter
+    def cursor(self, cursor):
+        self.state.counters[CURSOR] = cursor
+
+    def reset_deck(self):
+        self.cursor = BOARD - len(self.VARIANT.deck)
+
+    def shuffle_cards(self):
+        if self.permutation_idx == len(self.permutations):
+            deck = np.array(self.VARIANT.deck, dtype=np.int8)
+            decks = np.broadcast_to(deck, (self.PERMUTATION_BLOCK, deck.size))
+            self.permutations = self.rng.permuted(decks, axis=1)
+            self.permutation_idx = 0
+        start = BOARD - self.permutations.shape[1]
+        self.state.cards[start:BOARD] = array('b', self.permutations[self.permutation_idx].tobytes())
+        self.permutation_idx += 1
+        self.cursor = start
+
+    def encoded_cards(self, cards):
+        return cards
+
+    def decoded_cards(self, cards):
+        return cards
+
+    def new_hand(self):
+        """
+        Starts the next hand: clears bets, folds and the board in place, moves the blind buttons
+        and shuffles.
+
+        Returns:
+            None.
+
+        """
+        self.state.clear_hand()
+        self.hands_played += 1
+        self.set_blind_buttons()
+        self.shuffle_cards()
+
+    def reset(self):
+        for player in self.table.values():
+            player.cards = None
+            player.fortune = self.buy_in
+        self.new_hand()
+        self.hands_played = 0
+        self.set_blind_buttons()
+
+class Omaha(TexasHoldem):
+    """
+        Omaha table: every player is dealt four hole cards and must use exactly two of them with exactly
+        three community cards. Showdowns use the Omaha board tables of variants.py, so a hand costs six
+        table lookups and a flush check instead of evaluating its 60 five card combinations.
+        Hand tracking (TRACK_HANDS, draw_status()) is not available.
+
+        Example:
+            game = Omaha(['TUDOR', 'ANDREW'], 100, 2)
+
+        """
+
+    VARIANT = variants.OMAHA
+    TRACK_HANDS = False
+
+    def get_five_cards(self, player):
+        player_cards = self.table[player].cards
+        all_combs = (pair + triple for pair in combinations(player_cards, 2)
+                     for triple in combinations(self.community_cards, 3))
+        return [self.PlayerFiveCards(player, comb) for comb in all_combs]
+
+class ShortDeckHoldem(TexasHoldem):
+    """
+        6+ short-deck Hold'em table: the 2s to 5s are removed from the deck, a flush beats a full house
+        and A-6-7-8-9 is the lowest straight. Hands are evaluated with the short-deck tables of
+        variants.py. Hand tracking (TRACK_HANDS, draw_status()) is not available.
+
+        Example:
+            game = ShortDeckHoldem(['TUDOR', 'ANDREW'], 100, 2)
+
+        """
+
+    RANKS = ['A', '6', '7', '8', '9', '10', 'J', 'Q', 'K']
+    VARIANT = variants.SHORT_DECK
+    TRACK_HANDS = False
+
+class SimulatedOmaha(SimulatedTexasHoldem):
+    """
+        Headless Omaha table for simulation loops; see SimulatedTexasHoldem and Omaha.
+        """
+
+    VARIANT = variants.OMAHA
+    get_five_cards = Omaha.get_five_cards
+
+class SimulatedShortDeckHoldem(SimulatedTexasHoldem):
+    """
+        Headless short-deck table for simulation loops; see SimulatedTexasHoldem and ShortDeckHoldem.
+        """
+
+    VARIANT = variants.SHORT_DECK
@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+"""
+Incremental evaluation state of one player's hand.
+
+The state is updated in O(1) per dealt card: rank and suit counts, the rank bitmask (used for
+straights), the per-suit rank bitmasks (used for flushes) and the summed evaluator key of the cards.
+The made-hand strength is then a single table lookup after every street, and flush draws, straight
+draws and outs are derived from the same state.
+"""
+
+from . import evaluator
+
+
+class HandState:
+    """
+        Running evaluation state of a player's hole cards and the community cards dealt so far.
+
+        Args:
+            cards (list): Integer cards to start from, usually the two hole cards.
+
+        Attributes:
+            cards (list): Integer cards added so far.
+            rank_counts (list): Number of cards of each rank, indexed from '2' to 'A'.
+            suit_counts (list): Number of cards of each suit, indexed like TexasHoldem.SUITS.
+            rank_mask (int): Bitmask of the ranks present.
+            suit_masks (list): Bitmask of the ranks present in each suit.
+            key (int): Sum of the evaluator keys of the cards.
+
+        """
+
+    __slots__ = ('cards', 'rank_counts', 'suit_counts', 'rank_mask', 'suit_masks', 'key', '_outs')
+
+    def __init__(self, cards=()):
+        self.reset(cards)
+
+    def reset(self, cards=()):
+        self.cards = []
+        self.rank_counts = [0] * 13
+        self.suit_counts = [0] * 4
+        self.rank_mask = 0
+        self.suit_masks = [0] * 4
+        self.key = 0
+        self._outs = None
+        for card in cards:
+            self.add(card)
+
+    def copy(self):
+        """
+        Returns an independent copy of the state, used when a table is cloned.
+        """
+        state = HandState.__new__(HandState)
+        state.cards = self.cards[:]
+        state.rank_counts = self.rank_counts[:]
+        state.suit_counts = self.suit_counts[:]
+        state.rank_mask = self.rank_mask
+        state.suit_masks = self.suit_masks[:]
+        state.key = self.key
+        state._outs = self._outs
+        return state
+
+    def add(self, card):
+        rank, suit = card >> 2, card & 3
+        self.cards.append(card)
+        self.rank_counts[rank] += 1
+        self.suit_counts[suit] += 1
+        self.rank_mask |= 1 << rank
+        self.suit_masks[suit] |= 1 << rank
+        self.key += evaluator.CARD_KEYS[card]
+        self._outs = None
+
+    def strength(self):
+        """
+        Returns the strength of the made hand, or None before five cards are known.
+        """
+        size = len(self.cards)
+        if size < 5:
+            return None
+        if evaluator.CATEGORY_TABLE is None:
+            evaluator.load_tables()
+        suit = evaluator.FLUSH_SUITS[size][self.key & evaluator.SUIT_MASK]
+        if suit >= 0:
+            return evaluator.FLUSH_TABLE[self.suit_masks[suit]]
+        return evaluator.RANK_TABLES[size][self.key >> evaluator.SUIT_SHIFT]
+
+    def category(self):
+        strength = self.strength()
+        return None if strength is None else evaluator.category(strength)
+
+    def flush_draw(self):
+        """
+        Returns the suit index with exactly four cards (a flush draw), or None. There are no draws on the river.
+        """
+        if len(self.cards) >= 7:
+            return None
+        for suit, count in enumerate(self.suit_counts):
+            if count == 4:
+                return suit
+        return None
+
+    def straight_draw(self):
+        """
+        Returns the ranks that would complete a straight, highest first: two ranks for an open-ended
+        draw, one for a gutshot, none if there is no draw. Once a straight is made, only ranks that
+        complete a higher straight count, e.g. the 6 to a made wheel.
+        """
+        if len(self.cards) >= 7:
+            return []
+        made = -1
+        draws = []
+        for high, mask in evaluator.STRAIGHT_MASKS:
+            missing = mask & ~self.rank_mask
+            if not missing:
+                made = max(made, high)
+            elif missing & (missing - 1) == 0:
+                draws.append((high, missing.bit_length() - 1))
+        return sorted({rank for high, rank in draws if high > made}, reverse=True)
+
+    def outs(self, dead_cards=()):
+        """
+        Returns the unseen integer cards that would improve the hand to a better category on the next
+        card, e.g. the flush cards of a flush draw or the cards that pair a high card. Results without
+        dead cards are cached until the next card is added.
+
+        Args:
+            dead_cards (iterable): Further integer cards known not to come, e.g. folded hands.
+
+        Returns:
+            list: Integer cards, in deck order. Empty before the flop and on the river.
+
+        """
+        if self._outs is not None and not dead_cards:
+            return self._outs
+        size = len(self.cards)
+        if size < 5 or size >= 7:
+            return []
+        current = evaluator.category(self.strength())
+        seen = set(self.cards) | set(dead_cards)
+        flush_suits = evaluator.FLUSH_SUITS[size + 1]
+        outs = []
+        for card in range(52):
+            if card in seen:
+                continue
+            key = self.key + evaluator.CARD_KEYS[card]
+            suit = flush_suits[key & evaluator.SUIT_MASK]
+            if suit >= 0:
+                mask = self.suit_masks[suit] | (evaluator.CARD_BITS[card] if card & 3 == suit else 0)
+                strength = evaluator.FLUSH_TABLE[mask]
+            else:
+                strength = evaluator.RANK_TABLES[size + 1][key >> evaluator.SUIT_SHIFT]
+            if evaluator.CATEGORY_TABLE[strength] > current:
+                outs.append(card)
+        if not dead_cards:
+            self._outs = outs
+        return outs
@@ -0,0 +1,424 @@
+# -*- coding: utf-8 -*-
+"""
+Append-only binary hand history.
+
+A HandHistoryWriter attached to a table records every hand as it is played: the blind buttons and
+hole cards from deal_players(), place_small_blind(), place_big_blind() (also when called by blinds())
+and place_bet() in the order they happened, each board card from deal_board() and the payouts from
+settle_pot(). Player.fold() does not call the writer: a fold is written just before the next recorded
+action of the hand, so it keeps its place among the bets and board cards, but several folds between
+two recorded actions are written in seat order. A six-handed hand takes about 40 bytes.
+
+File layout (little-endian):
+    header: MAGIC, u32 length, JSON {"players", "buy_in", "big_blind", "unit", "hole_cards"}
+    record per hand: varint body length, then
+        u8 small-blind seat << 4 | big-blind seat
+        u8 flags (SETTLED if the hand reached settle_pot)
+        hole_cards (2 in Hold'em, 4 in Omaha) hole cards per seat as int cards
+        varint event count, then events:
+            BLINDS              one byte (both blinds; only in histories written by earlier versions)
+            BET                 one byte (kind << 4 | seat) and a varint amount in units
+            FOLD                one byte (kind << 4 | seat)
+            BOARD               one byte (kind << 4 | card count) and the cards
+            SMALL_BLIND         one byte
+            BIG_BLIND           one byte
+        if SETTLED: a varint payout in units per seat
+
+Chip amounts are stored as varints of amount / unit, where unit defaults to 1 chip (or the small
+blind when it is a fraction of a chip). Histories written before "hole_cards" was added to the header
+hold 2 per seat. Hole cards sit at a fixed offset of every record, so
+HandHistory.hole_cards() reads all of them from the memory map with one NumPy gather.
+
+Example:
+    writer = HandHistoryWriter('session.thh', game)
+    ... play hands ...
+    writer.close()
+
+    history = HandHistory('session.thh')
+    for hand in history:
+        ...
+    game = history.rebuild(1000, step=4)
+"""
+
+import json
+import mmap
+import os
+import struct
+from array import array
+from collections import namedtuple
+import numpy as np
+
+from .game import TexasHoldem
+
+MAGIC = b'THHH0001'
+HEADER_LENGTH = struct.Struct('<I')
+BLINDS, BET, FOLD, BOARD, SMALL_BLIND, BIG_BLIND = range(6)
+EVENT_NAMES = ['blinds', 'bet', 'fold', 'board', 'small_blind', 'big_blind']
+SETTLED = 1
+MAX_SEATS = 16
+CHECKPOINT_EVERY = 4096
+
+Event = namedtuple('Event', 'kind seat amount cards')
+Hand = namedtuple('Hand', 'index small_blind big_blind hole_cards events board payouts')
+
+
+def _write_varint(buffer, value):
+    while value >= 0x80:
+        buffer.append(value & 0x7f | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+def _read_header(data):
+    if data[:len(MAGIC)] != MAGIC:
+        raise Exception("File is not a hand history.")
+    size, = HEADER_LENGTH.unpack_from(data, len(MAGIC))
+    start = len(MAGIC) + HEADER_LENGTH.size
+    return json.loads(bytes(data[start:start + size])), start + size
+
+
+class HandHistoryWriter:
+    """
+        Records the hands of one table to an append-only file. The writer attaches itself to the game
+        (game.history) and TexasHoldem calls it from deal_players, place_small_blind, place_big_blind,
+        place_bet, deal_board and settle_pot. Folds are picked up from the folded flags at the next recorded action. A hand that
+        is dealt again before settle_pot is stored without payouts; game.reset() detaches the writer.
+
+        Args:
+            path (str): File to append to; created with a header if missing.
+            game (TexasHoldem): Table to record.
+            unit (float): Chip amount stored as 1; bets and payouts must be multiples of it.
+
+        """
+
+    def __init__(self, path, game, unit=None):
+        if len(game.players) > MAX_SEATS:
+            raise Exception(f"Action is not possible. Hand histories hold at most {MAX_SEATS} seats.")
+        if unit is None:
+            unit = 1 if game.small_blind == int(game.small_blind) else game.small_blind
+        self.header = {'players': list(game.players), 'buy_in': game.buy_in, 'big_blind': game.big_blind,
+                       'unit': unit, 'hole_cards': game.VARIANT.hole_cards}
+        self.unit = unit
+        self.seats = len(game.players)
+        if os.path.exists(path) and os.path.getsize(path):
+            with open(path, 'rb') as file:
+                header, _ = _read_header(file.read(1 << 16))
+            if dict({'hole_cards': 2}, **header) != self.header:
+                raise Exception("Action is not possible. File holds the history of a different table.")
+            self.file = open(path, 'ab')
+        else:
+            self.file = open(path, 'ab')
+            encoded = json.dumps(self.header).encode()
+            self.file.write(MAGIC + HEADER_LENGTH.pack(len(encoded)) + encoded)
+        self.hand = None
+        self.events = None
+        self.event_count = 0
+        self.folded = None
+        self.game = game
+        game.history = self
+
+    def _units(self, amount):
+        units = amount / self.unit
+        if units != int(units) or units < 0:
+            raise Exception(f"Action is not possible. {amount} is not a multiple of the history unit {self.unit}.")
+        return int(units)
+
+    def _folds(self, game):
+        for seat, player in enumerate(game.players):
+            if game.table[player].folded and not self.folded[seat]:
+                self.folded[seat] = True
+                self.events.append(FOLD << 4 | seat)
+                self.event_count += 1
+
+    def _event(self, game, kind, arg):
+        self._folds(game)
+        self.events.append(kind << 4 | arg)
+        self.event_count += 1
+
+    def deal(self, game):
+        if self.hand is not None:
+            self._finish(None)
+        self.hand = bytearray((game.players.index(game.small_blind_player) << 4
+                               | game.players.index(game.big_blind_player), 0))
+        for seat in range(self.seats):
+            self.hand.extend(card & 0xff for card in game.state.hole(seat))
+        self.events = bytearray()
+        self.event_count = 0
+        self.folded = [game.table[player].folded for player in game.players]
+
+    def small_blind(self, game):
+        if self.hand is not None:
+            self._event(game, SMALL_BLIND, 0)
+
+    def big_blind(self, game):
+        if self.hand is not None:
+            self._event(game, BIG_BLIND, 0)
+
+    def bet(self, game, player, amount):
+        if self.hand is not None:
+            self._event(game, BET, game.players.index(player))
+            _write_varint(self.events, self._units(amount))
+
+    def board(self, game, cards):
+        if self.hand is not None:
+            self._event(game, BOARD, len(cards))
+            self.events.extend(cards)
+
+    def settle(self, game, payouts):
+        if self.hand is not None:
+            self._folds(game)
+            self._finish([payouts.get(player, 0) for player in game.players])
+
+    def _finish(self, payouts):
+        body = self.hand
+        _write_varint(body, self.event_count)
+        body.extend(self.events)
+        if payouts is not None:
+            body[1] |= SETTLED
+            for amount in payouts:
+                _write_varint(body, self._units(amount))
+        record = bytearray()
+        _write_varint(record, len(body))
+        self.file.write(record + body)
+        self.hand = None
+
+    def flush(self):
+        self.file.flush()
+
+    def close(self):
+        """
+        Writes out the records and detaches from the game. An unsettled hand in progress is not written.
+        """
+        if self.game.history is self:
+            self.game.history = None
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class HandHistory:
+    """
+        Memory-mapped reader of a hand history file. Records are decoded only when accessed; the offsets
+        of all records are found in one pass on first use. A truncated last record is ignored.
+
+        Args:
+            path (str): Hand history file.
+
+        Attributes:
+            players (list): Player names in seat order.
+            buy_in (int): Starting stack of every seat.
+            big_blind (int): Big-blind limit.
+            unit (float): Chip amount of one stored unit.
+            hole_size (int): Hole cards per seat.
+
+        """
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        header, self.start = _read_header(self.data)
+        self.players = header['players']
+        self.buy_in = header['buy_in']
+        self.big_blind = header['big_blind']
+        self.unit = header['unit']
+        self.hole_size = header.get('hole_cards', 2)
+        self.seats = len(self.players)
+        self._offsets = None
+        self._stacks = {0: [self.buy_in] * self.seats}
+
+    def close(self):
+        self.data.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def offsets(self):
+        """
+        Start of the body of every record, as array('q'), followed by the end of the last one.
+        """
+        if self._offsets is None:
+            offsets = array('q')
+            data, pos, end = self.data, self.start, len(self.data)
+            while pos < end:
+                length, body = _read_varint(data, pos)
+                if body + length > end:
+                    break
+                offsets.append(body)
+                pos = body + length
+            offsets.append(pos)
+            self._offsets = offsets
+        return self._offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _amount(self, units):
+        amount = units * self.unit
+        return int(amount) if amount == int(amount) else amount
+
+    def __getitem__(self, index):
+        """
+        Decodes hand index into a Hand('index', 'small_blind', 'big_blind', 'hole_cards', 'events',
+        'board', 'payouts'); seats are indices into players, cards are ints and payouts is None for an
+        unsettled hand.
+        """
+        if index < 0:
+            index += len(self)
+        offsets = self.offsets
+        data = self.data[offsets[index]:offsets[index + 1]]
+        buttons, flags = data[0], data[1]
+        pos = 2
+        size = self.hole_size
+        hole_cards = [list(data[pos + size * seat:pos + size * (seat + 1)]) for seat in range(self.seats)]
+        pos += size * self.seats
+        count, pos = _read_varint(data, pos)
+        events, board = [], []
+        for _ in range(count):
+            kind, arg = data[pos] >> 4, data[pos] & 0xf
+            pos += 1
+            if kind == BET:
+                units, pos = _read_varint(data, pos)
+                events.append(Event(BET, arg, self._amount(units), None))
+            elif kind == BOARD:
+                cards = list(data[pos:pos + arg])
+                pos += arg
+                board.extend(cards)
+                events.append(Event(BOARD, None, None, cards))
+            elif kind == FOLD:
+                events.append(Event(FOLD, arg, None, None))
+            else:
+                events.append(Event(kind, None, None, None))
+        payouts = None
+        if flags & SETTLED:
+            payouts = []
+            for _ in range(self.seats):
+                units, pos = _read_varint(data, pos)
+                payouts.append(self._amount(units))
+        return Hand(index, buttons >> 4, buttons & 0xf, hole_cards, events, board, payouts)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self[index]
+
+    def select(self, predicate):
+        """
+        Yields the hands for which predicate(hand) is true.
+        """
+        for hand in self:
+            if predicate(hand):
+                yield hand
+
+    def hole_cards(self):
+        """
+        Returns the hole cards of every hand as an int8 array of shape (hands, seats, hole_size), read straight
+        from the memory map. Useful to pick out hands before decoding them, e.g.
+        np.flatnonzero((history.hole_cards()[:, 0] >> 2 == 12).all(axis=1)) for the hands seat 0 held aces.
+        """
+        raw = np.frombuffer(self.data, dtype=np.uint8)
+        idx = np.asarray(self.offsets[:-1], dtype=np.int64)[:, None] + 2 + np.arange(self.hole_size * self.seats)
+        return raw[idx].reshape(-1, self.seats, self.hole_size).astype(np.int8)
+
+    def _contributions(self, hand):
+        contributions = [0] * self.seats
+        for event in hand.events:
+            if event.kind in (BLINDS, SMALL_BLIND):
+                contributions[hand.small_blind] += self.big_blind / 2
+            if event.kind in (BLINDS, BIG_BLIND):
+                contributions[hand.big_blind] += self.big_blind
+            elif event.kind == BET:
+                contributions[event.seat] += event.amount
+        return contributions
+
+    def stacks(self, index):
+        """
+        Returns the stack of every seat at the start of hand index, replaying the chips bet and won in
+        the hands before it. Stacks are remembered every CHECKPOINT_EVERY hands.
+        """
+        start = max(known for known in self._stacks if known <= index)
+        stacks = list(self._stacks[start])
+        for position in range(start, index):
+            hand = self[position]
+            payouts = hand.payouts or [0] * self.seats
+            for seat, (bet, won) in enumerate(zip(self._contributions(hand), payouts)):
+                stacks[seat] += won - bet
+            if (position + 1) % CHECKPOINT_EVERY == 0:
+                self._stacks[position + 1] = list(stacks)
+        return stacks
+
+    def rebuild(self, index, step=None, game_class=TexasHoldem):
+        """
+        Rebuilds the table as it was during hand index, after its first step events (after the whole
+        hand, including settle_pot for a settled hand, if step is None). Events are replayed through
+        the blinds, place_bet, fold and deal_board, so the rebuilt game can keep playing the hand: the
+        deck is ordered to deal the recorded board next.
+
+        Args:
+            index (int): Hand index.
+            step (int): Number of events to replay.
+            game_class (type): TexasHoldem or a subclass of the variant the history was recorded with.
+
+        Returns:
+            TexasHoldem: The rebuilt table.
+
+        """
+        hand = self[index]
+        if game_class.VARIANT.hole_cards != self.hole_size:
+            raise Exception(f"Action is not possible. The history holds {self.hole_size} hole cards per seat, "
+                            f"{game_class.__name__} deals {game_class.VARIANT.hole_cards}.")
+        game = game_class(self.players, self.buy_in, self.big_blind)
+        for player, stack in zip(self.players, self.stacks(index)):
+            game.table[player].fortune = stack
+        game.hands_played = index
+        game.small_blind_player = self.players[hand.small_blind]
+        game.big_blind_player = self.players[hand.big_blind]
+        seen = set(hand.board)
+        for seat, cards in enumerate(hand.hole_cards):
+            game.state.set_hole(seat, cards)
+            seen.update(cards)
+        unseen = [card for card in game.VARIANT.deck if card not in seen]
+        burns = unseen[-3:]
+        order = []
+        for street, event in enumerate(event for event in hand.events if event.kind == BOARD):
+            order.append(burns[street])
+            order.extend(event.cards)
+        game.state.set_deck(order + [card for card in unseen if card not in order])
+        if game.TRACK_HANDS:
+            for player, cards in zip(self.players, hand.hole_cards):
+                game.table[player].track_hand(cards)
+        events = hand.events if step is None else hand.events[:step]
+        for event in events:
+            if event.kind == BLINDS:
+                game.blinds()
+            elif event.kind == SMALL_BLIND:
+                game.place_small_blind()
+            elif event.kind == BIG_BLIND:
+                game.place_big_blind()
+            elif event.kind == BET:
+                game.place_bet(self.players[event.seat], event.amount)
+            elif event.kind == FOLD:
+                game.table[self.players[event.seat]].fold()
+            else:
+                game.deal_board(flop=len(event.cards) == 3)
+        if step is None and hand.payouts is not None:
+            game.settle_pot()
+        return game
@@ -0,0 +1,339 @@
+# -*- coding: utf-8 -*-
+"""
+Asyncio host running many TexasHoldem tables in one process.
+
+Bots and players submit actions - blinds, bets, folds, deals and showdowns - to a TableHost, either
+in-process through submit() or over a local socket through serve(). Every action goes through one
+bounded queue that a single task drains tick by tick, so tables need no thread or lock of their own:
+
+    - Backpressure: submit() waits while the queue is full; submit_nowait() raises asyncio.QueueFull.
+    - Timeouts: an action that is not applied within its timeout raises asyncio.TimeoutError for the
+      submitter and is dropped unapplied when the host reaches it.
+    - Batched showdowns: the river showdowns of all tables in one tick are evaluated with a single
+      evaluate_batch call per game variant (Hold'em, Omaha, short deck).
+    - Latency: the time from submit to result is recorded per action type; see latency_percentiles().
+
+Example:
+    async def main():
+        host = TableHost()
+        task = asyncio.create_task(host.run())
+        host.open_table('t1', ['TUDOR', 'ANDREW'], 100, 2)
+        await host.submit('t1', 'deal')
+        await host.submit('t1', 'blinds')
+        await host.submit('t1', 'bet', 'TUDOR', 2)
+        for street in ('flop', 'turn', 'river'):
+            await host.submit('t1', street)
+        print(await host.submit('t1', 'showdown'))
+        host.stop()
+        await task
+
+The socket protocol is one JSON object per line, answered by one JSON line:
+    {"table": "t1", "action": "bet", "player": "TUDOR", "amount": 2}
+    {"ok": true, "result": null}
+"""
+
+import asyncio
+import json
+import time
+from collections import deque, namedtuple
+import numpy as np
+
+from .game import TexasHoldem
+from .state import BOARD_SIZE
+
+Action = namedtuple('Action', 'table kind player amount future submitted')
+
+QUEUE_SIZE = 10000
+ACTION_TIMEOUT = 5.0
+MAX_TICK = 4096
+LATENCY_SAMPLES = 100000
+
+
+def _new_hand(game):
+    game.state.clear_hand()
+    game.reset_deck()
+    game.shuffle_cards()
+    game.deal_players()
+
+
+def _settle(game):
+    payouts = game.settle_pot()
+    game.hands_played += 1
+    return payouts
+
+
+ACTIONS = {
+    'buttons': lambda game, player, amount: game.set_blind_buttons(),
+    'blinds': lambda game, player, amount: game.blinds(),
+    'deal': lambda game, player, amount: _new_hand(game),
+    'flop': lambda game, player, amount: game.deal_board(flop=True),
+    'turn': lambda game, player, amount: game.deal_board(flop=False),
+    'river': lambda game, player, amount: game.deal_board(flop=False),
+    'bet': lambda game, player, amount: game.place_bet(player, amount),
+    'fold': lambda game, player, amount: game.table[player].fold(),
+    'showdown': lambda game, player, amount: game.winner(),
+    'settle': lambda game, player, amount: _settle(game),
+    }
+
+
+class TableHost:
+    """
+        Runs any number of tables from a single asyncio task.
+
+        Args:
+            queue_size (int): Number of pending actions after which submitters wait.
+            timeout (float): Default per-action timeout in seconds, or None for no timeout.
+            game_class (type): TexasHoldem or a subclass such as SimulatedTexasHoldem.
+
+        Attributes:
+            tables (dict): {table id: game}.
+            latencies (dict): {action type: deque of submit-to-result times in seconds}.
+            timeouts (dict): {action type: number of actions that timed out}.
+            ticks (int): Number of ticks run.
+            batched_showdowns (int): Number of showdowns evaluated in batches.
+
+        """
+
+    def __init__(self, queue_size=QUEUE_SIZE, timeout=ACTION_TIMEOUT, game_class=TexasHoldem):
+        self.queue = asyncio.Queue(queue_size)
+        self.timeout = timeout
+        self.game_class = game_class
+        self.tables = {}
+        self.latencies = {kind: deque(maxlen=LATENCY_SAMPLES) for kind in ACTIONS}
+        self.timeouts = dict.fromkeys(ACTIONS, 0)
+        self.ticks = 0
+        self.batched_showdowns = 0
+        self.running = False
+
+    def open_table(self, table, players, buy_in, big_blind, **kwargs):
+        """
+        Seats a new table; extra keyword arguments are passed to game_class.
+        """
+        if table in self.tables:
+            raise Exception("Action is not possible. Table is already open.")
+        self.tables[table] = self.game_class(players, buy_in, big_blind, **kwargs)
+        return self.tables[table]
+
+    def close_table(self, table):
+        return self.tables.pop(table)
+
+    def _action(self, table, kind, player, amount):
+        if kind not in ACTIONS:
+            raise Exception(f"Action is not possible. Unknown action {kind!r}.")
+        if table not in self.tables:
+            raise Exception(f"Action is not possible. Unknown table {table!r}.")
+        return Action(table, kind, player, amount, asyncio.get_running_loop().create_future(), time.perf_counter())
+
+    async def submit(self, table, kind, player=None, amount=None, timeout=-1):
+        """
+        Queues an action and returns its result: the return value of the TexasHoldem method it drives,
+        e.g. the winner for 'showdown' and the payouts for 'settle'.
+
+        Args:
+            table: Table id.
+            kind (str): One of ACTIONS.
+            player (str): Player name for 'bet' and 'fold'.
+            amount (int): Chips for 'bet'.
+            timeout (float): Seconds to wait, including the wait for queue space; the host default if -1.
+
+        Raises:
+            asyncio.TimeoutError: If the action was not applied in time; it will not be applied later.
+            Exception: If the action is illegal, as raised by TexasHoldem.
+
+        """
+        action = self._action(table, kind, player, amount)
+        timeout = self.timeout if timeout == -1 else timeout
+        try:
+            return await asyncio.wait_for(self._enqueue(action), timeout)
+        except asyncio.TimeoutError:
+            self.timeouts[kind] += 1
+            raise
+
+    async def _enqueue(self, action):
+        await self.queue.put(action)
+        return await action.future
+
+    def submit_nowait(self, table, kind, player=None, amount=None):
+        """
+        Queues an action without waiting for queue space and returns the future of its result.
+
+        Raises:
+            asyncio.QueueFull: If the host is behind by queue_size actions.
+
+        """
+        action = self._action(table, kind, player, amount)
+        self.queue.put_nowait(action)
+        return action.future
+
+    def _resolve(self, action, result=None, error=None):
+        if action.future.done():
+            return
+        if error is None:
+            action.future.set_result(result)
+        else:
+            action.future.set_exception(error)
+        self.latencies[action.kind].append(time.perf_counter() - action.submitted)
+
+    def _showdowns(self, actions):
+        """
+        Resolves the showdowns of one tick. Tables with a full board are evaluated together, one
+        evaluate_batch call per game variant, and each table's strengths are then passed to its winner(),
+        so cached strengths, instrumentation and any overridden showdown method see batched showdowns too.
+        Earlier showdowns call winner() without strengths.
+        """
+        variants = {}
+        for action in actions:
+            game = self.tables[action.table]
+            if game.state.counters[BOARD_SIZE] < 5:
+                try:
+                    self._resolve(action, game.winner())
+                except Exception as error:
+                    self._resolve(action, error=error)
+                continue
+            active = [seat for seat, player in enumerate(game.players) if not game.table[player].folded]
+            variant, river, hands = variants.setdefault(game.VARIANT.name, (game.VARIANT, [], []))
+            river.append((action, active))
+            hands.extend(game.state.hand(seat) for seat in active)
+        for variant, river, hands in variants.values():
+            try:
+                categories, strengths = variant.evaluate_batch(hands)
+            except Exception as error:
+                for action, active in river:
+                    self._resolve(action, error=error)
+                continue
+            strengths = strengths.tolist()
+            idx = 0
+            for action, active in river:
+                table_strengths = strengths[idx:idx + len(active)]
+                idx += len(active)
+                try:
+                    result = self.tables[action.table].winner(table_strengths)
+                except Exception as error:
+                    self._resolve(action, error=error)
+                else:
+                    self._resolve(action, result)
+            self.batched_showdowns += len(river)
+
+    def tick(self, actions):
+        """
+        Applies a batch of actions in queue order. Showdowns are held back and evaluated together at the
+        end of the tick, unless a later action of the same table needs the showdown resolved first.
+        """
+        showdowns = {}
+        for action in actions:
+            if action.future.done():
+                continue
+            if action.kind == 'showdown':
+                showdowns.setdefault(action.table, []).append(action)
+                continue
+            if action.table in showdowns:
+                self._showdowns(showdowns.pop(action.table))
+            try:
+                self._resolve(action, ACTIONS[action.kind](self.tables[action.table], action.player, action.amount))
+            except Exception as error:
+                self._resolve(action, error=error)
+        self._showdowns([action for table_actions in showdowns.values() for action in table_actions])
+        self.ticks += 1
+
+    async def run(self):
+        """
+        Drains the queue until stop() is called: every tick takes whatever is queued, up to MAX_TICK actions.
+        An unexpected error in a tick is raised to the submitters of that tick's unresolved actions; the
+        host keeps running. Actions still queued when it stops are resolved with an Exception.
+        """
+        self.running = True
+        while self.running:
+            actions = [await self.queue.get()]
+            while len(actions) < MAX_TICK and not self.queue.empty():
+                actions.append(self.queue.get_nowait())
+            actions = [action for action in actions if action is not None]
+            try:
+                self.tick(actions)
+            except Exception as error:
+                for action in actions:
+                    self._resolve(action, error=error)
+        self._drain()
+
+    def stop(self):
+        """
+        Stops run() after the current tick. Actions still queued are not applied: their submitters get
+        an Exception instead of waiting for a result that will never come.
+        """
+        self.running = False
+        self._drain()
+        self.queue.put_nowait(None)
+
+    def _drain(self):
+        error = Exception("Action is not possible. The table host was stopped.")
+        while not self.queue.empty():
+            action = self.queue.get_nowait()
+            if action is not None:
+                self._resolve(action, error=error)
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)):
+        """
+        Returns {action type: {percentile: seconds}} for the action types seen so far.
+        """
+        return {kind: dict(zip(percentiles, np.percentile(samples, percentiles).tolist()))
+                for kind, samples in self.latencies.items() if samples}
+
+    def stats(self):
+        return {
+            'tables': len(self.tables),
+            'queued': self.queue.qsize(),
+            'ticks': self.ticks,
+            'batched_showdowns': self.batched_showdowns,
+            'timeouts': {kind: count for kind, count in self.timeouts.items() if count},
+            'latency': self.latency_percentiles(),
+            }
+
+    async def _request(self, request):
+        action = request.get('action')
+        if action == 'open':
+            self.open_table(request['table'], request['players'], request['buy_in'], request['big_blind'])
+            return None
+        if action == 'stats':
+            return self.stats()
+        result = await self.submit(request.get('table'), action, request.get('player'), request.get('amount'),
+                                   request.get('timeout', -1))
+        if isinstance(result, TexasHoldem.PlayerFiveCards):
+            return {'player': result.player, 'five_cards': [list(card) for card in result.five_cards]}
+        return result
+
+    async def _connection(self, reader, writer):
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                response = {'ok': True, 'result': await self._request(json.loads(line))}
+            except asyncio.TimeoutError:
+                response = {'ok': False, 'error': 'timeout'}
+            except Exception as error:
+                response = {'ok': False, 'error': str(error)}
+            writer.write(json.dumps(response).encode() + b'\n')
+            await writer.drain()
+        writer.close()
+
+    async def serve(self, path=None, host='127.0.0.1', port=0):
+        """
+        Starts accepting JSON-lines connections on a Unix socket at path, or on a local TCP port.
+
+        Returns:
+            asyncio.Server: The server; close it to stop accepting connections.
+
+        """
+        if path is not None:
+            return await asyncio.start_unix_server(self._connection, path)
+        return await asyncio.start_server(self._connection, host, port)
+
+
+async def _serve_forever(host, path, port):
+    server = await host.serve(path, port=port)
+    print(f"Serving on {path or server.sockets[0].getsockname()}")
+    async with server:
+        await host.run()
+
+
+def main(path=None, port=0, queue_size=QUEUE_SIZE, timeout=ACTION_TIMEOUT):
+    asyncio.run(_serve_forever(TableHost(queue_size, timeout), path, port))
@@ -0,0 +1,227 @@
+# -*- coding: utf-8 -*-
+"""
+Independent Chip Model (ICM) equity of tournament stacks.
+
+Under the Malmuth-Harville model a player finishes first with probability stack / total chips, and
+every next place is awarded the same way among the players left. Summing over every finishing order
+is factorial in the number of players; the probabilities only depend on which players already took
+the places above, though, so icm_equity walks the subsets of players one place at a time instead.
+Subsets are only followed while there are paid places left: a 10-player final table with 9 paid places
+has 1,013 of them, a field of 30 with 3 paid places 466. The walk (the subsets of every layer and
+where each player leads from them) only depends on the number of players and paid places, so it is
+built once and every evaluation is a few NumPy operations per layer and player, for a whole batch of
+stack configurations at once.
+
+Fields with too many subsets (more than MAX_STATES) or players (MAX_EXACT_PLAYERS) fall back to icm_monte_carlo, which samples
+finishing orders: ordering players by Exp(1) / stack draws an order with exactly these probabilities.
+
+push_fold_equity evaluates all-in decisions: it builds the stacks after a fold, an uncalled push and
+a called push won or lost, and evaluates all of them in one batch.
+
+Example:
+    icm_equity([5000, 3000, 2000], [50, 30, 20])
+    table_icm(game, [500, 300, 200])              {'name': equity} from every Player.fortune
+    push_fold_equity(stacks, payouts, pusher=0, caller=1, equity=0.45, pot=300).push[:, 0]
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+import numpy as np
+
+MAX_STATES = 1 << 18
+"Subsets are int64 bitmasks, so larger fields always use icm_monte_carlo."
+MAX_EXACT_PLAYERS = 62
+TRIALS = 100000
+TRIAL_BLOCK = 1 << 20
+
+PushFold = namedtuple('PushFold', 'fold push steal win lose')
+
+
+def _payouts(payouts, players):
+    return np.asarray(payouts, dtype=np.float64)[:players]
+
+
+def state_count(players, places):
+    """
+    Returns the number of player subsets the exact calculation walks for a field and paid places.
+    """
+    count, layer = 0, 1
+    for place in range(min(places, players)):
+        count += layer
+        layer = layer * (players - place) // (place + 1)
+    return count
+
+
+@lru_cache(maxsize=32)
+def _layers(players, places):
+    """
+    Returns, for every paid place, the subsets (as bitmasks) of players that took the places above it
+    and, for every player, the subsets that do not hold the player and the index their union with the
+    player has in the next layer.
+    """
+    masks = np.zeros(1, dtype=np.int64)
+    layers = []
+    for place in range(min(places, players)):
+        moves = []
+        targets = {}
+        for player in range(players):
+            free = np.flatnonzero((masks >> player) & 1 == 0)
+            moves.append((player, free, masks[free] | (1 << player)))
+            targets.update(dict.fromkeys(moves[-1][2].tolist()))
+        next_masks = np.array(sorted(targets), dtype=np.int64)
+        moves = [(player, free, np.searchsorted(next_masks, reached)) for player, free, reached in moves]
+        layers.append((masks.size, moves))
+        masks = next_masks
+    return layers
+
+
+def icm_batch(stacks, payouts):
+    """
+    Exact ICM equity of many stack configurations of the same field size (at most MAX_EXACT_PLAYERS).
+
+    Args:
+        stacks (array_like): Chip stacks of shape (B, N); players with no chips win nothing.
+        payouts (list): Prize of every paid place, first place first. Places beyond N are ignored.
+
+    Returns:
+        np.ndarray: (B, N) float array of expected prize of every player.
+
+    """
+    stacks = np.asarray(stacks, dtype=np.float64)
+    batch, players = stacks.shape
+    payouts = _payouts(payouts, players)
+    stacks = stacks.T
+    equity = np.zeros((players, batch))
+    probabilities = np.ones((1, batch))
+    taken = np.zeros((1, batch))
+    total = stacks.sum(axis=0)
+    layers = _layers(players, payouts.size)
+    for place, (_, moves) in enumerate(layers):
+        remaining = total - taken
+        share = np.divide(probabilities, remaining, out=np.zeros_like(probabilities), where=remaining > 0)
+        last = place == len(layers) - 1
+        if not last:
+            next_size = layers[place + 1][0]
+            next_probabilities = np.zeros((next_size, batch))
+            next_taken = np.zeros((next_size, batch))
+        for player, free, reached in moves:
+            reach = share[free] * stacks[player]
+            equity[player] += payouts[place] * reach.sum(axis=0)
+            if not last:
+                next_probabilities[reached] += reach
+                next_taken[reached] = taken[free] + stacks[player]
+        if not last:
+            probabilities, taken = next_probabilities, next_taken
+    return equity.T
+
+
+def icm_monte_carlo(stacks, payouts, trials=TRIALS, seed=None):
+    """
+    ICM equity estimated from sampled finishing orders, for fields too large for icm_equity.
+
+    Args:
+        stacks (list): Chip stack of every player.
+        payouts (list): Prize of every paid place, first place first.
+        trials (int): Finishing orders sampled.
+        seed (int): Seed of the NumPy Generator.
+
+    Returns:
+        tuple: (equity, standard_error) float arrays of shape (N,).
+
+    """
+    stacks = np.asarray(stacks, dtype=np.float64)
+    players = stacks.size
+    payouts = _payouts(payouts, players)
+    places = payouts.size
+    rng = np.random.default_rng(seed)
+    alive = np.flatnonzero(stacks > 0)
+    places = min(places, alive.size)
+    totals = np.zeros(players)
+    squares = np.zeros(players)
+    block = max(1, TRIAL_BLOCK // max(1, alive.size))
+    for start in range(0, trials, block):
+        count = min(block, trials - start)
+        clocks = rng.standard_exponential((count, alive.size)) / stacks[alive]
+        top = np.argpartition(clocks, places - 1, axis=1)[:, :places] if places < alive.size else \
+            np.broadcast_to(np.arange(alive.size), (count, alive.size))
+        order = np.take_along_axis(top, np.argsort(np.take_along_axis(clocks, top, axis=1), axis=1), axis=1)
+        prizes = np.zeros((count, players))
+        np.put_along_axis(prizes, alive[order], payouts[:places], axis=1)
+        totals += prizes.sum(axis=0)
+        squares += (prizes ** 2).sum(axis=0)
+    mean = totals / trials
+    variance = np.maximum(squares / trials - mean ** 2, 0.0)
+    return mean, np.sqrt(variance / trials)
+
+
+def icm_equity(stacks, payouts, trials=TRIALS, seed=None):
+    """
+    ICM equity of every player: exact (icm_batch) when the field has at most MAX_STATES subsets to
+    walk, sampled (icm_monte_carlo) otherwise.
+
+    Args:
+        stacks (list): Chip stack of every player.
+        payouts (list): Prize of every paid place, first place first.
+        trials (int): Finishing orders sampled if the field is too large for the exact calculation.
+        seed (int): Seed of the Monte Carlo sampling.
+
+    Returns:
+        np.ndarray: (N,) float array of expected prize of every player.
+
+    """
+    stacks = np.asarray(stacks, dtype=np.float64)
+    if stacks.size <= MAX_EXACT_PLAYERS and state_count(stacks.size, len(payouts)) <= MAX_STATES:
+        return icm_batch(stacks[None], payouts)[0]
+    return icm_monte_carlo(stacks, payouts, trials, seed)[0]
+
+
+def table_icm(game, payouts, **kwargs):
+    """
+    ICM equity of the players of a table from their Player.fortune, as {'name': equity}. Keyword
+    arguments are passed on to icm_equity.
+    """
+    stacks = [game.table[player].fortune for player in game.players]
+    return dict(zip(game.players, icm_equity(stacks, payouts, **kwargs).tolist()))
+
+
+def push_fold_equity(stacks, payouts, pusher, caller, equity, pot=0, call_probability=1.0):
+    """
+    ICM equity of every player after each outcome of an all-in push, for many scenarios at once.
+
+    The pusher moves all-in; if they fold instead, the caller wins the pot (e.g. the big blind when the
+    small blind folds). The caller risks at most the pusher's stack. The expected equity of pushing is
+    (1 - call_probability) * steal + call_probability * (equity * win + (1 - equity) * lose).
+
+    Args:
+        stacks (array_like): (B, N) chip stacks behind, not counting the pot.
+        payouts (list): Prize of every paid place, first place first.
+        pusher (array_like): Seat of the pusher, an int or one per scenario.
+        caller (array_like): Seat of the player facing the push, an int or one per scenario.
+        equity (array_like): Pot share of the pusher when called, a float or one per scenario.
+        pot (array_like): Chips already in the middle (blinds, antes), won by the winner of the hand.
+        call_probability (array_like): Probability that the caller calls.
+
+    Returns:
+        PushFold: PushFold('fold', 'push', 'steal', 'win', 'lose') of (B, N) ICM equity arrays, where
+        push is the expectation above and steal, win and lose are the pusher's outcomes.
+
+    """
+    stacks = np.atleast_2d(np.asarray(stacks, dtype=np.float64))
+    batch = stacks.shape[0]
+    rows = np.arange(batch)
+    pusher, caller = np.broadcast_to(pusher, batch), np.broadcast_to(caller, batch)
+    pot = np.broadcast_to(np.asarray(pot, dtype=np.float64), batch)
+    risked = np.minimum(stacks[rows, pusher], stacks[rows, caller])
+    outcomes = np.repeat(stacks[None], 4, axis=0)
+    fold, steal, win, lose = outcomes
+    fold[rows, caller] += pot
+    steal[rows, pusher] += pot
+    win[rows, pusher] += pot + risked
+    win[rows, caller] -= risked
+    lose[rows, caller] += pot + risked
+    lose[rows, pusher] -= risked
+    fold, steal, win, lose = icm_batch(outcomes.reshape(4 * batch, -1), payouts).reshape(4, batch, -1)
+    equity = np.asarray(equity, dtype=np.float64).reshape(-1, 1)
+    call_probability = np.asarray(call_probability, dtype=np.float64).reshape(-1, 1)
+    push = (1 - call_probability) * steal + call_probability * (equity * win + (1 - equity) * lose)
+    return PushFold(fold, push, steal, win, lose)
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""
+Opt-in instrumentation of live tables.
+
+Instrumentation.attach(game) replaces the hot-path methods of one table (see PHASES) with timing
+wrappers stored on the instance, so tables that are not instrumented run the plain class methods and
+pay nothing. Each phase keeps a call count, the total time and a histogram of call times in
+power-of-two nanosecond buckets. Times are inclusive: blinds() also counts the place_small_blind()
+and place_big_blind() calls it makes, and winner() the showdown_ranking() call.
+
+A Registry instruments many tables, merges their counters into a snapshot dict and can append a
+snapshot to a JSON-lines file every few seconds from a background thread. SamplingProfiler samples
+the stack of a running thread instead and gives a per-function breakdown of where the time goes.
+
+Example:
+    registry = Registry()
+    for table_id, game in host.tables.items():
+        registry.instrument(game, table_id)
+    registry.start_writer('tables.jsonl', interval=10)
+    ...
+    registry.snapshot()['total']['settle_pot']['mean_us']
+"""
+
+import json
+import sys
+import threading
+import time
+from collections import Counter
+
+PHASES = ('deal_players', 'deal_board', 'place_small_blind', 'place_big_blind', 'blinds', 'place_bet',
+          'showdown_ranking', 'winner', 'tiebreaker', 'highcard_showdown', 'settle_pot')
+HISTOGRAM_BUCKETS = 48
+
+
+def _percentile(histogram, count, fraction):
+    """
+    Returns the upper bound in microseconds of the histogram bucket holding the given fraction of calls.
+    """
+    seen = 0
+    for bucket, calls in enumerate(histogram):
+        seen += calls
+        if seen >= fraction * count:
+            return (1 << bucket) / 1000
+    return 0.0
+
+
+class PhaseStats:
+    """
+        Count, total time and time histogram of one phase; histogram[b] counts calls of fewer than 2**b ns.
+        """
+
+    __slots__ = ('count', 'total_ns', 'histogram')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.histogram = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, elapsed):
+        self.count += 1
+        self.total_ns += elapsed
+        self.histogram[min(elapsed.bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def merge(self, other):
+        self.count += other.count
+        self.total_ns += other.total_ns
+        self.histogram = [mine + theirs for mine, theirs in zip(self.histogram, other.histogram)]
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'total_seconds': self.total_ns / 1e9,
+            'mean_us': self.total_ns / self.count / 1000 if self.count else 0.0,
+            'p50_us': _percentile(self.histogram, self.count, 0.5),
+            'p99_us': _percentile(self.histogram, self.count, 0.99),
+            'histogram_us': {(1 << bucket) / 1000: calls for bucket, calls in enumerate(self.histogram) if calls},
+            }
+
+
+class Instrumentation:
+    """
+        Times the PHASES of one table.
+
+        Args:
+            phases (tuple): Method names to time.
+
+        Attributes:
+            stats (dict): {phase: PhaseStats}.
+            game (TexasHoldem): Instrumented table, or None when detached.
+
+        """
+
+    def __init__(self, phases=PHASES):
+        self.phases = phases
+        self.stats = {phase: PhaseStats() for phase in phases}
+        self.game = None
+
+    def _wrap(self, method, stats):
+        clock = time.perf_counter_ns
+
+        def timed(*args, **kwargs):
+            start = clock()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                stats.add(clock() - start)
+        timed.__wrapped__ = method
+        return timed
+
+    def attach(self, game):
+        """
+        Starts timing game. A table has at most one Instrumentation; clones of it are not instrumented.
+        """
+        if 'instrumentation' in game.__dict__:
+            raise Exception("Action is not possible. Table is already instrumented.")
+        for phase in self.phases:
+            setattr(game, phase, self._wrap(getattr(game, phase), self.stats[phase]))
+        game.instrumentation = self
+        self.game = game
+        return self
+
+    def detach(self):
+        """
+        Restores the plain methods of the table; the counters are kept.
+        """
+        if self.game is not None:
+            strip(self.game)
+            self.game = None
+
+    def reset(self):
+        self.stats = {phase: PhaseStats() for phase in self.phases}
+        if self.game is not None:
+            game = self.game
+            self.detach()
+            self.attach(game)
+
+    def snapshot(self):
+        return {phase: stats.snapshot() for phase, stats in self.stats.items() if stats.count}
+
+
+def strip(game):
+    """
+    Removes any instrumentation wrappers from the instance dict of game.
+    """
+    instrumentation = game.__dict__.pop('instrumentation', None)
+    if instrumentation is not None:
+        for phase in instrumentation.phases:
+            game.__dict__.pop(phase, None)
+
+
+class Registry:
+    """
+        Instruments many tables and reports them together.
+
+        Attributes:
+            tables (dict): {table id: Instrumentation}.
+
+        """
+
+    def __init__(self, phases=PHASES):
+        self.phases = phases
+        self.tables = {}
+        self._writer = None
+        self._stop = threading.Event()
+
+    def instrument(self, game, table_id=None):
+        table_id = len(self.tables) if table_id is None else table_id
+        self.tables[table_id] = Instrumentation(self.phases).attach(game)
+        return self.tables[table_id]
+
+    def remove(self, table_id):
+        self.tables.pop(table_id).detach()
+
+    def snapshot(self, per_table=False):
+        """
+        Returns {'time': unix time, 'tables': count, 'total': {phase: stats}} with the counters of all
+        tables merged, plus 'per_table': {table id: {phase: stats}} if per_table is set.
+        """
+        total = {phase: PhaseStats() for phase in self.phases}
+        for instrumentation in list(self.tables.values()):
+            for phase, stats in instrumentation.stats.items():
+                total[phase].merge(stats)
+        snapshot = {'time': time.time(), 'tables': len(self.tables),
+                    'total': {phase: stats.snapshot() for phase, stats in total.items() if stats.count}}
+        if per_table:
+            snapshot['per_table'] = {str(table_id): instrumentation.snapshot()
+                                     for table_id, instrumentation in list(self.tables.items())}
+        return snapshot
+
+    def write(self, path, per_table=False):
+        with open(path, 'a') as file:
+            file.write(json.dumps(self.snapshot(per_table)) + '\n')
+
+    def start_writer(self, path, interval=10.0, per_table=False):
+        """
+        Appends a snapshot to path every interval seconds from a daemon thread until stop_writer().
+        """
+        self.stop_writer()
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(interval):
+                self.write(path, per_table)
+        self._writer = threading.Thread(target=loop, name='holdem-instrument-writer', daemon=True)
+        self._writer.start()
+
+    def stop_writer(self):
+        if self._writer is not None:
+            self._stop.set()
+            self._writer.join()
+            self._writer = None
+
+
+class SamplingProfiler:
+    """
+        Samples the call stack of one thread at a fixed interval from a background thread.
+
+        Every sample counts the function on top of the stack (self time) and every distinct function on
+        the stack (total time), so the breakdown shows both where the time is spent and which callers
+        it is spent under. Overhead is one stack walk per interval, independent of the work profiled.
+        The sampler needs the GIL to run, so samples are taken at interpreter switch points (see
+        sys.setswitchinterval); time inside a C call such as evaluate_batch is charged to its caller.
+
+        Args:
+            interval (float): Seconds between samples.
+            thread_id (int): Thread to sample; the thread that calls start() if None.
+
+        """
+
+    def __init__(self, interval=0.001, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id
+        self.samples = 0
+        self.self_counts = Counter()
+        self.total_counts = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.thread_id)
+        if frame is None:
+            return
+        self.samples += 1
+        self.self_counts[self._name(frame.f_code)] += 1
+        seen = set()
+        while frame is not None:
+            name = self._name(frame.f_code)
+            if name not in seen:
+                seen.add(name)
+                self.total_counts[name] += 1
+            frame = frame.f_back
+
+    @staticmethod
+    def _name(code):
+        return f'{code.co_filename}:{code.co_firstlineno}({code.co_name})'
+
+    def start(self):
+        if self.thread_id is None:
+            self.thread_id = threading.get_ident()
+        self._stop.clear()
+
+        def loop():
+            while not self._stop.wait(self.interval):
+                self._sample()
+        self._thread = threading.Thread(target=loop, name='holdem-sampling-profiler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def snapshot(self, limit=20):
+        """
+        Returns the limit functions with the most samples as a list of
+        {'function', 'self_share', 'total_share', 'samples'} dicts, ordered by total share.
+        """
+        samples = max(self.samples, 1)
+        return [{'function': name, 'self_share': self.self_counts[name] / samples,
+                 'total_share': count / samples, 'samples': count}
+                for name, count in self.total_counts.most_common(limit)]
+
+    def print_stats(self, limit=20):
+        print(f"{self.samples} samples every {self.interval * 1000:.1f} ms")
+        print(f"{'self':>7} {'total':>7}  function")
+        for row in self.snapshot(limit):
+            print(f"{row['self_share']:>7.1%} {row['total_share']:>7.1%}  {row['function']}")
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*-
+"""
+Range-vs-range equity.
+
+A range is a set of two-card combos with weights, written in the usual shorthand - "QQ+, AKs, A5s-A2s,
+KQo:0.5, AhKh" - or given as {combo: weight} / a list of combos. Combos that share a card with the board
+or the dead cards are removed, and combos that share a card with each other never meet.
+
+Heads-up equities are computed from whole arrays: the strength of every combo on every runout is
+evaluated in one evaluate_batch call per range, and every combo is compared with every combo of the
+other range on every runout with broadcast comparisons under card-removal masks (64-bit card bitmasks).
+Runouts are enumerated exactly when there are at most MAX_RUNOUTS of them (flop, turn and river boards)
+and sampled otherwise. Multiway pots sample deals from the ranges instead.
+
+Example:
+    hero, villain = range_equity(['QQ+, AKs', 'JJ-99, AQs+, AKo'], board=[Card('K', 'hearts'), ...])
+    hero.equity               Equity('win', 'tie', 'equity') of the whole range
+    hero.combo_equity[idx]    pot share of combo hero.combos[idx]
+"""
+
+from collections import namedtuple
+from itertools import combinations
+import numpy as np
+
+from . import evaluator
+from .equity import Equity, SHARE_UNITS
+
+RangeEquity = namedtuple('RangeEquity', 'equity combos combo_equity')
+
+RANK_CHARS = '23456789TJQKA'
+SUIT_CHARS = 'scdh'
+MAX_RUNOUTS = 50000
+SAMPLES = 5000
+BLOCK_SIZE = 1 << 22
+CARD_MASKS = np.left_shift(np.uint64(1), np.arange(52, dtype=np.uint64))
+
+
+def _card(text):
+    rank = RANK_CHARS.index(text[0].upper())
+    return rank * 4 + SUIT_CHARS.index(text[1].lower())
+
+
+def _hand_combos(high, low, kind):
+    """
+    Returns the combos of two ranks: 6 for a pair, 4 suited ('s'), 12 offsuit ('o') or 16 for both ('').
+    """
+    if high == low:
+        return [(high * 4 + first, high * 4 + second) for first, second in combinations(range(4), 2)]
+    return [(high * 4 + first, low * 4 + second) for first in range(4) for second in range(4)
+            if (kind != 's' or first == second) and (kind != 'o' or first != second)]
+
+
+def _token_combos(token):
+    if len(token) == 4 and token[1].lower() in SUIT_CHARS and token[3].lower() in SUIT_CHARS:
+        return [tuple(sorted((_card(token[:2]), _card(token[2:])), reverse=True))]
+    if '-' in token:
+        start, stop = token.split('-')
+        high, low = sorted((RANK_CHARS.index(start[0]), RANK_CHARS.index(start[1])), reverse=True)
+        stop_high, stop_low = sorted((RANK_CHARS.index(stop[0]), RANK_CHARS.index(stop[1])), reverse=True)
+        if start[2:] != stop[2:] or (high == low) != (stop_high == stop_low) or \
+                (high != stop_high and high - low != stop_high - stop_low):
+            raise ValueError(token)
+        if high == stop_high:
+            first, second = sorted((low, stop_low))
+            return [combo for kicker in range(first, second + 1) for combo in _hand_combos(high, kicker, start[2:])]
+        first, second = sorted((high, stop_high))
+        gap = high - low
+        return [combo for top in range(first, second + 1) for combo in _hand_combos(top, top - gap, start[2:])]
+    plus = token.endswith('+')
+    token = token.rstrip('+')
+    high, low, kind = RANK_CHARS.index(token[0]), RANK_CHARS.index(token[1]), token[2:]
+    if high < low:
+        high, low = low, high
+    if not plus:
+        return _hand_combos(high, low, kind)
+    if high == low:
+        return [combo for rank in range(high, 13) for combo in _hand_combos(rank, rank, '')]
+    return [combo for kicker in range(low, high) for combo in _hand_combos(high, kicker, kind)]
+
+
+def parse_range(text):
+    """
+    Parses range shorthand into {(card, card): weight} with int cards, higher card first.
+
+    Tokens are separated by commas: pairs ('QQ'), pairs and above ('QQ+'), pair spans ('22-55'), suited,
+    offsuit or any two ranks ('AKs', 'AKo', 'AK'), kicker steps up to the top card ('ATs+'), kicker spans
+    ('A2s-A5s'), connector spans with the same gap at both ends ('T9s-65s') and single combos ('AsKh').
+    A token may end in ':weight'; later tokens override earlier weights of the same combo.
+
+    Raises:
+        ValueError: If a token can not be parsed, e.g. a span whose ends are neither the same top card,
+        both pairs nor the same gap.
+
+    """
+    combos = {}
+    for token in text.replace(' ', '').split(','):
+        if not token:
+            continue
+        token, _, weight = token.partition(':')
+        token = token.upper()[:2] + token[2:]
+        try:
+            for combo in _token_combos(token):
+                combos[combo] = float(weight) if weight else 1.0
+        except (ValueError, IndexError):
+            raise ValueError(f"Action is not possible. Can not parse range token {token!r}.")
+    return combos
+
+
+def _encode(card):
+    return card if isinstance(card, (int, np.integer)) else evaluator.encode(card)
+
+
+def combo_weights(hand_range):
+    """
+    Returns the combos and weights of a range given as shorthand text, as {combo: weight} or as a list
+    of combos, as an (N, 2) int array and an (N,) float array.
+    """
+    if isinstance(hand_range, str):
+        hand_range = parse_range(hand_range)
+    elif not isinstance(hand_range, dict):
+        hand_range = dict.fromkeys(map(tuple, hand_range), 1.0)
+    combos = np.array([sorted(map(_encode, combo), reverse=True) for combo in hand_range], dtype=np.intp)
+    weights = np.array(list(hand_range.values()), dtype=np.float64)
+    return combos.reshape(-1, 2), weights
+
+
+def _masks(cards):
+    return np.bitwise_or.reduce(CARD_MASKS[cards], axis=-1)
+
+
+def _runouts(deck, missing, samples, rng):
+    if missing == 0:
+        return np.empty((1, 0), dtype=np.intp)
+    count = 1
+    for idx in range(missing):
+        count = count * (deck.size - idx) // (idx + 1)
+    if count <= MAX_RUNOUTS:
+        return np.array(list(combinations(deck.tolist(), missing)), dtype=np.intp).reshape(-1, missing)
+    draws = np.argpartition(rng.random((samples, deck.size)), missing - 1, axis=1)[:, :missing]
+    return deck[draws]
+
+
+def _strengths(combos, boards, valid):
+    """
+    Returns the (combos, boards) uint16 strength of every combo on every complete board; 0 where the
+    combo shares a card with the board (valid is False), as those hands are not evaluated.
+    """
+    hands = np.concatenate((np.repeat(combos[:, None, :], boards.shape[0], axis=1),
+                            np.broadcast_to(boards, (combos.shape[0],) + boards.shape)), axis=2)
+    strengths = np.zeros(valid.shape, dtype=np.uint16)
+    strengths[valid] = evaluator.evaluate_batch(hands[valid])[1]
+    return strengths
+
+
+def _heads_up(ranges, board, deck, samples, rng):
+    (combos1, weights1), (combos2, weights2) = ranges
+    runouts = _runouts(deck, 5 - board.size, samples, rng)
+    boards = np.hstack((np.broadcast_to(board, (runouts.shape[0], board.size)), runouts))
+    runout_masks = _masks(runouts)
+    masks1, masks2 = _masks(combos1), _masks(combos2)
+    valid1 = (masks1[:, None] & runout_masks) == 0
+    valid2 = (masks2[:, None] & runout_masks) == 0
+    strengths1, strengths2 = _strengths(combos1, boards, valid1), _strengths(combos2, boards, valid2)
+    win = np.zeros((combos1.shape[0], combos2.shape[0]))
+    tie = np.zeros_like(win)
+    block = max(1, BLOCK_SIZE // max(1, combos2.shape[0] * runouts.shape[0]))
+    for start in range(0, combos1.shape[0], block):
+        stop = start + block
+        mask = valid1[start:stop, None] & valid2[None]
+        counts = mask.sum(axis=2)
+        difference = strengths1[start:stop, None].astype(np.int32) - strengths2[None]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            win[start:stop] = ((difference > 0) & mask).sum(axis=2) / counts
+            tie[start:stop] = ((difference == 0) & mask).sum(axis=2) / counts
+    pairs = ((masks1[:, None] & masks2) == 0) & np.isfinite(win)
+    pair_weights = np.where(pairs, weights1[:, None] * weights2, 0.0)
+    win, tie = np.where(pairs, win, 0.0), np.where(pairs, tie, 0.0)
+    lose = np.where(pairs, 1.0 - win - tie, 0.0)
+    return [_range_result(combos1, pair_weights, win, tie, axis=1),
+            _range_result(combos2, pair_weights.T, lose.T, tie.T, axis=1)]
+
+
+def _range_result(combos, pair_weights, win, tie, axis):
+    weighted_win = (pair_weights * win).sum(axis=axis)
+    weighted_tie = (pair_weights * tie).sum(axis=axis)
+    totals = pair_weights.sum(axis=axis)
+    total = totals.sum()
+    if total == 0:
+        raise Exception("Action is not possible. The ranges have no combos that can meet.")
+    with np.errstate(invalid='ignore', divide='ignore'):
+        combo_equity = (weighted_win + weighted_tie / 2) / totals
+    equity = Equity(float(weighted_win.sum() / total), float(weighted_tie.sum() / total),
+                    float((weighted_win.sum() + weighted_tie.sum() / 2) / total))
+    return RangeEquity(equity, combos, combo_equity)
+
+
+def _multiway(ranges, board, deck, samples, rng):
+    """
+    Samples deals of one combo per range, rejecting deals that share a card, then one runout per deal.
+    A round of draws in which every deal shares a card means the ranges (almost) never meet, and
+    raises ValueError instead of sampling forever.
+    """
+    players = len(ranges)
+    picks = np.empty((players, 0), dtype=np.intp)
+    while picks.shape[1] < samples:
+        batch = np.array([rng.choice(combos.shape[0], samples, p=weights / weights.sum())
+                          for combos, weights in ranges])
+        masks = np.array([_masks(combos)[pick] for (combos, weights), pick in zip(ranges, batch)])
+        disjoint = np.ones(samples, dtype=bool)
+        for first, second in combinations(range(players), 2):
+            disjoint &= (masks[first] & masks[second]) == 0
+        if not disjoint.any():
+            raise ValueError("Action is not possible. The ranges have no deals without shared cards.")
+        picks = np.hstack((picks, batch[:, disjoint]))[:, :samples]
+    dealt = np.stack([combos[pick] for (combos, weights), pick in zip(ranges, picks)], axis=1).reshape(samples, -1)
+    keys = rng.random((samples, deck.size))
+    keys[(CARD_MASKS[deck] & _masks(dealt)[:, None]) != 0] = 2.0
+    missing = 5 - board.size
+    runouts = deck[np.argpartition(keys, missing - 1, axis=1)[:, :missing]] if missing else \
+        np.empty((samples, 0), dtype=np.intp)
+    boards = np.hstack((np.broadcast_to(board, (samples, board.size)), runouts))
+    strengths = np.array([evaluator.evaluate_batch(np.hstack((combos[pick], boards)))[1]
+                          for (combos, weights), pick in zip(ranges, picks)])
+    best = strengths == strengths.max(axis=0)
+    winners = best.sum(axis=0)
+    shares = best * (SHARE_UNITS // winners) / SHARE_UNITS
+    results = []
+    for (combos, weights), pick, player_best, share in zip(ranges, picks, best, shares):
+        dealt_count = np.bincount(pick, minlength=combos.shape[0])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            combo_equity = np.bincount(pick, weights=share, minlength=combos.shape[0]) / dealt_count
+        equity = Equity(float((player_best & (winners == 1)).mean()), float((player_best & (winners > 1)).mean()),
+                        float(share.mean()))
+        results.append(RangeEquity(equity, combos, combo_equity))
+    return results
+
+
+def range_equity(ranges, board=(), dead_cards=(), samples=SAMPLES, seed=None):
+    """
+    Computes the equity of every range and of every combo in it.
+
+    Args:
+        ranges (list): One range per player, as shorthand text, {combo: weight} or a list of combos;
+        combo cards are ints or Card(rank, suit) namedtuples.
+        board (list): Community cards dealt so far (0, 3, 4 or 5 cards), ints or Card namedtuples.
+        dead_cards (list): Cards known not to be in any range or to come on the board.
+        samples (int): Runouts sampled when there are more than MAX_RUNOUTS of them (heads-up preflop),
+        or deals sampled in multiway pots.
+        seed (int): Seed of the NumPy Generator used for sampling.
+
+    Returns:
+        list: RangeEquity('equity', 'combos', 'combo_equity') per range, where equity is the
+        Equity('win', 'tie', 'equity') of the range, combos the (N, 2) int combos that can be dealt
+        and combo_equity the (N,) expected pot share of each combo (NaN if it can never be dealt).
+
+    """
+    if len(ranges) < 2:
+        raise Exception("Action is not possible. Please give at least two ranges.")
+    board = np.array([_encode(card) for card in board], dtype=np.intp)
+    dead = np.array([_encode(card) for card in dead_cards], dtype=np.intp)
+    removed = _masks(np.concatenate((board, dead)))
+    parsed = []
+    for hand_range in ranges:
+        combos, weights = combo_weights(hand_range)
+        keep = ((_masks(combos) & removed) == 0) & (weights > 0)
+        if not keep.any():
+            raise Exception("Action is not possible. A range has no combos left after card removal.")
+        parsed.append((combos[keep], weights[keep]))
+    deck = np.array([card for card in range(52) if not (int(removed) >> card) & 1], dtype=np.intp)
+    rng = np.random.default_rng(seed)
+    if len(parsed) == 2:
+        return _heads_up(parsed, board, deck, samples, rng)
+    return _multiway(parsed, board, deck, samples, rng)
@@ -0,0 +1,348 @@
+# -*- coding: utf-8 -*-
+"""
+Self-play harness running many hands between strategy objects.
+
+Tables are SimulatedTexasHoldem games played in lockstep. At every step each table has one seat to
+act; the harness groups these decisions by strategy and makes one act() call per strategy with the
+observation arrays of all its tables, so NumPy-backed or compiled policies see batches instead of
+one Python call per action. Tables may be of any SimulatedTexasHoldem class (game_class), e.g.
+SimulatedOmaha; observations carry the hole cards and the Variant of that game.
+
+Only the decisions are batched. Applying each action, ending streets and settling pots still steps every
+table in Python through the TexasHoldem methods, so the betting and pot rules stay those of the table
+classes. That per-table stepping bounds the throughput at roughly 1,400 (HandStrengthStrategy against
+CallStrategy) to 2,200 (two CallStrategy) heads-up hands per second in one process on a typical
+machine, and about twice that on a fast one; millions of hands take several processes with
+different seeds.
+
+A strategy is any object with an act(observation) method returning two arrays of the batch size:
+    actions: FOLD, CALL (check when nothing is owed) or RAISE
+    amounts: raise size in chips on top of the call, used for RAISE only; rounded down to whole chips
+
+Betting follows the TexasHoldem rules: blinds(), then place_bet() for every call or raise, so bets
+of less than the big blind are never placed. The one call below the big blind, the small blind
+completing preflop, is posted with place_small_blind() (the small blind is half the big blind), so
+the small blind pays it and may fold to it. Any other call of less than the big blind counts as a
+check, and a bet that would leave less than the big blind behind goes all-in instead. A street ends once every player that can act has acted since the last raise;
+raises are capped at MAX_RAISES per street. Pots are paid by settle_pot() and stacks are reset to
+the starting stack every hand, so each hand's result is its chip delta.
+
+Example:
+    harness = SelfPlay([HandStrengthStrategy(), CallStrategy()], tables=512, seed=1)
+    harness.run(100000)
+    harness.report()
+"""
+
+import time
+from collections import namedtuple
+import numpy as np
+
+from . import evaluator
+from .game import SimulatedTexasHoldem
+from .state import BOARD, HOLE, POT, STACKS, BOARD_SIZE, SMALL_BLIND, BIG_BLIND, FOLDED
+
+FOLD, CALL, RAISE = range(3)
+MAX_RAISES = 4
+STACK = 100
+Z_95 = 1.96
+
+Observation = namedtuple('Observation', 'table seat position street hole_cards board pot to_call stack bets folded big_blind '
+                         'variant')
+StrategyResult = namedtuple('StrategyResult', 'name hands bb_per_100 confidence')
+
+
+class CallStrategy:
+    """
+        Calls or checks every decision.
+        """
+
+    def act(self, observation):
+        size = observation.table.size
+        return np.full(size, CALL, dtype=np.int8), np.zeros(size)
+
+
+class RandomStrategy:
+    """
+        Folds, calls and raises at random, raising by a random fraction of the pot.
+
+        Args:
+            probabilities (tuple): Probabilities of FOLD, CALL and RAISE.
+            seed (int): Seed of the NumPy Generator.
+
+        """
+
+    def __init__(self, probabilities=(0.1, 0.6, 0.3), seed=None):
+        self.probabilities = probabilities
+        self.rng = np.random.default_rng(seed)
+
+    def act(self, observation):
+        size = observation.table.size
+        actions = self.rng.choice(3, size, p=self.probabilities).astype(np.int8)
+        return actions, observation.pot * self.rng.uniform(0.5, 1.0, size)
+
+
+class HandStrengthStrategy:
+    """
+        Raises strong hands, calls medium ones and folds the rest, judged in one evaluate_batch call of the
+        observed variant per street: preflop by a pair or a high card in the hole and postflop by the made
+        hand category.
+
+        Args:
+            raise_category (int): Lowest postflop category that raises.
+            call_category (int): Lowest postflop category that calls a bet.
+            pot_fraction (float): Raise size as a fraction of the pot.
+
+        """
+
+    def __init__(self, raise_category=evaluator.TWO_PAIRS, call_category=evaluator.PAIR, pot_fraction=0.75):
+        self.raise_category = raise_category
+        self.call_category = call_category
+        self.pot_fraction = pot_fraction
+
+    def act(self, observation):
+        ranks = np.sort(observation.hole_cards >> 2, axis=1)
+        paired = (ranks[:, 1:] == ranks[:, :-1]).any(axis=1)
+        score = np.where(paired, evaluator.TWO_PAIRS, np.where(ranks[:, -1] >= 11, evaluator.PAIR, evaluator.HIGH_CARD))
+        for size in (3, 4, 5):
+            rows = np.flatnonzero((observation.board >= 0).sum(axis=1) == size)
+            if rows.size:
+                hands = np.hstack((observation.hole_cards[rows], observation.board[rows, :size]))
+                score[rows] = observation.variant.evaluate_batch(hands)[0]
+        actions = np.where(score >= self.raise_category, RAISE,
+                           np.where((score >= self.call_category) | (observation.to_call == 0), CALL, FOLD))
+        return actions.astype(np.int8), observation.pot * self.pot_fraction
+
+
+class _Table:
+
+    __slots__ = ('game', 'strategies', 'street', 'pending', 'raises')
+
+    def __init__(self, game, strategies):
+        self.game = game
+        self.strategies = strategies
+        self.street = 0
+        self.pending = []
+        self.raises = 0
+
+
+class SelfPlay:
+    """
+        Plays strategies against each other on many tables at once.
+
+        Args:
+            strategies (list): One strategy per seat. Seating is rotated from table to table, and the
+            blind buttons move every hand, so every strategy plays every position.
+            tables (int): Number of tables played in lockstep; also the largest batch a strategy sees.
+            big_blind (int): Big-blind limit.
+            stack (int): Starting stack of every hand, in big blinds.
+            seed (int): Seed of the table shuffles.
+            game_class (type): SimulatedTexasHoldem or a subclass such as SimulatedOmaha.
+
+        Attributes:
+            hands (int): Hands played so far.
+            elapsed (float): Seconds spent in run().
+            decisions (int): Decisions made by the strategies.
+
+        """
+
+    def __init__(self, strategies, tables=256, big_blind=2, stack=STACK, seed=None, game_class=SimulatedTexasHoldem):
+        if len(strategies) < 2:
+            raise Exception("Action is not possible. Please give at least two strategies.")
+        self.strategies = strategies
+        self.names = [getattr(strategy, 'name', type(strategy).__name__) for strategy in strategies]
+        self.big_blind = big_blind
+        self.stack = stack * big_blind
+        self.variant = game_class.VARIANT
+        seats = len(strategies)
+        players = [f'P{seat}' for seat in range(seats)]
+        seeds = np.random.SeedSequence(seed).spawn(tables)
+        self.tables = []
+        for idx in range(tables):
+            order = [(seat + idx) % seats for seat in range(seats)]
+            game = game_class(players, self.stack, big_blind, seed=seeds[idx])
+            self.tables.append(_Table(game, order))
+        self.hands = 0
+        self.elapsed = 0.0
+        self.decisions = 0
+        self.totals = np.zeros(seats)
+        self.squares = np.zeros(seats)
+        self.counts = np.zeros(seats, dtype=np.int64)
+        for table in self.tables:
+            self._start_hand(table)
+
+    def _start_hand(self, table):
+        game = table.game
+        game.new_hand()
+        for player in game.players:
+            game.table[player].fortune = self.stack
+        game.deal_players()
+        game.blinds()
+        table.street = 0
+        big_seat = game.state.counters[BIG_BLIND]
+        self._open_street(table, (big_seat + 1) % len(game.players))
+
+    def _can_act(self, game, seat):
+        player = game.table[game.players[seat]]
+        return not player.folded and player.fortune > 0
+
+    def _to_call(self, game, seat):
+        bets = game.state.chips[game.state.bets_offset():game.state.max_win_offset()]
+        to_call = max(bets) - bets[seat]
+        if to_call >= self.big_blind or self._completes_small_blind(game, seat, bets, to_call):
+            return to_call
+        return 0
+
+    def _completes_small_blind(self, game, seat, bets, to_call):
+        """
+        True for the small blind facing only the big blind preflop, where a call is half a big blind.
+        """
+        return (seat == game.state.counters[SMALL_BLIND] and bets[seat] == game.small_blind
+                and to_call == game.small_blind)
+
+    def _open_street(self, table, first):
+        game = table.game
+        seats = len(game.players)
+        order = [(first + idx) % seats for idx in range(seats)]
+        table.pending = [seat for seat in order if self._can_act(game, seat)]
+        table.raises = 0
+        if len(table.pending) == 1 and not self._to_call(game, table.pending[0]):
+            table.pending = []
+        self._advance(table)
+
+    def _advance(self, table):
+        """
+        Moves the table on until a seat has to act: ends streets, deals boards and settles hands.
+        """
+        game = table.game
+        while table.pending and not self._can_act(game, table.pending[0]):
+            table.pending.pop(0)
+        if table.pending:
+            return
+        active = [player for player in game.players if not game.table[player].folded]
+        if len(active) > 1 and table.street < 3:
+            table.street += 1
+            game.deal_board(flop=table.street == 1)
+            seats = len(game.players)
+            first = game.state.counters[BIG_BLIND if seats == 2 else SMALL_BLIND]
+            self._open_street(table, first)
+            return
+        game.settle_pot()
+        for seat, player in enumerate(game.players):
+            net = (game.table[player].fortune - self.stack) / self.big_blind
+            strategy = table.strategies[seat]
+            self.totals[strategy] += net
+            self.squares[strategy] += net * net
+            self.counts[strategy] += 1
+        self.hands += 1
+        self._start_hand(table)
+
+    def _apply(self, table, action, amount):
+        game = table.game
+        seat = table.pending.pop(0)
+        player = game.players[seat]
+        fortune = game.table[player].fortune
+        to_call = self._to_call(game, seat)
+        if action == RAISE and table.raises < MAX_RAISES and fortune > to_call + self.big_blind:
+            bet = to_call + min(max(int(amount), self.big_blind), fortune - to_call)
+            if fortune - bet < self.big_blind:
+                bet = fortune
+            game.place_bet(player, bet)
+            table.raises += 1
+            seats = len(game.players)
+            table.pending = [(seat + idx) % seats for idx in range(1, seats) if self._can_act(game, (seat + idx) % seats)]
+        elif action == FOLD and to_call:
+            game.table[player].fold()
+        elif to_call >= self.big_blind:
+            game.place_bet(player, fortune if fortune - to_call < self.big_blind else to_call)
+        elif to_call:
+            game.place_small_blind()
+        self._advance(table)
+
+    def observe(self, tables):
+        """
+        Returns the Observation of the seat to act at each of tables, as arrays with one row per table:
+        table and seat indices, position (0 = small blind), street (0 preflop to 3 river), hole_cards
+        (B, hole cards of the variant) and board (B, 5, -1 where not dealt) int cards, pot, to_call and
+        stack in chips, bets and folded (B, seats) for every seat, the big blind and the Variant.
+        """
+        rows = []
+        hole_cards = self.variant.hole_cards
+        for idx in tables:
+            table = self.tables[idx]
+            state = table.game.state
+            seat = table.pending[0]
+            seats = state.seats
+            board = state.cards[BOARD:BOARD + 5].tolist()
+            board[state.counters[BOARD_SIZE]:] = [-1] * (5 - state.counters[BOARD_SIZE])
+            rows.append((idx, seat, (seat - state.counters[SMALL_BLIND]) % seats, table.street,
+                         state.cards[HOLE + hole_cards * seat:HOLE + hole_cards * (seat + 1)].tolist(), board, state.chips[POT],
+                         self._to_call(table.game, seat), state.chips[STACKS + seat],
+                         state.chips[state.bets_offset():state.max_win_offset()], state.counters[FOLDED:].tolist()))
+        columns = list(zip(*rows))
+        return Observation(
+            np.array(columns[0], dtype=np.intp), np.array(columns[1], dtype=np.intp),
+            np.array(columns[2], dtype=np.intp), np.array(columns[3], dtype=np.int8),
+            np.array(columns[4], dtype=np.intp), np.array(columns[5], dtype=np.intp),
+            np.array(columns[6], dtype=np.float64), np.array(columns[7], dtype=np.float64),
+            np.array(columns[8], dtype=np.float64), np.array(columns[9], dtype=np.float64),
+            np.array(columns[10], dtype=bool), self.big_blind, self.variant)
+
+    def step(self):
+        """
+        Makes one decision at every table, with one act() call per strategy.
+        """
+        waiting = [[] for strategy in self.strategies]
+        for idx, table in enumerate(self.tables):
+            waiting[table.strategies[table.pending[0]]].append(idx)
+        for strategy, tables in zip(self.strategies, waiting):
+            if not tables:
+                continue
+            actions, amounts = strategy.act(self.observe(tables))
+            for idx, action, amount in zip(tables, np.asarray(actions).tolist(), np.asarray(amounts).tolist()):
+                self._apply(self.tables[idx], action, amount)
+            self.decisions += len(tables)
+
+    def run(self, hands):
+        """
+        Plays until at least hands more hands are finished.
+
+        Returns:
+            float: Hands per second.
+
+        """
+        target = self.hands + hands
+        start, played = time.perf_counter(), self.hands
+        while self.hands < target:
+            self.step()
+        elapsed = time.perf_counter() - start
+        self.elapsed += elapsed
+        return (self.hands - played) / elapsed
+
+    def results(self):
+        """
+        Returns StrategyResult('name', 'hands', 'bb_per_100', 'confidence') per strategy, where confidence
+        is the half-width of the 95% confidence interval of bb_per_100.
+        """
+        results = []
+        for name, total, square, count in zip(self.names, self.totals, self.squares, self.counts):
+            mean = total / count if count else 0.0
+            variance = square / count - mean * mean if count > 1 else 0.0
+            half_width = Z_95 * np.sqrt(max(variance, 0.0) / count) if count else float('inf')
+            results.append(StrategyResult(name, int(count), 100 * mean, 100 * half_width))
+        return results
+
+    def report(self):
+        rate = self.hands / self.elapsed if self.elapsed else 0.0
+        print(f"{self.hands} hands in {self.elapsed:.1f}s ({rate:,.0f} hands/s, {self.decisions} decisions)")
+        for result in self.results():
+            print(f"{result.name:<24}{result.bb_per_100:>10.2f} bb/100 +/- {result.confidence:.2f} "
+                  f"over {result.hands} hands")
+
+
+STRATEGIES = {'call': CallStrategy, 'random': RandomStrategy, 'strength': HandStrengthStrategy}
+
+
+def main(names, hands, tables, seed=None):
+    harness = SelfPlay([STRATEGIES[name]() for name in names], tables=tables, seed=seed)
+    harness.run(hands)
+    harness.report()
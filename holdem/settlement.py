@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+"""
+Side-pot and split-pot settlement.
+
+Contributions are the total chips each player put in during the hand (Player.bet, accumulated by
+place_bet, place_small_blind and place_big_blind). The pot is cut into layers at every contribution
+level of a player still in the hand; each layer is won by the best tie class among the players who
+contributed at least that level. Chips contributed by folded players stay in the layers they reached
+but folded players are never eligible.
+
+Split pots are divided in whole chips. Chips that can not be divided evenly (odd chips) go one at a
+time to the winners in odd-chip order - the seating order starting from the first player left of the
+dealer button. A pot that is not a whole number of chips gives the fraction left over to the first
+winner, so no chips are created or lost.
+"""
+
+import numpy as np
+from collections import namedtuple
+
+SidePot = namedtuple('SidePot', 'amount players')
+
+
+def side_pots(contributions, folded=()):
+    """
+    Builds the layered side pots of a hand.
+
+    Args:
+        contributions (dict): {'name': chips} total contribution of every player in the hand.
+        folded (iterable): Names of players that have folded.
+
+    Returns:
+        list: SidePot('amount', 'players') from the main pot up, where players lists the names
+        eligible to win the pot in the order of contributions.
+
+    """
+    folded = set(folded)
+    levels = sorted(set(chips for player, chips in contributions.items() if player not in folded))
+    pots = []
+    previous = 0
+    for idx, level in enumerate(levels):
+        top = float('inf') if idx == len(levels) - 1 else level
+        amount = sum(min(chips, top) - min(chips, previous) for chips in contributions.values())
+        players = [player for player, chips in contributions.items() if player not in folded and chips >= level]
+        if amount:
+            pots.append(SidePot(amount, players))
+        previous = level
+    return pots
+
+
+def split(amount, winners, chip=1):
+    """
+    Splits amount between winners in whole chips; odd chips, and any fraction of a chip, go to the first
+    winners in the given order.
+
+    Returns:
+        dict: {'name': chips won}.
+
+    """
+    units = int(round(amount / chip))
+    if units * chip > amount:
+        units -= 1
+    share, odd_chips = divmod(units, len(winners))
+    payouts = {player: (share + (idx < odd_chips)) * chip for idx, player in enumerate(winners)}
+    payouts[winners[0]] += amount - units * chip
+    return payouts
+
+
+def settle(contributions, ranking, folded=(), odd_chip_order=None, chip=1):
+    """
+    Distributes every side pot to the best eligible tie class.
+
+    Args:
+        contributions (dict): {'name': chips} total contribution of every player in the hand.
+        ranking (list): Tie classes from best to worst, each a list of player names - e.g. the players
+        of TexasHoldem.showdown_ranking().
+        folded (iterable): Names of players that have folded.
+        odd_chip_order (list): Player names in odd-chip order; defaults to the order of contributions.
+        chip (int): Smallest chip denomination.
+
+    Returns:
+        dict: {'name': chips won} for every player in contributions.
+
+    """
+    odd_chip_order = list(contributions) if odd_chip_order is None else odd_chip_order
+    seat = {player: idx for idx, player in enumerate(odd_chip_order)}
+    payouts = {player: 0 for player in contributions}
+    for pot in side_pots(contributions, folded):
+        for tie_class in ranking:
+            winners = [player for player in tie_class if player in pot.players]
+            if winners:
+                for player, chips in split(pot.amount, sorted(winners, key=seat.get), chip).items():
+                    payouts[player] += chips
+                break
+    return payouts
+
+
+def settle_batch(contributions, strengths, folded, chip=1):
+    """
+    Settles many tables at once.
+
+    Columns are seats in odd-chip order, i.e. column 0 is the first player left of the dealer button.
+    Unused seats can be given a contribution of 0 and folded=True.
+
+    Args:
+        contributions (array_like): (T, P) total contribution of every player at every table.
+        strengths (array_like): (T, P) showdown strength of every player; a higher value wins.
+        folded (array_like): (T, P) bool, True for players that have folded.
+        chip (int): Smallest chip denomination; every contribution must be a multiple of it.
+
+    Returns:
+        np.ndarray: (T, P) chips won by every player, in the dtype of contributions.
+
+    """
+    contributions = np.asarray(contributions)
+    units = np.rint(contributions / chip).astype(np.int64)
+    if not np.array_equal(units * chip, contributions):
+        raise Exception(f"Action is not possible. Contributions must be multiples of the chip {chip}.")
+    strengths = np.asarray(strengths, dtype=np.int64)
+    active = ~np.asarray(folded, dtype=bool)
+    payouts = np.zeros_like(units)
+    max_active = np.where(active, units, -1).max(axis=1)
+    levels = np.sort(np.where(active, units, max_active[:, None]), axis=1)
+    previous = np.zeros(units.shape[0], dtype=np.int64)
+    for level in levels.T:
+        top = np.where(level >= max_active, np.iinfo(np.int64).max, level)
+        amounts = (np.minimum(units, top[:, None]) - np.minimum(units, previous[:, None])).sum(axis=1)
+        eligible = active & (units >= level[:, None])
+        best = np.where(eligible, strengths, -1)
+        winners = eligible & (best == best.max(axis=1)[:, None])
+        counts = np.maximum(winners.sum(axis=1), 1)
+        shares, odd_chips = np.divmod(amounts, counts)
+        odd = winners & (np.cumsum(winners, axis=1) <= odd_chips[:, None])
+        payouts += winners * shares[:, None] + odd
+        previous = np.maximum(previous, top)
+    return (payouts * chip).astype(contributions.dtype)
@@ -0,0 +1,174 @@
+# -*- coding: utf-8 -*-
+"""
+Compact array-backed state of one table.
+
+Everything that changes during a hand lives in three flat sequences:
+    cards (array('b')): deck order (52), board (5) and the hole cards of every seat (two in Hold'em),
+    as int cards; -1 is empty. Decks of fewer cards (short deck) fill the end of the deck slots.
+    chips (list): pot, then stacks, bets and max_win of every seat. A list rather than an array so chip
+    counts keep their Python type (int buy-ins stay int, half big blinds stay float).
+    counters (array('l')): deal cursor, board size, small-blind seat, big-blind seat, hands played,
+    then the folded flag of every seat.
+
+Copying the three sequences copies the whole table, so clone() and checkpoint()/undo() take microseconds
+and the copies share nothing mutable with the original. Player objects are views over one seat.
+"""
+
+from array import array
+
+DECK, BOARD, HOLE = 0, 52, 57
+POT, STACKS = 0, 1
+CURSOR, BOARD_SIZE, SMALL_BLIND, BIG_BLIND, HANDS_PLAYED, FOLDED = range(6)
+
+
+class GameState:
+    """
+        Array-backed state of a table of seats players.
+
+        Args:
+            seats (int): Number of seats.
+            fortune (float): Starting stack of every seat.
+            decode (list): Card objects indexed by int card, used by Player views to return cards;
+            None to return int cards.
+            hole_cards (int): Hole cards per seat, 4 in Omaha.
+
+        """
+
+    __slots__ = ('seats', 'hole_cards', 'cards', 'chips', 'counters', 'decode', '_history')
+
+    def __init__(self, seats, fortune=0, decode=None, hole_cards=2):
+        self.seats = seats
+        self.hole_cards = hole_cards
+        self.cards = array('b', range(52)) + array('b', [-1] * (5 + hole_cards * seats))
+        self.chips = [0] + [fortune] * seats + [0] * (2 * seats)
+        self.counters = array('l', [0, 0, 0, 1 % seats, 0] + [0] * seats)
+        self.decode = decode
+        self._history = []
+
+    def clone(self):
+        """
+        Returns an independent copy of the state (without its undo history).
+        """
+        state = GameState.__new__(GameState)
+        state.seats = self.seats
+        state.hole_cards = self.hole_cards
+        state.cards = self.cards[:]
+        state.chips = self.chips[:]
+        state.counters = self.counters[:]
+        state.decode = self.decode
+        state._history = []
+        return state
+
+    def checkpoint(self):
+        """
+        Saves the current state; undo() returns to the most recent checkpoint.
+        """
+        self._history.append((self.cards[:], self.chips[:], self.counters[:]))
+
+    def undo(self):
+        self.cards, self.chips, self.counters = self._history.pop()
+
+    def bets_offset(self):
+        return STACKS + self.seats
+
+    def max_win_offset(self):
+        return STACKS + 2 * self.seats
+
+    def deal(self, count):
+        """
+        Returns the next count int cards of the deck and moves the cursor past them.
+
+        Raises:
+            Exception: If count is negative or more than the cards left in the deck.
+        """
+        cursor = self.counters[CURSOR]
+        if count < 0:
+            raise Exception("Action is not possible. Cannot deal a negative number of cards.")
+        if cursor + count > BOARD:
+            raise Exception("Action is not possible. Not enough cards left in the deck.")
+        self.counters[CURSOR] = cursor + count
+        return self.cards[cursor:cursor + count].tolist()
+
+    def remaining_deck(self):
+        return self.cards[self.counters[CURSOR]:BOARD].tolist()
+
+    def set_deck(self, cards):
+        """
+        Places cards at the end of the deck and points the cursor at the first of them.
+        """
+        start = BOARD - len(cards)
+        self.cards[start:BOARD] = array('b', cards)
+        self.counters[CURSOR] = start
+
+    def board(self):
+        return self.cards[BOARD:BOARD + self.counters[BOARD_SIZE]].tolist()
+
+    def set_board(self, cards):
+        self.cards[BOARD:BOARD + len(cards)] = array('b', cards)
+        self.counters[BOARD_SIZE] = len(cards)
+
+    def add_board(self, cards):
+        size = self.counters[BOARD_SIZE]
+        self.cards[BOARD + size:BOARD + size + len(cards)] = array('b', cards)
+        self.counters[BOARD_SIZE] = size + len(cards)
+
+    def hole(self, seat):
+        start = HOLE + self.hole_cards * seat
+        cards = self.cards[start:start + self.hole_cards].tolist()
+        return None if cards[0] < 0 else cards
+
+    def set_hole(self, seat, cards):
+        start = HOLE + self.hole_cards * seat
+        self.cards[start:start + self.hole_cards] = array('b', [-1] * self.hole_cards if cards is None else cards)
+
+    def hand(self, seat):
+        """
+        Returns the hole cards of seat followed by the board, as int cards.
+        """
+        start = HOLE + self.hole_cards * seat
+        return self.cards[start:start + self.hole_cards].tolist() + self.cards[BOARD:BOARD + self.counters[BOARD_SIZE]].tolist()
+
+    def clear_hand(self):
+        """
+        Clears the board, pot, bets, max_win and folded flags for the next hand.
+        """
+        seats = self.seats
+        self.counters[BOARD_SIZE] = 0
+        self.chips[POT] = 0
+        self.chips[STACKS + seats:] = [0] * (2 * seats)
+        self.counters[FOLDED:] = array('l', [0] * seats)
+
+
+class CardView(list):
+    """
+        List of cards read from a GameState that writes every change back through store(cards), so that
+        game.deck.pop() or game.community_cards.extend(cards) update the state the list was read from.
+
+        Args:
+            cards (list): Cards as returned by the property that created the view.
+            store (callable): Called with the list after each change, usually the property setter.
+
+        """
+
+    __slots__ = ('_store',)
+
+    def __init__(self, cards, store):
+        super().__init__(cards)
+        self._store = store
+
+
+def _writes_through(name):
+    method = getattr(list, name)
+
+    def write(self, *args):
+        result = method(self, *args)
+        self._store(self)
+        return result
+    write.__name__ = name
+    return write
+
+
+for _name in ('append', 'extend', 'insert', 'pop', 'remove', 'clear', 'sort', 'reverse',
+              '__setitem__', '__delitem__', '__iadd__', '__imul__'):
+    setattr(CardView, _name, _writes_through(_name))
+del _name
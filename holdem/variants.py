@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+Omaha and 6+ short-deck hand evaluation, and the Variant records the game classes are built on.
+
+Omaha deals four hole cards and a hand must use exactly two of them with exactly three community cards:
+6 x 10 = 60 five card combinations on the river. Instead of evaluating the 60 hands one by one, the
+non-flush part is precomputed per board: for every multiset of board ranks a table row holds the best
+strength of each pair of hole ranks, so a hand is the best of six lookups in the row of its board (see
+load_omaha_tables). A flush needs three board cards of one suit - at most one suit on any board - and
+two hole cards of that suit, so the flush combinations are only enumerated for those hands.
+evaluate_omaha_batch does the same for whole NumPy arrays of hands.
+
+Short deck removes the 2s to 5s (36 cards). A flush beats a full house, and A-6-7-8-9 is the lowest
+straight (and straight flush); every other ranking, including straights over three of a kind, is the
+same as in Hold'em. It has its own strength tables, built on first use like those of the evaluator
+module, and evaluates 5, 6 and 7 cards in one lookup the same way.
+
+Example:
+    variants.OMAHA.evaluate(hole_cards + board)
+    categories, strengths = variants.OMAHA.evaluate_batch(cards)    cards of shape (N, 4 + 5)
+    variants.SHORT_DECK.category(variants.SHORT_DECK.evaluate(cards))
+"""
+
+from collections import namedtuple
+from itertools import combinations
+import numpy as np
+
+from . import evaluator
+from .evaluator import (CARD_KEYS, CARD_BITS, RANK_KEYS, SUIT_SHIFT, SUIT_MASK, HAND_SIZES, BATCH_CHUNK,
+                        HIGH_CARD, PAIR, TWO_PAIRS, THREE_OF_A_KIND, STRAIGHT, FLUSH, FULL_HOUSE,
+                        FOUR_OF_A_KIND, STRAIGHT_FLUSH, ROYAL_FLUSH)
+
+Variant = namedtuple('Variant', 'name hole_cards deck evaluate evaluate_batch best_five category evaluate_five')
+
+OMAHA_HOLE_CARDS = 4
+OMAHA_PAIRS = list(combinations(range(OMAHA_HOLE_CARDS), 2))
+OMAHA_TRIPLES = {size: list(combinations(range(size), 3)) for size in (3, 4, 5)}
+OMAHA_CHUNK = BATCH_CHUNK // 8
+CARD_BITS_ARRAY = np.array(CARD_BITS, dtype=np.int64)
+
+SHORT_DECK_CARDS = [card for card in range(52) if card >> 2 >= 4]
+"Short-deck straights, best first. The last one is the nine-high A-6-7-8-9."
+SHORT_DECK_STRAIGHT_MASKS = [(high, 0b11111 << (high - 4)) for high in range(12, 7, -1)]
+SHORT_DECK_STRAIGHT_MASKS.append((7, 0b1000011110000))
+"Categories from worst to best in short deck: a flush beats a full house."
+SHORT_DECK_ORDER = [HIGH_CARD, PAIR, TWO_PAIRS, THREE_OF_A_KIND, STRAIGHT, FULL_HOUSE, FLUSH,
+                    FOUR_OF_A_KIND, STRAIGHT_FLUSH, ROYAL_FLUSH]
+
+
+"Omaha board tables, built by load_omaha_tables() on first use."
+OMAHA_BOARD_KEYS = OMAHA_BOARD_TABLES = OMAHA_FLUSH_SUITS = None
+_OMAHA_ROWS = _OMAHA_TABLE_VIEWS = _OMAHA_SUITS = None
+
+
+def load_omaha_tables():
+    """
+    Builds the Omaha board tables (a fraction of a second, about 3 MB).
+
+    For every board size and every multiset of board ranks, OMAHA_BOARD_TABLES[size] holds a row of the
+    best non-flush strength of each pair of hole ranks a, b (column a * 13 + b) with any three of the
+    board ranks. Rows are sorted by the summed rank keys of the board (OMAHA_BOARD_KEYS[size]), which
+    the evaluator key of the board already contains. The non-flush part of a hand is then the best of
+    six lookups in one row. OMAHA_FLUSH_SUITS[size] maps the suit part of the board key to the suit of
+    three or more board cards, or -1.
+    """
+    global OMAHA_BOARD_KEYS, OMAHA_BOARD_TABLES, OMAHA_FLUSH_SUITS, _OMAHA_ROWS, _OMAHA_TABLE_VIEWS, _OMAHA_SUITS
+    if OMAHA_BOARD_TABLES is not None:
+        return
+    evaluator.load_tables()
+    dense = evaluator._dense_rank_table(5)
+    rank_keys = np.array(RANK_KEYS, dtype=np.int64)
+    pair_keys = np.add.outer(rank_keys, rank_keys).ravel()
+    board_keys, tables = {}, {}
+    for size, triples in OMAHA_TRIPLES.items():
+        boards = np.array(list(evaluator._rank_multisets(size)))
+        keys = rank_keys[boards].sum(axis=1)
+        boards = boards[np.argsort(keys)]
+        triple_keys = rank_keys[boards[:, np.array(triples)]].sum(axis=2)
+        table = np.zeros((boards.shape[0], 169), dtype=np.uint16)
+        for triple in range(triple_keys.shape[1]):
+            np.maximum(table, dense[np.minimum(triple_keys[:, triple, None] + pair_keys, dense.size - 1)], out=table)
+        board_keys[size], tables[size] = np.sort(keys), table
+    _OMAHA_ROWS = {size: dict(zip(keys.tolist(), range(0, keys.size * 169, 169))) for size, keys in board_keys.items()}
+    _OMAHA_TABLE_VIEWS = {size: memoryview(table.ravel()) for size, table in tables.items()}
+    _OMAHA_SUITS = {size: evaluator._flush_suits(size, minimum=3) for size in OMAHA_TRIPLES}
+    OMAHA_FLUSH_SUITS = {size: np.array(suits, dtype=np.int8) for size, suits in _OMAHA_SUITS.items()}
+    OMAHA_BOARD_KEYS, OMAHA_BOARD_TABLES = board_keys, tables
+
+
+def evaluate_omaha(cards):
+    """
+    Returns the strength of the best Omaha hand: exactly two of the four hole cards and exactly three
+    of the community cards.
+
+    Args:
+        cards (list): Four hole cards followed by three to five community cards, as integer cards.
+
+    Returns:
+        int: Hand strength between 1 and 7462, comparable with evaluator.evaluate strengths.
+
+    """
+    if OMAHA_BOARD_TABLES is None:
+        load_omaha_tables()
+    hole, board = cards[:OMAHA_HOLE_CARDS], cards[OMAHA_HOLE_CARDS:]
+    key = 0
+    for card in board:
+        key += CARD_KEYS[card]
+    row = _OMAHA_ROWS[len(board)][key >> SUIT_SHIFT]
+    table = _OMAHA_TABLE_VIEWS[len(board)]
+    first, second, third, fourth = [card >> 2 for card in hole]
+    best = max(table[row + first * 13 + second], table[row + first * 13 + third],
+               table[row + first * 13 + fourth], table[row + second * 13 + third],
+               table[row + second * 13 + fourth], table[row + third * 13 + fourth])
+    suit = _OMAHA_SUITS[len(board)][key & SUIT_MASK]
+    if suit < 0:
+        return best
+    suited_hole = [CARD_BITS[card] for card in hole if card & 3 == suit]
+    if len(suited_hole) < 2:
+        return best
+    suited_board = [CARD_BITS[card] for card in board if card & 3 == suit]
+    flush_table = evaluator.FLUSH_TABLE
+    for first, second in combinations(suited_hole, 2):
+        for triple in combinations(suited_board, 3):
+            strength = flush_table[first | second | triple[0] | triple[1] | triple[2]]
+            if strength > best:
+                best = strength
+    return best
+
+
+def _omaha_flushes(hole, board, suits):
+    """
+    Returns the best flush of hands that have at least two hole cards and three board cards of suit.
+    """
+    pair_cards = hole[:, OMAHA_PAIRS]
+    triple_cards = board[:, OMAHA_TRIPLES[board.shape[1]]]
+    pair_suited = ((pair_cards & 3) == suits[:, None, None]).all(axis=2)
+    triple_suited = ((triple_cards & 3) == suits[:, None, None]).all(axis=2)
+    masks = np.bitwise_or.reduce(CARD_BITS_ARRAY[pair_cards], axis=2)[:, :, None] | \
+        np.bitwise_or.reduce(CARD_BITS_ARRAY[triple_cards], axis=2)[:, None, :]
+    suited = pair_suited[:, :, None] & triple_suited[:, None, :]
+    return np.where(suited, evaluator.FLUSH_TABLE_ARRAY[masks], 0).max(axis=(1, 2))
+
+
+def _omaha_chunk(hole, board):
+    size = board.shape[1]
+    first, second = np.array(OMAHA_PAIRS).T
+    ranks = hole >> 2
+    pairs = ranks[:, first] * 13 + ranks[:, second]
+    keys = evaluator.CARD_KEYS_ARRAY[board].sum(axis=1)
+    rows = np.searchsorted(OMAHA_BOARD_KEYS[size], keys >> SUIT_SHIFT)
+    strengths = OMAHA_BOARD_TABLES[size][rows[:, None], pairs].max(axis=1)
+    suits = OMAHA_FLUSH_SUITS[size][keys & SUIT_MASK]
+    hands = np.flatnonzero(((hole & 3) == suits[:, None]).sum(axis=1) >= 2)
+    if hands.size:
+        strengths[hands] = np.maximum(strengths[hands], _omaha_flushes(hole[hands], board[hands], suits[hands]))
+    return strengths
+
+
+def evaluate_omaha_batch(cards):
+    """
+    Evaluates many Omaha hands at once; see evaluate_omaha.
+
+    Args:
+        cards (array_like): Integer card array of shape (N, 7), (N, 8) or (N, 9): four hole cards
+        followed by the community cards of each hand.
+
+    Returns:
+        categories (np.ndarray): uint8 array of shape (N,) with the hand category of each hand.
+        strengths (np.ndarray): uint16 array of shape (N,) with the strength of each hand.
+
+    """
+    load_omaha_tables()
+    cards = np.asarray(cards, dtype=np.intp)
+    if cards.ndim != 2 or cards.shape[1] - OMAHA_HOLE_CARDS not in OMAHA_TRIPLES:
+        raise Exception("Omaha hands must be given as an array of shape (N, 7), (N, 8) or (N, 9).")
+    strengths = np.empty(cards.shape[0], dtype=np.uint16)
+    for start in range(0, cards.shape[0], OMAHA_CHUNK):
+        chunk = cards[start:start + OMAHA_CHUNK]
+        strengths[start:start + OMAHA_CHUNK] = _omaha_chunk(chunk[:, :OMAHA_HOLE_CARDS], chunk[:, OMAHA_HOLE_CARDS:])
+    return evaluator.CATEGORY_ARRAY[strengths], strengths
+
+
+def best_five_omaha(cards):
+    """
+    Finds the two hole cards and three community cards that make up the best Omaha hand.
+
+    Args:
+        cards (list): Four hole cards followed by three to five community cards, as integer cards
+        or Card(rank, suit) namedtuples.
+
+    Returns:
+        tuple: (strength, five_cards) where five_cards is a tuple of the same type as cards.
+
+    """
+    encoded = [card if isinstance(card, int) else evaluator.CARD_INDEX[card] for card in cards]
+    strength = evaluate_omaha(encoded)
+    for pair in OMAHA_PAIRS:
+        for triple in combinations(range(OMAHA_HOLE_CARDS, len(cards)), 3):
+            idx = pair + triple
+            if evaluator.evaluate([encoded[i] for i in idx]) == strength:
+                return strength, tuple(cards[i] for i in idx)
+
+
+def _short_deck_key(hand_class):
+    return (SHORT_DECK_ORDER.index(hand_class[0]),) + hand_class[1:]
+
+
+def _build_short_deck_tables():
+    rank_classes = {size: {sum(RANK_KEYS[rank] for rank in ranks): evaluator._rank_class(ranks, SHORT_DECK_STRAIGHT_MASKS)
+                           for ranks in evaluator._rank_multisets(size) if min(ranks) >= 4}
+                    for size in HAND_SIZES}
+    flush_classes = {mask << 4: evaluator._flush_class(mask << 4, SHORT_DECK_STRAIGHT_MASKS)
+                     for mask in range(1 << 9) if bin(mask).count('1') >= 5}
+    classes = sorted(set(rank_classes[5].values()) | set(flush_classes.values()), key=_short_deck_key)
+    strengths = {hand_class: idx + 1 for idx, hand_class in enumerate(classes)}
+    rank_tables = [None] * (max(HAND_SIZES) + 1)
+    for size in HAND_SIZES:
+        rank_tables[size] = {key: strengths[hand_class] for key, hand_class in rank_classes[size].items()}
+    flush_table = [0] * (1 << 13)
+    for mask, hand_class in flush_classes.items():
+        flush_table[mask] = strengths[hand_class]
+    category_table = [None] + [hand_class[0] for hand_class in classes]
+    return rank_tables, flush_table, category_table
+
+
+"Short-deck lookup tables, built by load_short_deck_tables() on first use."
+SHORT_DECK_RANK_TABLES = SHORT_DECK_FLUSH_TABLE = SHORT_DECK_CATEGORY_TABLE = None
+SHORT_DECK_FLUSH_ARRAY = SHORT_DECK_CATEGORY_ARRAY = None
+_SHORT_DECK_DENSE_TABLES = {}
+
+
+def load_short_deck_tables():
+    """
+    Builds the short-deck tables (and the evaluator tables they share the flush suit tables with).
+    """
+    global SHORT_DECK_RANK_TABLES, SHORT_DECK_FLUSH_TABLE, SHORT_DECK_CATEGORY_TABLE
+    global SHORT_DECK_FLUSH_ARRAY, SHORT_DECK_CATEGORY_ARRAY
+    if SHORT_DECK_CATEGORY_TABLE is not None:
+        return
+    evaluator.load_tables()
+    rank_tables, flush_table, category_table = _build_short_deck_tables()
+    SHORT_DECK_FLUSH_ARRAY = np.array(flush_table, dtype=np.uint16)
+    SHORT_DECK_CATEGORY_ARRAY = np.array([HIGH_CARD] + category_table[1:], dtype=np.uint8)
+    SHORT_DECK_RANK_TABLES, SHORT_DECK_FLUSH_TABLE = rank_tables, flush_table
+    SHORT_DECK_CATEGORY_TABLE = category_table
+
+
+def evaluate_short_deck(cards):
+    """
+    Returns the short-deck strength of the best five card hand that can be made from 5, 6 or 7 integer
+    cards between 6 and A.
+
+    Args:
+        cards (list): Five to seven integer cards.
+
+    Returns:
+        int: Hand strength between 1 (J-9-8-7-6 offsuit) and the royal flush. Short-deck strengths
+        only compare with each other.
+
+    """
+    if SHORT_DECK_CATEGORY_TABLE is None:
+        load_short_deck_tables()
+    key = 0
+    for card in cards:
+        key += CARD_KEYS[card]
+    suit = evaluator.FLUSH_SUITS[len(cards)][key & SUIT_MASK]
+    if suit >= 0:
+        mask = 0
+        for card in cards:
+            if card & 3 == suit:
+                mask |= CARD_BITS[card]
+        return SHORT_DECK_FLUSH_TABLE[mask]
+    return SHORT_DECK_RANK_TABLES[len(cards)][key >> SUIT_SHIFT]
+
+
+def _short_deck_dense_table(size):
+    if size not in _SHORT_DECK_DENSE_TABLES:
+        keys = np.fromiter(SHORT_DECK_RANK_TABLES[size].keys(), dtype=np.int64)
+        table = np.zeros(keys.max() + 1, dtype=np.uint16)
+        table[keys] = np.fromiter(SHORT_DECK_RANK_TABLES[size].values(), dtype=np.uint16)
+        _SHORT_DECK_DENSE_TABLES[size] = table
+    return _SHORT_DECK_DENSE_TABLES[size]
+
+
+def evaluate_short_deck_batch(cards):
+    """
+    Evaluates many short-deck hands at once; see evaluate_short_deck and evaluator.evaluate_batch.
+
+    Returns:
+        categories (np.ndarray): uint8 array of shape (N,) with the hand category of each hand.
+        strengths (np.ndarray): uint16 array of shape (N,) with the short-deck strength of each hand.
+
+    """
+    load_short_deck_tables()
+    cards = np.asarray(cards, dtype=np.intp)
+    if cards.ndim != 2 or cards.shape[1] not in HAND_SIZES:
+        raise Exception("Hands must be given as an array of shape (N, 5), (N, 6) or (N, 7).")
+    rank_table = _short_deck_dense_table(cards.shape[1])
+    flush_suits = evaluator.FLUSH_SUITS_ARRAY[cards.shape[1]]
+    strengths = np.empty(cards.shape[0], dtype=np.uint16)
+    for start in range(0, cards.shape[0], BATCH_CHUNK):
+        stop = start + BATCH_CHUNK
+        strengths[start:stop] = evaluator._evaluate_chunk(cards[start:stop], rank_table, flush_suits,
+                                                          SHORT_DECK_FLUSH_ARRAY)
+    return SHORT_DECK_CATEGORY_ARRAY[strengths], strengths
+
+
+def best_five_short_deck(cards):
+    """
+    Finds the five cards that make up the best short-deck hand among 5, 6 or 7 cards; see evaluator.best_five.
+    """
+    encoded = [card if isinstance(card, int) else evaluator.CARD_INDEX[card] for card in cards]
+    strength = evaluate_short_deck(encoded)
+    for idx in combinations(range(len(cards)), 5):
+        if evaluate_short_deck([encoded[i] for i in idx]) == strength:
+            return strength, tuple(cards[i] for i in idx)
+
+
+def short_deck_category(strength):
+    """
+    Returns the hand category (HIGH_CARD ... ROYAL_FLUSH) of a short-deck hand strength.
+    """
+    if SHORT_DECK_CATEGORY_TABLE is None:
+        load_short_deck_tables()
+    return SHORT_DECK_CATEGORY_TABLE[strength]
+
+
+"Game variants; evaluate, evaluate_batch and best_five take the hole cards followed by the community cards."
+HOLDEM = Variant('holdem', 2, list(range(52)), evaluator.evaluate, evaluator.evaluate_batch,
+                 evaluator.best_five, evaluator.category, evaluator.evaluate)
+OMAHA = Variant('omaha', OMAHA_HOLE_CARDS, list(range(52)), evaluate_omaha, evaluate_omaha_batch,
+                best_five_omaha, evaluator.category, evaluator.evaluate)
+SHORT_DECK = Variant('short-deck', 2, SHORT_DECK_CARDS, evaluate_short_deck, evaluate_short_deck_batch,
+                     best_five_short_deck, short_deck_category, evaluate_short_deck)
+VARIANTS = {variant.name: variant for variant in (HOLDEM, OMAHA, SHORT_DECK)}
@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+import json
+
+from holdem import benchmarks
+
+
+def test_every_benchmark_call_runs():
+    for name, call in benchmarks.benchmark_calls(3, seed=1).items():
+        call()
+        call()
+
+
+def test_run_benchmarks_reports_the_selected_names():
+    results = benchmarks.run_benchmarks([2], seed=1, names=['winner', 'sort_cards'])
+    assert set(results['results']) == {'winner/2', 'sort_cards/2'}
+    assert all(result['latency_us'] > 0 and result['calls'] > 0 for result in results['results'].values())
+    assert results['meta']['seed'] == 1
+
+
+def test_compare_flags_slowdowns_above_the_threshold(capsys):
+    baseline = {'results': {'winner/2': {'latency_us': 10.0}, 'sort_cards/2': {'latency_us': 10.0}}}
+    current = {'results': {'winner/2': {'latency_us': 10.5}, 'sort_cards/2': {'latency_us': 12.0},
+                           'new/2': {'latency_us': 1.0}}}
+    assert benchmarks.compare(current, baseline, threshold=0.10) == ['sort_cards/2']
+    assert 'SLOWER' in capsys.readouterr().out
+
+
+def test_main_writes_and_compares_json(tmp_path):
+    path = str(tmp_path / 'baseline.json')
+    assert benchmarks.main(['--players', '2', '--only', 'sort_cards', '--output', path]) == 0
+    with open(path) as file:
+        assert list(json.load(file)['results']) == ['sort_cards/2']
+    assert benchmarks.main(['--players', '2', '--only', 'sort_cards', '--compare', path, '--threshold', '10']) == 0
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+import random
+
+from holdem import TexasHoldem, evaluator
+from holdem.cache import EvaluationCache, canonical_form
+
+
+def test_lru_bounds_and_counters():
+    cache = EvaluationCache(max_entries=3)
+    for key in 'abc':
+        assert cache.get_or_compute(key, lambda: key.upper()) == key.upper()
+    assert cache.get_or_compute('a', lambda: 'recomputed') == 'A'
+    cache.get_or_compute('d', lambda: 'D')
+    assert list(cache.entries) == ['c', 'a', 'd']
+    assert cache.stats() == {'hits': 1, 'misses': 4, 'hit_rate': 0.2, 'evictions': 1, 'entries': 3,
+                             'bytes': cache.size_bytes}
+    assert cache.get_or_compute('b', lambda: 'B2') == 'B2'
+    assert len(cache) == 3 and cache.evictions == 2
+
+
+def test_memory_bound_evicts_oldest_entries():
+    cache = EvaluationCache(max_entries=1000, max_bytes=2000)
+    for idx in range(50):
+        cache.get_or_compute(idx, lambda: tuple(range(10)))
+    assert 0 < len(cache) < 50 and cache.size_bytes <= 2000
+    assert cache.evictions == 50 - len(cache)
+    assert list(cache.entries) == list(range(50 - len(cache), 50))
+
+
+def test_canonical_form_ignores_suit_names():
+    hands, board = [[48, 45], [20, 17]], [0, 5, 10]
+    swapped = [[card & ~3 | [1, 0, 3, 2][card & 3] for card in cards] for cards in hands + [board]]
+    assert canonical_form(hands, board) == canonical_form(swapped[:2], swapped[2])
+    assert canonical_form(hands, board) != canonical_form(hands[::-1], board)
+
+
+def test_cached_showdowns_match_uncached_tables():
+    random.seed(6)
+    cache = EvaluationCache()
+    cached = TexasHoldem(['TUDOR', 'ANDREW', 'ELENA'], 100, 2, cache=cache)
+    for _ in range(50):
+        cached.state.clear_hand()
+        cached.reset_deck()
+        cached.shuffle_cards()
+        cached.deal_players()
+        for flop in (True, False, False):
+            cached.deal_board(flop=flop)
+        strengths = cached.showdown_strengths()
+        assert cached.showdown_strengths() == strengths
+        assert strengths == {player: evaluator.evaluate(cached.state.hand(seat))
+                             for seat, player in enumerate(cached.players)}
+    assert cache.hits == cache.misses == 50
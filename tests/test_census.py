@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+from itertools import combinations
+from math import comb
+import numpy as np
+
+from holdem import census
+
+
+def test_colex_combinations():
+    table = census.colex_combinations(7, 3)
+    assert table.shape == (comb(7, 3), 3)
+    assert sorted(map(tuple, table.tolist())) == list(combinations(range(7), 3))
+    assert table[:comb(5, 3)].max() == 4
+
+
+def test_five_card_census_matches_the_reference(capsys):
+    counts, elapsed = census.run_census(5, workers=1)
+    assert counts.tolist() == census.REFERENCE_COUNTS[5]
+    assert census.report(5, counts, elapsed)
+    assert 'ALL TESTS PASSED:  True' in capsys.readouterr().out
+
+
+def test_census_in_worker_processes_matches_in_process():
+    assert np.array_equal(census.run_census(5, workers=2)[0], census.REFERENCE_COUNTS[5])
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from holdem.cfr import (BettingTree, CFRTrainer, DECISION, FOLD, CALL, RAISE, FOLDED, SHOWDOWN, preflop_bucket,
+                        strength_buckets)
+
+
+def test_betting_tree_is_fixed_limit():
+    tree = BettingTree()
+    assert tree.kind[0] == DECISION and tree.player[0] == 0
+    assert tree.contributions[0].tolist() == [1, 2]
+    completed = tree.children[0, CALL]
+    assert tree.kind[completed] == DECISION and tree.player[completed] == 1 and tree.street[completed] == 0
+    assert tree.kind[tree.children[0, FOLD]] == FOLDED
+    showdowns = np.flatnonzero(tree.kind == SHOWDOWN)
+    assert showdowns.size and (tree.contributions[showdowns, 0] == tree.contributions[showdowns, 1]).all()
+    assert tree.contributions.max() == 2 * 4 + 2 * 4 + 4 * 4 + 4 * 4
+    raises = tree.children[:, RAISE]
+    assert (tree.kind[raises[raises >= 0]] == DECISION).all()
+
+
+def test_preflop_buckets_cover_the_169_starting_hands():
+    buckets = {preflop_bucket(first, second) for first in range(52) for second in range(first + 1, 52)}
+    assert buckets == set(range(169))
+    assert preflop_bucket(48, 49) == 12
+    assert preflop_bucket(48, 44) != preflop_bucket(48, 45)
+
+
+def test_strength_buckets_rank_the_nuts_last():
+    board = np.array([[0, 17, 34, 44, 45]])
+    assert strength_buckets(np.array([[46, 47]]), board, 10)[0] == 9
+    assert strength_buckets(np.array([[4, 9]]), board, 10)[0] < 5
+
+
+def test_training_is_reproducible_and_checkpoints(tmp_path):
+    first, second = CFRTrainer(seed=3), CFRTrainer(seed=3)
+    first.train(200, task_iterations=100)
+    second.train(200, task_iterations=100)
+    assert first.iterations == 200 and np.array_equal(first.regrets, second.regrets)
+    assert (first.regrets >= 0).all()
+    strategy = first.average_strategy()
+    assert strategy.sum(axis=1) == pytest.approx(1.0)
+    path = str(tmp_path / 'cfr.npz')
+    first.save(path)
+    loaded = CFRTrainer.load(path)
+    assert loaded.iterations == 200 and np.array_equal(loaded.strategy_sum, first.strategy_sum)
+    probabilities = loaded.action_probabilities(loaded.tree.children[0, CALL], [48, 49])
+    assert probabilities.sum() == pytest.approx(1.0) and probabilities[FOLD] == 0
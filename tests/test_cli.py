@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+import os
+import subprocess
+import sys
+
+import pytest
+
+from holdem import census, cli
+
+
+def test_import_builds_no_tables():
+    code = ('import sys, holdem; from holdem import evaluator; '
+            'assert evaluator.CATEGORY_TABLE is None; assert "holdem.cli" not in sys.modules')
+    subprocess.run([sys.executable, '-c', code], check=True, cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def test_list_positionals_accept_their_defaults(monkeypatch):
+    sizes = []
+    monkeypatch.setattr(census, 'run_census', lambda size, workers: (sizes.append(size), ([0] * 10, 1.0))[1])
+    monkeypatch.setattr(census, 'report', lambda size, counts, elapsed: True)
+    assert cli.main(['census']) == 0
+    assert sizes == [5, 7]
+
+
+def test_list_positionals_reject_unknown_values():
+    with pytest.raises(SystemExit):
+        cli.main(['census', '4'])
+    with pytest.raises(SystemExit):
+        cli.main(['selfplay', 'bluff'])
+
+
+def test_icm_command(capsys):
+    assert cli.main(['icm', '5000', '3000', '2000', '--payouts', '50', '30', '20']) == 0
+    rows = [line.split() for line in capsys.readouterr().out.splitlines()]
+    assert [row[1] for row in rows] == ['5,000', '3,000', '2,000']
+    assert sum(float(row[2]) for row in rows) == pytest.approx(100, abs=0.02)
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+import random
+from itertools import combinations
+import pytest
+
+from holdem import Omaha, ShortDeckHoldem, SimulatedTexasHoldem, TexasHoldem, evaluator
+from holdem.cache import EvaluationCache
+from holdem.equity import (build_preflop_table, canonical_matchup, exact_equity, game_equity, game_exact_equity,
+                           preflop_lookup, simulate_equity)
+
+
+def _flop(game_class):
+    random.seed(4)
+    game = game_class(['TUDOR', 'ANDREW'], 100, 2)
+    game.shuffle_cards()
+    game.deal_players()
+    game.deal_board(flop=True)
+    return game
+
+
+def _brute_force_wins(game):
+    hands = [game.encoded_cards(game.table[player].cards) for player in game.players]
+    board = game.encoded_cards(game.community_cards)
+    deck = [card for card in game.VARIANT.deck if card not in board and all(card not in hand for hand in hands)]
+    wins = [0] * len(hands)
+    runouts = list(combinations(deck, 2))
+    for runout in runouts:
+        strengths = [game.VARIANT.evaluate(hand + board + list(runout)) for hand in hands]
+        if strengths.count(max(strengths)) == 1:
+            wins[strengths.index(max(strengths))] += 1
+    return [win / len(runouts) for win in wins]
+
+
+@pytest.mark.parametrize('game_class', [TexasHoldem, Omaha, ShortDeckHoldem])
+def test_game_exact_equity_uses_the_game_variant(game_class):
+    game = _flop(game_class)
+    expected = _brute_force_wins(game)
+    for equities in (game_exact_equity(game), game_exact_equity(game, cache=EvaluationCache())):
+        assert [equities[player].win for player in game.players] == pytest.approx(expected)
+    simulated = game_equity(game, samples=20000, workers=1, seed=1)
+    assert [simulated[player].win for player in game.players] == pytest.approx(expected, abs=0.02)
+
+
+def test_game_equity_takes_dead_cards_of_simulated_tables():
+    game = SimulatedTexasHoldem(['TUDOR', 'ANDREW'], 100, 2, seed=4)
+    game.deal_players()
+    game.deal_board(flop=True)
+    used = set(game.community_cards).union(*(game.table[player].cards for player in game.players))
+    dead_cards = [card for card in range(52) if card not in used][:2]
+    equities = game_exact_equity(game, dead_cards=dead_cards)
+    assert sum(equity.equity for equity in equities.values()) == pytest.approx(1)
+    assert game_equity(game, dead_cards=dead_cards, samples=1000, workers=1, seed=1).keys() == equities.keys()
+
+
+def test_game_equity_skips_folded_players_without_cards():
+    game = _flop(TexasHoldem)
+    expected = game_exact_equity(game)
+    random.seed(4)
+    three_handed = TexasHoldem(['TUDOR', 'ANDREW', 'ELENA'], 100, 2)
+    three_handed.shuffle_cards()
+    for player in game.players:
+        three_handed.table[player].cards = game.table[player].cards
+    three_handed.community_cards = game.community_cards
+    three_handed.deck = game.deck
+    three_handed.table['ELENA'].fold()
+    assert three_handed.table['ELENA'].cards is None
+    equities = game_exact_equity(three_handed)
+    assert list(equities) == ['TUDOR', 'ANDREW']
+    wins = [equities[player].win for player in game.players]
+    assert wins == pytest.approx([expected[player].win for player in game.players])
+    assert set(game_equity(three_handed, samples=2000, workers=1, seed=1)) == {'TUDOR', 'ANDREW'}
+
+
+def test_simulate_equity_is_reproducible_across_workers():
+    hands, board = [[48, 49], [44, 40]], [0, 9, 22]
+    single, count = simulate_equity(hands, board, samples=50000, workers=1, seed=7)
+    parallel, parallel_count = simulate_equity(hands, board, samples=50000, workers=2, seed=7)
+    assert count == parallel_count == 50000
+    assert single == parallel
+    assert sum(equity.equity for equity in single) == pytest.approx(1)
+
+
+def test_simulate_equity_stops_at_the_time_budget():
+    equities, count = simulate_equity([[48, 49], [44, 40]], samples=None, time_budget=0.2, workers=1, seed=1)
+    assert 0 < count and sum(equity.equity for equity in equities) == pytest.approx(1)
+
+
+def test_canonical_matchup_ignores_suit_names_and_seats():
+    key, swapped = canonical_matchup([48, 49], [44, 40])
+    assert canonical_matchup([50, 51], [46, 42]) == (key, swapped)
+    assert canonical_matchup([44, 40], [48, 49]) == (key, not swapped)
+
+
+def test_exact_equity_on_the_turn():
+    hands, board = [[48, 49], [44, 40]], [0, 9, 22, 33]
+    equities, runouts = exact_equity(hands, board)
+    assert runouts == 44
+    deck = [card for card in range(52) if card not in board + hands[0] + hands[1]]
+    wins = sum(evaluator.evaluate(hands[0] + board + [card]) > evaluator.evaluate(hands[1] + board + [card])
+               for card in deck)
+    assert equities[0].win == pytest.approx(wins / 44)
+
+
+def test_preflop_table_matches_enumeration(tmp_path):
+    path = str(tmp_path / 'preflop.bin')
+    hero, villain = [48, 45], [20, 17]
+    key, swapped = canonical_matchup(hero, villain)
+    assert build_preflop_table(path, workers=1, keys=[key]) == 1
+    assert preflop_lookup(hero, villain, path) == exact_equity([hero, villain], path=str(tmp_path / 'missing.bin'))[0]
+    assert preflop_lookup([48, 45], [24, 21], path) is None
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+import random
+from itertools import combinations
+import numpy as np
+import pytest
+
+from holdem import evaluator
+
+
+def _hand(*cards):
+    """
+    Integer cards from short names such as 'As', 'Td' or '10h' (suits s, c, d, h).
+    """
+    suits = {suit[0]: suit for suit in evaluator.SUITS}
+    return [evaluator.encode((text[:-1].replace('T', '10'), suits[text[-1]])) for text in cards]
+
+
+def test_strengths_order_the_categories():
+    hands = [
+        _hand('7s', '5c', '4d', '3h', '2s'),
+        _hand('As', 'Kc', 'Qd', 'Jh', '9s'),
+        _hand('2s', '2c', '5d', '4h', '3s'),
+        _hand('As', 'Ac', 'Kd', 'Qh', 'Js'),
+        _hand('3s', '3c', '2d', '2h', '4s'),
+        _hand('2s', '2c', '2d', '4h', '3s'),
+        _hand('As', '2c', '3d', '4h', '5s'),
+        _hand('6s', '2c', '3d', '4h', '5s'),
+        _hand('Ts', 'Jc', 'Qd', 'Kh', 'As'),
+        _hand('2s', '3s', '4s', '5s', '7s'),
+        _hand('2s', '2c', '2d', '3h', '3s'),
+        _hand('2s', '2c', '2d', '2h', '3s'),
+        _hand('As', '2s', '3s', '4s', '5s'),
+        _hand('9s', 'Ks', 'Qs', 'Js', 'Ts'),
+        _hand('Ts', 'Js', 'Qs', 'Ks', 'As'),
+        ]
+    strengths = [evaluator.evaluate(hand) for hand in hands]
+    assert strengths == sorted(strengths) and len(set(strengths)) == len(strengths)
+    assert strengths[0] == 1 and strengths[-1] == 7462
+    assert [evaluator.category(strength) for strength in strengths] == [
+        evaluator.HIGH_CARD, evaluator.HIGH_CARD, evaluator.PAIR, evaluator.PAIR, evaluator.TWO_PAIRS,
+        evaluator.THREE_OF_A_KIND, evaluator.STRAIGHT, evaluator.STRAIGHT, evaluator.STRAIGHT, evaluator.FLUSH,
+        evaluator.FULL_HOUSE, evaluator.FOUR_OF_A_KIND, evaluator.STRAIGHT_FLUSH, evaluator.STRAIGHT_FLUSH,
+        evaluator.ROYAL_FLUSH]
+
+
+def test_strength_ignores_card_order_and_suits_without_flush():
+    random.seed(1)
+    for _ in range(500):
+        hand = random.sample(range(52), 5)
+        shuffled = random.sample(hand, 5)
+        assert evaluator.evaluate(hand) == evaluator.evaluate(shuffled)
+    assert evaluator.evaluate(_hand('As', 'Kc', 'Qd', 'Jh', '9s')) == \
+        evaluator.evaluate(_hand('Ah', 'Kd', 'Qc', 'Js', '9d'))
+
+
+def test_encode_round_trips():
+    for card in range(52):
+        assert evaluator.encode(evaluator.decode(card)) == card
+
+
+def test_six_and_seven_cards_match_the_best_five():
+    random.seed(2)
+    for size in (6, 7):
+        for _ in range(300):
+            hand = random.sample(range(52), size)
+            expected = max(evaluator.evaluate(list(five)) for five in combinations(hand, 5))
+            assert evaluator.evaluate(hand) == expected
+            strength, five_cards = evaluator.best_five(hand)
+            assert strength == expected == evaluator.evaluate(list(five_cards))
+
+
+def test_seven_card_flush_beats_the_paired_board():
+    hand = _hand('2h', '7h', 'Kh', 'Ks', 'Kc', '9h', '4h')
+    assert evaluator.category(evaluator.evaluate(hand)) == evaluator.FLUSH
+
+
+def test_batch_counts_every_five_card_hand():
+    categories, strengths = evaluator.evaluate_batch(np.array(list(combinations(range(52), 5))))
+    assert np.bincount(categories, minlength=10).tolist() == [1302540, 1098240, 123552, 54912, 10200, 5108,
+                                                              3744, 624, 36, 4]
+    assert np.unique(strengths).size == 7462
+
+
+def test_batch_matches_single_evaluation():
+    rng = np.random.default_rng(3)
+    for size in (5, 6, 7):
+        hands = np.array([rng.choice(52, size, replace=False) for _ in range(2000)])
+        categories, strengths = evaluator.evaluate_batch(hands)
+        assert strengths.tolist() == [evaluator.evaluate(hand) for hand in hands.tolist()]
+        assert categories.tolist() == [evaluator.category(strength) for strength in strengths.tolist()]
+
+
+def test_batch_rejects_other_shapes():
+    with pytest.raises(Exception):
+        evaluator.evaluate_batch(np.zeros((3, 4), dtype=int))
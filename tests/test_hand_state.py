@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+import random
+
+from holdem import evaluator
+from holdem.hand_state import HandState
+
+
+def _cards(*ranks, suits=('spades', 'clubs', 'diamonds', 'hearts')):
+    return [evaluator.encode((rank, suits[idx % len(suits)])) for idx, rank in enumerate(ranks)]
+
+
+def _rank(name):
+    return evaluator.RANKS.index(name)
+
+
+def test_straight_draws():
+    assert HandState(_cards('9', '8', '7', '6', 'K')).straight_draw() == [_rank('10'), _rank('5')]
+    assert HandState(_cards('9', '8', '6', '5', 'K')).straight_draw() == [_rank('7')]
+    assert HandState(_cards('A', 'K', '9', '4', '2')).straight_draw() == []
+
+
+def test_made_straights_still_draw_to_higher_straights():
+    assert HandState(_cards('A', '2', '3', '4', '5')).straight_draw() == [_rank('6')]
+    assert HandState(_cards('10', 'J', 'Q', 'K', 'A')).straight_draw() == []
+    assert HandState(_cards('5', '6', '7', '8', '9', 'A')).straight_draw() == [_rank('10')]
+
+
+def test_flush_draw():
+    hand = HandState(_cards('A', 'K', '7', '2', suits=('hearts',)) + _cards('9'))
+    assert hand.flush_draw() == 3
+
+
+def test_incremental_strength_and_outs_match_evaluation():
+    random.seed(13)
+    for _ in range(200):
+        cards = random.sample(range(52), 7)
+        hand = HandState(cards[:2])
+        for size in (5, 6, 7):
+            for card in cards[len(hand.cards):size]:
+                hand.add(card)
+            assert hand.strength() == evaluator.evaluate(cards[:size])
+        hand = HandState(cards[:5])
+        current = evaluator.category(evaluator.evaluate(cards[:5]))
+        expected = [card for card in range(52) if card not in cards[:5]
+                    and evaluator.category(evaluator.evaluate(cards[:5] + [card])) > current]
+        assert hand.outs() == expected
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+import random
+import pytest
+
+from holdem import Omaha, ShortDeckHoldem, TexasHoldem
+from holdem.history import HandHistory, HandHistoryWriter
+
+PLAYERS = ['TUDOR', 'ANDREW', 'ELENA']
+
+
+def _play(game, hands, blinds=None):
+    holes, boards = [], []
+    for _ in range(hands):
+        game.state.clear_hand()
+        game.reset_deck()
+        game.shuffle_cards()
+        game.deal_players()
+        holes.append([list(game.state.hole(seat)) for seat in range(len(game.players))])
+        (blinds or game.blinds)()
+        game.place_bet('TUDOR', game.big_blind)
+        game.deal_board(flop=True)
+        game.deal_board(flop=False)
+        game.deal_board(flop=False)
+        boards.append(list(game.state.board()))
+        game.settle_pot()
+        game.set_blind_buttons()
+    return holes, boards
+
+
+@pytest.mark.parametrize('game_class', [TexasHoldem, Omaha, ShortDeckHoldem])
+def test_hands_round_trip(tmp_path, game_class):
+    random.seed(16)
+    path = str(tmp_path / 'session.thh')
+    game = game_class(PLAYERS, 100, 2)
+    with HandHistoryWriter(path, game):
+        holes, boards = _play(game, 20)
+    with HandHistory(path) as history:
+        assert history.hole_size == game_class.VARIANT.hole_cards
+        assert [hand.hole_cards for hand in history] == holes
+        assert [hand.board for hand in history] == boards
+        assert history.hole_cards().tolist() == holes
+        rebuilt = history.rebuild(len(history) - 1, game_class=game_class)
+        assert [rebuilt.table[player].fortune for player in PLAYERS] == [game.table[player].fortune for player in PLAYERS]
+
+
+def test_rebuild_rejects_another_variant(tmp_path):
+    path = str(tmp_path / 'session.thh')
+    game = Omaha(PLAYERS, 100, 2)
+    with HandHistoryWriter(path, game):
+        _play(game, 1)
+    with HandHistory(path) as history, pytest.raises(Exception):
+        history.rebuild(0, game_class=TexasHoldem)
+
+
+def test_direct_blind_calls_are_recorded(tmp_path):
+    random.seed(17)
+    path = str(tmp_path / 'session.thh')
+    game = TexasHoldem(PLAYERS, 100, 2)
+
+    def blinds():
+        game.blinds()
+        game.place_small_blind()
+        game.place_big_blind()
+
+    with HandHistoryWriter(path, game):
+        _play(game, 10, blinds)
+    with HandHistory(path) as history:
+        assert history.stacks(len(history)) == [game.table[player].fortune for player in PLAYERS]
+        rebuilt = history.rebuild(len(history) - 1, game_class=TexasHoldem)
+        assert [rebuilt.table[player].fortune for player in PLAYERS] == [game.table[player].fortune for player in PLAYERS]
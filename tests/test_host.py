@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+import asyncio
+import random
+import pytest
+
+from holdem import Omaha, ShortDeckHoldem, TexasHoldem
+from holdem.host import TableHost
+
+
+async def _river_showdowns(game_class, tables=50):
+    host = TableHost(game_class=game_class)
+    task = asyncio.create_task(host.run())
+    names = [f't{idx}' for idx in range(tables)]
+    for name in names:
+        host.open_table(name, ['TUDOR', 'ANDREW', 'ELENA'], 100, 2)
+    for kind in ('deal', 'flop', 'turn', 'river'):
+        await asyncio.gather(*(host.submit(name, kind) for name in names))
+    results = await asyncio.gather(*(host.submit(name, 'showdown') for name in names))
+    host.stop()
+    await task
+    return host, [(result, host.tables[name].winner()) for result, name in zip(results, names)]
+
+
+@pytest.mark.parametrize('game_class', [TexasHoldem, Omaha, ShortDeckHoldem])
+def test_batched_showdowns_use_the_table_variant(game_class):
+    random.seed(15)
+    host, results = asyncio.run(_river_showdowns(game_class))
+    assert host.batched_showdowns == len(results)
+    assert all(result == expected for result, expected in results)
+
+
+def _broken_batch(hands):
+    raise RuntimeError('broken evaluator')
+
+
+async def _showdowns_with_broken_table():
+    host = TableHost()
+    task = asyncio.create_task(host.run())
+    for name in ('ok', 'broken'):
+        host.open_table(name, ['TUDOR', 'ANDREW'], 100, 2)
+    host.tables['broken'].VARIANT = host.tables['broken'].VARIANT._replace(name='broken',
+                                                                           evaluate_batch=_broken_batch)
+    for kind in ('deal', 'flop', 'turn', 'river'):
+        await asyncio.gather(*(host.submit(name, kind) for name in ('ok', 'broken')))
+    results = await asyncio.gather(host.submit('ok', 'showdown'), host.submit('broken', 'showdown'),
+                                   return_exceptions=True)
+    after = await host.submit('ok', 'showdown')
+    host.stop()
+    await task
+    return host, results, after
+
+
+def test_showdown_errors_reach_their_submitter_only():
+    random.seed(16)
+    host, (ok, broken), after = asyncio.run(_showdowns_with_broken_table())
+    assert ok == host.tables['ok'].winner() == after
+    assert isinstance(broken, RuntimeError)
+
+
+def test_run_survives_an_error_in_tick():
+    async def run():
+        host = TableHost(timeout=1)
+        task = asyncio.create_task(host.run())
+        host.open_table('t1', ['TUDOR', 'ANDREW'], 100, 2)
+        tick = host.tick
+        host.tick = lambda actions: (setattr(host, 'tick', tick), 1 / 0)
+        with pytest.raises(ZeroDivisionError):
+            await host.submit('t1', 'deal')
+        await host.submit('t1', 'deal')
+        host.stop()
+        await task
+    asyncio.run(run())
+
+
+def test_stop_fails_queued_actions():
+    async def run():
+        host = TableHost(timeout=None)
+        task = asyncio.create_task(host.run())
+        host.open_table('t1', ['TUDOR', 'ANDREW'], 100, 2)
+        await asyncio.sleep(0)
+        futures = [host.submit_nowait('t1', 'deal') for _ in range(3)]
+        host.stop()
+        await task
+        return await asyncio.gather(*futures, return_exceptions=True)
+    results = asyncio.run(asyncio.wait_for(run(), 5))
+    assert all(isinstance(result, Exception) for result in results)
+
+
+def test_batched_showdowns_go_through_the_table_cache_and_instrumentation():
+    from holdem.cache import EvaluationCache
+    from holdem.instrument import Instrumentation
+
+    async def run():
+        host = TableHost()
+        task = asyncio.create_task(host.run())
+        cache = EvaluationCache()
+        games = [host.open_table(f't{idx}', ['TUDOR', 'ANDREW'], 100, 2, cache=cache) for idx in range(4)]
+        instrumentation = Instrumentation().attach(games[0])
+        for kind in ('deal', 'flop', 'turn', 'river'):
+            await asyncio.gather(*(host.submit(f't{idx}', kind) for idx in range(4)))
+        results = await asyncio.gather(*(host.submit(f't{idx}', 'showdown') for idx in range(4)))
+        host.stop()
+        await task
+        return host, cache, instrumentation, games, results
+
+    random.seed(20)
+    host, cache, instrumentation, games, results = asyncio.run(run())
+    assert host.batched_showdowns == 4
+    assert cache.misses == 4 and len(cache.entries) == 4
+    assert instrumentation.snapshot()['winner']['count'] == 1
+    assert results == [game.winner() for game in games]
+    assert cache.hits == 4
@@ -0,0 +1,58 @@
+# -*- coding: utf-8 -*-
+from itertools import permutations
+import numpy as np
+import pytest
+
+from holdem.icm import icm_batch, icm_equity, icm_monte_carlo, push_fold_equity, state_count
+
+
+def _brute_force(stacks, payouts):
+    equity = np.zeros(len(stacks))
+    for order in permutations(range(len(stacks))):
+        probability, left = 1.0, float(sum(stacks))
+        for player in order:
+            probability *= stacks[player] / left
+            left -= stacks[player]
+        for place, player in enumerate(order[:len(payouts)]):
+            equity[player] += probability * payouts[place]
+    return equity
+
+
+@pytest.mark.parametrize('stacks, payouts', [
+    ([5000, 3000, 2000], [50, 30, 20]),
+    ([100, 100], [70, 30]),
+    ([1200, 800, 500, 300, 200], [50, 30, 20]),
+    ([10, 20, 30, 40, 50, 60], [40, 25, 15, 10, 6, 4]),
+    ])
+def test_icm_matches_brute_force(stacks, payouts):
+    expected = _brute_force(stacks, payouts)
+    assert icm_equity(stacks, payouts) == pytest.approx(expected)
+    assert icm_equity(stacks, payouts).sum() == pytest.approx(sum(payouts))
+
+
+def test_icm_batch_matches_single_evaluations():
+    rng = np.random.default_rng(22)
+    stacks = rng.integers(1, 1000, (20, 5)).astype(float)
+    payouts = [50, 30, 20]
+    batch = icm_batch(stacks, payouts)
+    assert batch == pytest.approx(np.array([_brute_force(row, payouts) for row in stacks]))
+
+
+def test_state_count():
+    assert state_count(10, 9) == 1013
+    assert state_count(30, 3) == 466
+
+
+def test_monte_carlo_is_close_to_exact():
+    stacks, payouts = [5000, 3000, 2000, 1000], [50, 30, 20]
+    equity, error = icm_monte_carlo(stacks, payouts, trials=200000, seed=1)
+    assert np.all(np.abs(equity - _brute_force(stacks, payouts)) < 5 * error + 1e-9)
+
+
+def test_push_fold_outcomes():
+    stacks, payouts = [[1000, 500, 1500]], [60, 40]
+    result = push_fold_equity(stacks, payouts, pusher=1, caller=0, equity=0.5, pot=0)
+    assert result.fold[0] == pytest.approx(icm_equity([1000, 500, 1500], payouts))
+    assert result.win[0] == pytest.approx(icm_equity([500, 1000, 1500], payouts))
+    assert result.lose[0] == pytest.approx(icm_equity([1500, 0, 1500], payouts))
+    assert result.push[0] == pytest.approx((result.win[0] + result.lose[0]) / 2)
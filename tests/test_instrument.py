@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+import json
+import time
+
+import pytest
+
+from holdem import SimulatedTexasHoldem
+from holdem.instrument import Instrumentation, PhaseStats, Registry, SamplingProfiler
+
+PLAYERS = ['TUDOR', 'ANDREW', 'ELENA']
+
+
+def _play(game, hands=20):
+    for _ in range(hands):
+        game.new_hand()
+        game.deal_players()
+        game.blinds()
+        for flop in (True, False, False):
+            game.deal_board(flop=flop)
+        game.winner()
+        game.settle_pot()
+
+
+def test_phase_stats_histogram_and_merge():
+    stats, other = PhaseStats(), PhaseStats()
+    for elapsed in (1000, 3000, 1000000):
+        stats.add(elapsed)
+    other.add(5000)
+    stats.merge(other)
+    snapshot = stats.snapshot()
+    assert snapshot['count'] == 4 and snapshot['total_seconds'] == pytest.approx(1009000 / 1e9)
+    assert snapshot['p50_us'] == 4.096 and snapshot['p99_us'] == 1048.576
+    assert sum(snapshot['histogram_us'].values()) == 4
+
+
+def test_attach_times_phases_and_detach_restores_the_methods():
+    game = SimulatedTexasHoldem(PLAYERS, 1000, 2, seed=20)
+    instrumentation = Instrumentation().attach(game)
+    with pytest.raises(Exception):
+        Instrumentation().attach(game)
+    assert 'instrumentation' not in game.clone().__dict__
+    _play(game)
+    snapshot = instrumentation.snapshot()
+    assert snapshot['winner']['count'] == snapshot['settle_pot']['count'] == 20
+    assert snapshot['deal_board']['count'] == 60 and snapshot['blinds']['count'] == 20
+    instrumentation.detach()
+    assert 'winner' not in game.__dict__
+    _play(game, 5)
+    assert instrumentation.snapshot()['winner']['count'] == 20
+
+
+def test_registry_merges_tables_and_writes_snapshots(tmp_path):
+    registry = Registry()
+    games = [SimulatedTexasHoldem(PLAYERS, 1000, 2, seed=seed) for seed in range(3)]
+    for idx, game in enumerate(games):
+        registry.instrument(game, f't{idx}')
+        _play(game, 10)
+    snapshot = registry.snapshot(per_table=True)
+    assert snapshot['tables'] == 3 and snapshot['total']['winner']['count'] == 30
+    assert snapshot['per_table']['t1']['winner']['count'] == 10
+    path = str(tmp_path / 'tables.jsonl')
+    registry.start_writer(path, interval=0.01)
+    time.sleep(0.1)
+    registry.stop_writer()
+    with open(path) as file:
+        lines = [json.loads(line) for line in file]
+    assert lines and lines[-1]['total']['winner']['count'] == 30
+    registry.remove('t0')
+    assert 'winner' not in games[0].__dict__
+
+
+def test_sampling_profiler_sees_the_busy_function():
+    def busy():
+        deadline = time.perf_counter() + 0.2
+        while time.perf_counter() < deadline:
+            sum(range(100))
+
+    with SamplingProfiler(interval=0.001) as profiler:
+        busy()
+    assert profiler.samples > 0
+    assert any('(busy)' in row['function'] for row in profiler.snapshot(limit=None))
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from holdem.ranges import _card, parse_range, range_equity
+
+
+def _combos(*texts):
+    return {tuple(sorted((_card(text[:2]), _card(text[2:])), reverse=True)) for text in texts}
+
+
+def test_parse_range_counts():
+    assert len(parse_range('QQ+')) == 18
+    assert len(parse_range('AKs, AKo')) == 16
+    assert len(parse_range('ATs+')) == 16
+    assert len(parse_range('AhKh')) == 1
+    assert parse_range('AKs, AKs:0.5')[tuple(sorted((_card('Ah'), _card('Kh')), reverse=True))] == 0.5
+
+
+def test_parse_range_spans():
+    assert set(parse_range('22-55')) == set(parse_range('55-22')) == set(parse_range('22, 33, 44, 55'))
+    assert set(parse_range('A2s-A5s')) == set(parse_range('A5s, A4s, A3s, A2s'))
+    assert set(parse_range('T9s-65s')) == set(parse_range('T9s, 98s, 87s, 76s, 65s'))
+    assert set(parse_range('KQo-JTo')) == set(parse_range('KQo, QJo, JTo'))
+    assert not set(parse_range('T9s-65s')) & _combos('6s6c', '9h9d')
+
+
+@pytest.mark.parametrize('token', ['T9s-64s', 'T9s-65o', 'AA-A2', 'KQ-22', 'AX', 'A'])
+def test_parse_range_rejects_malformed_tokens(token):
+    with pytest.raises(ValueError):
+        parse_range(token)
+
+
+def test_heads_up_range_equity_on_the_river():
+    board = [_card(text) for text in ('Kh', '7d', '2c', '9s', '3h')]
+    hero, villain = range_equity(['AA', 'KK'], board=board)
+    assert hero.equity.equity == 0.0 and villain.equity.equity == 1.0
+    hero, villain = range_equity(['AsAh', 'AdAc'], board=board)
+    assert hero.equity.tie == villain.equity.tie == 1.0
+
+
+def test_multiway_range_equity_sums_to_one():
+    results = range_equity(['QQ+', 'AKs, AQs', 'JJ-99'], samples=2000, seed=7)
+    assert sum(result.equity.equity for result in results) == pytest.approx(1.0, abs=1e-3)
+    assert all(len(result.combos) for result in results)
+
+
+def test_multiway_ranges_without_disjoint_deals_raise():
+    with pytest.raises(ValueError):
+        range_equity(['AA', 'AA', 'AA'], samples=100, seed=1)
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+import numpy as np
+import pytest
+
+from holdem import SimulatedOmaha
+from holdem.selfplay import SelfPlay, CallStrategy, RandomStrategy, HandStrengthStrategy
+
+
+class _Recorder(CallStrategy):
+
+    def __init__(self):
+        self.shapes = set()
+
+    def act(self, observation):
+        self.shapes.add(observation.hole_cards.shape[1])
+        return super().act(observation)
+
+
+def _net(harness):
+    return sum(result.bb_per_100 * result.hands for result in harness.results())
+
+
+def test_selfplay_is_zero_sum():
+    harness = SelfPlay([HandStrengthStrategy(), CallStrategy(), RandomStrategy(seed=3)], tables=32, seed=18)
+    harness.run(500)
+    assert harness.hands >= 500
+    assert sum(result.hands for result in harness.results()) == 3 * harness.hands
+    assert _net(harness) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_observations_follow_the_variant():
+    recorder = _Recorder()
+    harness = SelfPlay([recorder, HandStrengthStrategy()], tables=16, seed=4, game_class=SimulatedOmaha)
+    harness.run(200)
+    assert recorder.shapes == {4}
+    assert _net(harness) == pytest.approx(0.0, abs=1e-6)
+
+
+def test_observe_returns_one_row_per_table():
+    harness = SelfPlay([CallStrategy(), CallStrategy()], tables=64, seed=5)
+    observation = harness.observe(np.arange(64))
+    assert observation.hole_cards.shape == (64, 2) and observation.board.shape == (64, 5)
+    assert (observation.board == -1).all()
+    harness.run(300)
+    assert harness.decisions > harness.hands
+
+
+class _FoldStrategy(CallStrategy):
+
+    def act(self, observation):
+        actions, amounts = super().act(observation)
+        return np.where(observation.to_call > 0, 0, actions), amounts
+
+
+def test_small_blind_calls_half_a_blind_preflop():
+    harness = SelfPlay([CallStrategy(), CallStrategy()], tables=8, seed=6)
+    observation = harness.observe(np.arange(8))
+    assert (observation.position == 0).all()
+    assert (observation.to_call == 1).all()
+    harness.step()
+    for table in harness.tables:
+        game = table.game
+        assert game.pot == 4 and game.table[game.small_blind_player].bet == 2
+    folding = SelfPlay([_FoldStrategy(), CallStrategy()], tables=8, seed=6)
+    folding.step()
+    folding.step()
+    assert folding.hands == 4
+    assert [result.bb_per_100 for result in folding.results()] == [-50, 50]
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+import random
+import numpy as np
+
+from holdem import TexasHoldem
+from holdem.settlement import settle, settle_batch, side_pots, split
+
+PLAYERS = ['TUDOR', 'ANDREW', 'ELENA']
+
+
+def test_split_conserves_fractional_pots():
+    assert split(7.5, ['TUDOR', 'ANDREW']) == {'TUDOR': 4.5, 'ANDREW': 3}
+    assert split(7.5, ['TUDOR', 'ANDREW'], chip=2.5) == {'TUDOR': 5.0, 'ANDREW': 2.5}
+    assert sum(split(10, PLAYERS).values()) == 10
+
+
+def test_chips_are_conserved_with_a_fractional_small_blind():
+    random.seed(9)
+    game = TexasHoldem(PLAYERS, 10000, 5)
+    total = sum(game.table[player].fortune for player in PLAYERS)
+    for hand in range(200):
+        game.state.clear_hand()
+        game.reset_deck()
+        game.shuffle_cards()
+        game.deal_players()
+        game.blinds()
+        if hand % 3:
+            game.place_bet(PLAYERS[hand % 3], 7.5)
+        if hand % 5 == 0:
+            game.table[PLAYERS[hand % 3]].fold()
+        for flop in (True, False, False):
+            game.deal_board(flop=flop)
+        payouts = game.settle_pot()
+        assert all(chips % game.small_blind == 0 for chips in payouts.values())
+        assert sum(game.table[player].fortune for player in PLAYERS) == total
+        game.set_blind_buttons()
+
+
+def test_side_pots_go_to_the_best_eligible_player():
+    contributions = {'TUDOR': 50, 'ANDREW': 100, 'ELENA': 100, 'JOHN': 30}
+    assert side_pots(contributions, folded=['JOHN']) == [(180, ['TUDOR', 'ANDREW', 'ELENA']),
+                                                          (100, ['ANDREW', 'ELENA'])]
+    payouts = settle(contributions, [['TUDOR'], ['ANDREW', 'ELENA']], folded=['JOHN'])
+    assert payouts == {'TUDOR': 180, 'ANDREW': 50, 'ELENA': 50, 'JOHN': 0}
+
+
+def test_odd_chips_follow_the_odd_chip_order():
+    contributions = {'TUDOR': 5, 'ANDREW': 5, 'ELENA': 5}
+    payouts = settle(contributions, [['TUDOR', 'ANDREW'], ['ELENA']], odd_chip_order=['ANDREW', 'ELENA', 'TUDOR'])
+    assert payouts == {'TUDOR': 7, 'ANDREW': 8, 'ELENA': 0}
+
+
+def test_settle_batch_matches_settle():
+    rng = np.random.default_rng(9)
+    contributions = rng.integers(0, 6, (500, 4)) * 10
+    strengths = rng.integers(0, 4, (500, 4))
+    folded = rng.random((500, 4)) < 0.3
+    folded[:, 0] = False
+    batch = settle_batch(contributions, strengths, folded)
+    names = ['TUDOR', 'ANDREW', 'ELENA', 'JOHN']
+    for row, payouts in enumerate(batch.tolist()):
+        active = [seat for seat in range(4) if not folded[row, seat]]
+        ranking = [[names[seat] for seat in active if strengths[row, seat] == strength]
+                   for strength in sorted({strengths[row, seat] for seat in active}, reverse=True)]
+        expected = settle(dict(zip(names, contributions[row].tolist())), ranking,
+                          [names[seat] for seat in range(4) if folded[row, seat]], names)
+        assert payouts == [expected[name] for name in names]
+        assert sum(payouts) == contributions[row].sum()
+
+
+def test_settle_pot_before_the_flop():
+    random.seed(12)
+    game = TexasHoldem(PLAYERS, 100, 2)
+    game.shuffle_cards()
+    game.deal_players()
+    game.blinds()
+    game.place_bet(game.small_blind_player, 3)
+    game.place_bet(game.big_blind_player, 2)
+    game.table['ELENA'].fold()
+    winner = game.winner()
+    payouts = game.settle_pot()
+    assert sum(payouts.values()) == 8
+    expected = {'TUDOR': 4, 'ANDREW': 4} if winner == 'Tie' else {winner: 8}
+    assert payouts == {**dict.fromkeys(PLAYERS, 0), **expected}
+    assert sum(game.table[player].fortune for player in PLAYERS) == 300
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+from holdem import TexasHoldem
+
+PLAYERS = ['TUDOR', 'ANDREW', 'ELENA', 'JOHN']
+
+
+def _game(hands, board):
+    game = TexasHoldem(PLAYERS, 100, 2)
+    for player, cards in zip(PLAYERS, hands):
+        game.table[player].cards = [game.Card(rank, suit) for rank, suit in cards]
+    game.community_cards = [game.Card(rank, suit) for rank, suit in board]
+    return game
+
+
+BOARD = [('2', 'spades'), ('7', 'clubs'), ('9', 'diamonds'), ('J', 'hearts'), ('K', 'spades')]
+
+
+def test_ranking_orders_every_player_into_tie_classes():
+    game = _game([[('A', 'spades'), ('3', 'clubs')], [('K', 'clubs'), ('4', 'diamonds')],
+                  [('A', 'hearts'), ('3', 'diamonds')], [('9', 'spades'), ('9', 'clubs')]], BOARD)
+    ranking = game.showdown_ranking()
+    assert [rank.players for rank in ranking] == [['JOHN'], ['ANDREW'], ['TUDOR', 'ELENA']]
+    assert [rank.strength for rank in ranking] == sorted((rank.strength for rank in ranking), reverse=True)
+    assert game.winner().player == 'JOHN'
+
+
+def test_folded_players_are_not_ranked():
+    game = _game([[('A', 'spades'), ('3', 'clubs')], [('K', 'clubs'), ('4', 'diamonds')],
+                  [('A', 'hearts'), ('3', 'diamonds')], [('9', 'spades'), ('9', 'clubs')]], BOARD)
+    game.table['JOHN'].fold()
+    game.table['ANDREW'].fold()
+    ranking = game.showdown_ranking()
+    assert [rank.players for rank in ranking] == [['TUDOR', 'ELENA']]
+    assert game.winner() == 'Tie'
+
+
+def test_preflop_showdown_compares_high_cards_then_kickers():
+    game = _game([[('A', 'spades'), ('3', 'clubs')], [('K', 'clubs'), ('Q', 'diamonds')],
+                  [('A', 'hearts'), ('5', 'diamonds')], [('9', 'spades'), ('9', 'clubs')]], [])
+    assert [rank.players for rank in game.showdown_ranking()] == [['ELENA'], ['TUDOR'], ['ANDREW'], ['JOHN']]
+    assert game.winner() == game.highcard_showdown() == 'ELENA'
+    assert game.top_showdown_cards() == []
+    game.table['TUDOR'].cards = [game.Card('A', 'clubs'), game.Card('5', 'spades')]
+    assert game.winner() == 'Tie'
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+from holdem import SimulatedShortDeckHoldem, SimulatedTexasHoldem
+
+PLAYERS = ['TUDOR', 'ANDREW', 'ELENA']
+
+
+def _play(game):
+    game.new_hand()
+    game.deal_players()
+    for flop in (True, False, False):
+        game.deal_board(flop=flop)
+    return [tuple(game.table[player].cards) for player in PLAYERS] + [tuple(game.community_cards)]
+
+
+def test_seeded_tables_deal_the_same_hands():
+    first, second = (SimulatedTexasHoldem(PLAYERS, 100, 2, seed=7) for _ in range(2))
+    assert [_play(first) for _ in range(100)] == [_play(second) for _ in range(100)]
+
+
+def test_hands_deal_distinct_cards_across_permutation_blocks():
+    game = SimulatedShortDeckHoldem(PLAYERS, 100, 2, seed=8)
+    game.PERMUTATION_BLOCK = 16
+    boards = set()
+    for _ in range(100):
+        cards = [card for dealt in _play(game) for card in dealt]
+        assert len(set(cards)) == len(cards) == 11
+        assert set(cards) <= set(game.VARIANT.deck)
+        boards.add(tuple(cards[-5:]))
+    assert len(boards) > 90
+
+
+def test_reset_deck_rewinds_the_cursor():
+    game = SimulatedTexasHoldem(PLAYERS, 100, 2, seed=9)
+    dealt = game.get_cards(5)
+    game.reset_deck()
+    assert game.get_cards(5) == dealt
+    game.shuffle_cards()
+    game.reset_deck()
+    assert game.get_cards(5) != dealt
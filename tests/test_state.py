@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+import random
+
+import pytest
+
+from holdem import Omaha, TexasHoldem
+
+PLAYERS = ['TUDOR', 'ANDREW', 'ELENA']
+
+
+def _game(seed=14):
+    random.seed(seed)
+    game = TexasHoldem(PLAYERS, 100, 2)
+    game.shuffle_cards()
+    return game
+
+
+def test_deck_and_board_lists_write_through():
+    game = _game()
+    top = game.deck[-1]
+    assert game.deck.pop() == top
+    assert len(game.deck) == 51 and top not in game.deck
+    cards = [game.deck.pop() for _ in range(3)]
+    game.community_cards.extend(cards)
+    game.community_cards.append(game.deck.pop())
+    assert game.community_cards[:3] == cards
+    assert len(game.community_cards) == 4 and len(game.deck) == 47
+    del game.community_cards[-1]
+    assert len(game.community_cards) == 3
+
+
+def test_clone_is_independent():
+    game = _game()
+    game.deal_players()
+    game.blinds()
+    clone = game.clone()
+    clone.deal_board(flop=True)
+    clone.place_bet('ELENA', 10)
+    assert game.community_cards == [] and len(clone.community_cards) == 3
+    assert game.table['ELENA'].bet == 0 and clone.table['ELENA'].bet == 10
+    assert clone.table['TUDOR'].cards == game.table['TUDOR'].cards
+
+
+def test_undo_returns_to_checkpoint():
+    game = _game()
+    game.deal_players()
+    game.checkpoint()
+    deck, fortunes = game.deck, [game.table[player].fortune for player in PLAYERS]
+    game.blinds()
+    game.deal_board(flop=True)
+    game.undo()
+    assert game.deck == deck and game.community_cards == []
+    assert [game.table[player].fortune for player in PLAYERS] == fortunes
+
+
+def test_deal_stops_at_the_end_of_the_deck():
+    game = _game()
+    with pytest.raises(Exception, match='Not enough cards'):
+        game.get_cards(60)
+    assert len(game.deck) == 52
+    assert len(game.get_cards(52)) == 52
+    with pytest.raises(Exception, match='Not enough cards'):
+        game.get_cards(1)
+    random.seed(3)
+    omaha = Omaha(['P%d' % seat for seat in range(12)], 100, 2)
+    omaha.shuffle_cards()
+    omaha.deal_players()
+    omaha.deal_board(flop=True)
+    with pytest.raises(Exception, match='Not enough cards'):
+        omaha.deal_board(flop=False)
+    assert len(omaha.community_cards) == 3
+
+
+def test_deal_rejects_a_negative_count():
+    game = _game()
+    with pytest.raises(Exception, match='negative'):
+        game.get_cards(-1)
+    assert len(game.deck) == 52
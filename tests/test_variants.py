@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+from itertools import combinations
+import numpy as np
+
+from holdem import evaluator, variants
+
+
+def _omaha_brute_force(cards):
+    hole, board = cards[:4], cards[4:]
+    return max(evaluator.evaluate(list(pair) + list(triple))
+               for pair in combinations(hole, 2) for triple in combinations(board, 3))
+
+
+def _short_deck_brute_force(cards):
+    return max(variants.evaluate_short_deck(list(five)) for five in combinations(cards, 5))
+
+
+def _deal(rng, deck, hands, size):
+    deck = np.array(deck)
+    return np.array([rng.choice(deck, size, replace=False) for _ in range(hands)])
+
+
+def test_omaha_batch_matches_brute_force():
+    rng = np.random.default_rng(2021)
+    for board in (3, 4, 5):
+        cards = _deal(rng, range(52), 3000, 4 + board)
+        _, strengths = variants.evaluate_omaha_batch(cards)
+        expected = [_omaha_brute_force(hand.tolist()) for hand in cards]
+        assert strengths.tolist() == expected
+        assert [variants.evaluate_omaha(hand.tolist()) for hand in cards] == expected
+
+
+def test_omaha_batch_matches_brute_force_on_paired_boards():
+    rng = np.random.default_rng(7)
+    cards = []
+    while len(cards) < 2000:
+        hand = rng.choice(52, 9, replace=False)
+        if len(set(hand[4:] >> 2)) <= 3:
+            cards.append(hand)
+    cards = np.array(cards)
+    _, strengths = variants.evaluate_omaha_batch(cards)
+    assert strengths.tolist() == [_omaha_brute_force(hand.tolist()) for hand in cards]
+
+
+def test_omaha_board_keys_are_unique():
+    variants.load_omaha_tables()
+    for keys in variants.OMAHA_BOARD_KEYS.values():
+        assert np.unique(keys).size == keys.size
+
+
+def test_short_deck_batch_matches_brute_force():
+    rng = np.random.default_rng(36)
+    for size in evaluator.HAND_SIZES:
+        cards = _deal(rng, variants.SHORT_DECK_CARDS, 3000, size)
+        categories, strengths = variants.evaluate_short_deck_batch(cards)
+        expected = [_short_deck_brute_force(hand.tolist()) for hand in cards]
+        assert strengths.tolist() == expected
+        assert categories.tolist() == [variants.short_deck_category(strength) for strength in expected]
+
+
+def _cards(*names):
+    """Int cards from names such as 'As' or '10h' (rank then the first letter of the suit)."""
+    return [evaluator.RANKS.index(name[:-1]) * 4 + 'scdh'.index(name[-1]) for name in names]
+
+
+def test_short_deck_flush_beats_full_house():
+    flush = variants.evaluate_short_deck(_cards('Ah', 'Jh', '9h', '8h', '6h'))
+    full_house = variants.evaluate_short_deck(_cards('Ks', 'Kc', 'Kd', 'Qs', 'Qc'))
+    assert variants.short_deck_category(flush) == evaluator.FLUSH
+    assert variants.short_deck_category(full_house) == evaluator.FULL_HOUSE
+    assert flush > full_house
+    holdem_flush = evaluator.evaluate(_cards('Ah', 'Jh', '9h', '8h', '6h'))
+    assert holdem_flush < evaluator.evaluate(_cards('Ks', 'Kc', 'Kd', 'Qs', 'Qc'))
+
+
+def test_short_deck_wheel_is_the_lowest_straight():
+    wheel = variants.evaluate_short_deck(_cards('As', '6c', '7d', '8h', '9s'))
+    six_high = variants.evaluate_short_deck(_cards('6s', '7c', '8d', '9h', '10s'))
+    assert variants.short_deck_category(wheel) == evaluator.STRAIGHT
+    assert wheel < six_high
+    assert wheel > variants.evaluate_short_deck(_cards('As', 'Ac', 'Ad', 'Kh', 'Qs'))
+
+
+def test_short_deck_wheel_is_the_lowest_straight_flush():
+    wheel = variants.evaluate_short_deck(_cards('Ah', '6h', '7h', '8h', '9h'))
+    six_high = variants.evaluate_short_deck(_cards('6h', '7h', '8h', '9h', '10h'))
+    assert variants.short_deck_category(wheel) == evaluator.STRAIGHT_FLUSH
+    assert wheel < six_high
+    assert wheel > variants.evaluate_short_deck(_cards('As', 'Ac', 'Ad', 'Ah', 'Ks'))
+    seven_cards = _cards('Ah', '6h', '7h', '8h', '9h', '9s', '9c')
+    assert variants.evaluate_short_deck(seven_cards) == wheel
+    _, strengths = variants.evaluate_short_deck_batch(np.array([seven_cards]))
+    assert strengths.tolist() == [wheel]